@@ -0,0 +1,83 @@
+# Бенчмарк масового імпорту контактів (import-contacts): файл з count контактів імпортується
+# в порожню книгу і в книгу з count іншими контактами, всі індекси якої вже побудовані.
+# Для кожного варіанта виводиться час імпорту, швидкість (рядків за секунду) і час першого пошуку
+# після імпорту, який заново будує скинуті імпортом триграмний індекс (див. AddressBook.bulk).
+#
+# Запуск з кореня репозиторію:
+#   python -m benchmarks.bulk_import [--sizes 100k,1m] [--format csv|jsonl|vcf] [--empty-only]
+import argparse
+import gc
+import os
+import tempfile
+import time
+from src import import_export
+from . import data
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+TARGET_SECONDS = 60  # мета: мільйон контактів значно швидше ніж за хвилину
+
+
+# Книга з count контактами та побудованими індексами (як після пошуків у діалозі чи на сервері).
+def indexed_book(count: int):
+    book = data.build_address_book(data.generate_contacts(count))
+    book.__ensure_indexes__()
+    book.find_similar("olena")
+    list(book.iter_names_by_birthday())
+    return book
+
+
+def measure(book, file_name: str) -> tuple[float, float]:
+    gc.collect()
+    start = time.perf_counter()
+    imported, errors = import_export.import_contacts(book, file_name)
+    elapsed = time.perf_counter() - start
+    assert not errors, errors[:3]
+
+    start = time.perf_counter()
+    book.search("kovalenko")
+    return elapsed, time.perf_counter() - start
+
+
+def run(sizes: list[str], extension: str, empty_only: bool) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            count = SIZES[size]
+            file_name = os.path.join(folder, f"contacts{extension}")
+            import_export.export_contacts(data.build_address_book(data.generate_contacts(count, seed=2)), file_name)
+            print(f"\n{size}: {os.path.getsize(file_name) / 2**20:.1f} MB {extension}")
+
+            books = {"empty book": lambda: data.build_address_book([])}
+            if not empty_only:
+                books[f"{size} indexed"] = lambda: indexed_book(count)
+            results[size] = {}
+            for label, build in books.items():
+                book = build()
+                elapsed, search = measure(book, file_name)
+                del book
+                results[size][label] = {"seconds": elapsed, "rows_per_second": count / elapsed,
+                                        "first_search": search}
+                print(f"  {label:>14}: {elapsed:.2f}s ({count / elapsed:,.0f} rows/s), "
+                      f"first search after import {search:.2f}s")
+            if count >= SIZES["1m"]:
+                worst = max(result["seconds"] for result in results[size].values())
+                print(f"  target {TARGET_SECONDS}s per million: {'met' if worst < TARGET_SECONDS else 'NOT met'}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk contact import benchmark")
+    parser.add_argument("--sizes", default="100k", help=f"comma-separated file sizes from {', '.join(SIZES)}")
+    parser.add_argument("--format", choices=["csv", "jsonl", "vcf"], default="csv", help="file format (default: csv)")
+    parser.add_argument("--empty-only", action="store_true", help="import only into an empty book")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+    run(sizes, "." + args.format, args.empty_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# тут генеруються синтетичні адресні книги та книги нотаток для бенчмарків
+# Дані детерміновані (залежать лише від seed), тож результати різних запусків можна порівнювати.
+import random
+from src.address_book import AddressBook, Record
+from src.note_book import NoteBook
+
+FIRST_NAMES = [
+    "Olena", "Andrii", "Iryna", "Oleksandr", "Natalia", "Dmytro", "Oksana", "Serhii", "Yulia", "Mykola",
+    "Tetiana", "Volodymyr", "Kateryna", "Ivan", "Mariia", "Taras", "Sofiia", "Bohdan", "Anna", "Yurii",
+    "Halyna", "Petro", "Liudmyla", "Vasyl", "Viktoriia", "Roman", "Svitlana", "Maksym", "Daria", "Pavlo",
+]
+LAST_NAMES = [
+    "Kovalenko", "Shevchenko", "Bondarenko", "Tkachenko", "Kravchenko", "Melnyk", "Oliinyk", "Shevchuk",
+    "Polishchuk", "Boiko", "Tkachuk", "Marchenko", "Moroz", "Lysenko", "Rudenko", "Savchenko", "Petrenko",
+    "Klymenko", "Pavlenko", "Ponomarenko", "Kuzmenko", "Levchenko", "Kharchenko", "Karpenko", "Ivanenko",
+]
+OPERATORS = ["050", "066", "067", "068", "063", "073", "093", "095", "096", "097", "098", "099"]
+DOMAINS = ["gmail.com", "ukr.net", "i.ua", "outlook.com", "meta.ua", "example.com"]
+CITIES = ["Kyiv", "Lviv", "Odesa", "Kharkiv", "Dnipro", "Vinnytsia", "Poltava", "Chernihiv", "Uzhhorod"]
+STREETS = ["Shevchenka", "Franka", "Hrushevskoho", "Khreshchatyk", "Sadova", "Lesi Ukrainky", "Soborna"]
+TAGS = [
+    "work", "home", "family", "shopping", "travel", "ideas", "books", "health", "finance", "urgent",
+    "meeting", "birthday", "project", "study", "recipe", "car", "sport", "music", "movies", "garden",
+]
+WORDS = (
+    "call send buy meet check review plan write read finish prepare book order pay fix update "
+    "report meeting project budget invoice ticket train flight hotel doctor dentist school lesson "
+    "groceries milk bread coffee garden flowers car service insurance birthday gift party friends "
+    "family weekend holiday summer winter morning evening tomorrow monday friday office team client "
+    "contract draft slides presentation deadline release backup server database python notes idea"
+).split()
+
+
+# Ім'я контакту - одне слово, як його вводять у команди (обробники роблять capitalize()).
+def contact_name(rnd: random.Random, number: int) -> str:
+    return f"{rnd.choice(FIRST_NAMES)}-{rnd.choice(LAST_NAMES)}-{number}".capitalize()
+
+
+def phone_number(rnd: random.Random) -> str:
+    return f"{rnd.choice(OPERATORS)}{rnd.randrange(10 ** 7):07d}"
+
+
+def birthday(rnd: random.Random) -> str:
+    return f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1950, 2010)}"
+
+
+def sentence(rnd: random.Random) -> str:
+    words = rnd.choices(WORDS, k=rnd.randint(5, 14))
+    return " ".join(words).capitalize() + "."
+
+
+# Нотатка з кількох абзаців по кілька речень.
+def note_text(rnd: random.Random) -> str:
+    paragraphs = (" ".join(sentence(rnd) for _ in range(rnd.randint(1, 4))) for _ in range(rnd.randint(1, 3)))
+    return "\n\n".join(paragraphs)
+
+
+# Рядки контактів: (ім'я, телефони, email, дата народження, адреса або None).
+def generate_contacts(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    for number in range(count):
+        name = contact_name(rnd, number)
+        phones = [phone_number(rnd) for _ in range(rnd.choice((1, 1, 1, 2, 2, 3)))]
+        email = f"{name.lower()}@{rnd.choice(DOMAINS)}" if rnd.random() < 0.7 else None
+        bday = birthday(rnd) if rnd.random() < 0.8 else None
+        address = f"{rnd.choice(CITIES)}, {rnd.choice(STREETS)} {rnd.randint(1, 200)}" if rnd.random() < 0.5 else None
+        yield name, phones, email, bday, address
+
+
+# Нотатки: (текст, теги).
+def generate_notes(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield note_text(rnd), rnd.sample(TAGS, rnd.choice((0, 1, 1, 2, 2, 3)))
+
+
+def build_address_book(contacts) -> AddressBook:
+    book = AddressBook()
+    for name, phones, email, bday, address in contacts:
+        record = Record(name)
+        for phone in phones:
+            record.add_phone(phone)
+        if email:
+            record.add_email(email)
+        if bday:
+            record.add_birthday(bday)
+        if address:
+            record.add_address(address)
+        book.add_record(record)
+    return book
+
+
+def build_note_book(notes) -> NoteBook:
+    book = NoteBook()
+    for content, tags in notes:
+        note = book.find_note_by_id(book.add_note(content))
+        for tag in tags:
+            note.add_tag(tag)
+    return book
@@ -0,0 +1,113 @@
+# Мікробенчмарк пошуку регулярним виразом для книг різного розміру: простий перегляд записів,
+# пошук у колонці текстів у поточному процесі і пулом з 1, 2, 4 ... процесів. Для кожного варіанта
+# виводиться холодний час (перший пошук, що заповнює колонку), теплий час і прискорення відносно
+# простого перегляду; за цим обирається parallel_search.PARALLEL_THRESHOLD.
+#
+# Запуск з кореня репозиторію:
+#   python -m benchmarks.parallel_regex [--book notes|contacts] [--sizes 10k,50k,300k] [--workers 1,2,4]
+import argparse
+import gc
+import os
+import re
+import time
+from unittest import mock
+from src import note_book
+from src import parallel_search
+from . import data
+from .suite import REGEXES
+
+SIZES = {"10k": 10_000, "50k": 50_000, "100k": 100_000, "300k": 300_000, "1m": 1_000_000}
+
+# книга: (побудова з count записів, текст запису, пошук книги)
+BOOKS = {
+    "notes": (lambda count: data.build_note_book(data.generate_notes(count)),
+              lambda note: note.content.value,
+              note_book.NoteBook.search_notes_by_regex),
+    "contacts": (lambda count: data.build_address_book(data.generate_contacts(count)),
+                 lambda record: record.full_text(),
+                 lambda book, pattern: book.search_regex(pattern)),
+}
+
+
+def reset_pool():
+    if parallel_search.__pool__ is not None:
+        parallel_search.__pool__.shutdown()
+        parallel_search.__pool__ = None
+
+
+def reset_column(book):
+    if book.__text_column__ is not None:
+        book.__text_column__.close()
+        book.__text_column__ = None
+
+
+# найкращий час з repeat запусків пошуку всіх шаблонів REGEXES
+def measure(search, book, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for pattern in REGEXES:
+            search(book, pattern)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Простий перегляд текстів записів без колонки (для порівняння).
+def measure_linear(book, text) -> float:
+    def search(book, pattern: str) -> list:
+        match = re.compile(pattern).search
+        return [value for value in book.data.values() if match(text(value))]
+    return measure(search, book)
+
+
+# Пошук через колонку: (холодний час, теплий час). workers=None - у поточному процесі, інакше пулом.
+def measure_column(book, search, workers: int | None) -> tuple[float, float]:
+    reset_pool()
+    reset_column(book)
+    with mock.patch.object(parallel_search, "workers", lambda: workers or 1), \
+            mock.patch.object(parallel_search, "use_pool", lambda count: workers is not None), \
+            mock.patch.object(note_book, "use_pool", lambda count: True):
+        cold = measure(search, book, repeat=1)
+        warm = measure(search, book)
+    reset_pool()
+    reset_column(book)
+    return cold, warm
+
+
+def run(kind: str, sizes: list[str], workers: list[int]) -> dict:
+    build, text, search = BOOKS[kind]
+    results = {}
+    print(f"{kind}: {os.cpu_count()} cores, {len(REGEXES)} patterns per search")
+    for size in sizes:
+        book = build(SIZES[size])
+        gc.collect()
+        linear = measure_linear(book, text)
+        print(f"\n{size}: linear scan {linear:.3f}s")
+        results[size] = {"linear": linear}
+        for count in [None, *workers]:
+            cold, warm = measure_column(book, search, count)
+            label = "column" if count is None else f"{count} workers"
+            results[size][label] = {"cold": cold, "warm": warm, "speedup": linear / warm}
+            print(f"      {label:>10}: cold {cold:.3f}s, warm {warm:.3f}s, speedup x{linear / warm:.2f}")
+    return results
+
+
+def main(argv=None):
+    cores = os.cpu_count() or 1
+    default_workers = sorted({2 ** power for power in range(cores.bit_length())} | {cores})
+    parser = argparse.ArgumentParser(description="Parallel regex search benchmark")
+    parser.add_argument("--book", choices=list(BOOKS), default="notes", help="which book to search (default: notes)")
+    parser.add_argument("--sizes", default="10k,50k,300k", help=f"comma-separated book sizes from {', '.join(SIZES)}")
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)),
+                        help="comma-separated pool sizes (default: 1, 2, 4 ... up to the number of cores)")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+    run(args.book, sizes, [int(count) for count in args.workers.split(",")])
+
+
+if __name__ == "__main__":
+    main()
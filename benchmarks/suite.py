@@ -0,0 +1,267 @@
+# Набір бенчмарків: вимірює кожну команду адресної книги та книги нотаток,
+# збереження і завантаження книг, пошук підказок (get_suggestion) і регулярним виразом на синтетичних книгах
+# розміром 1k/100k/1M. Результати записуються в JSON і порівнюються зі збереженою базовою лінією.
+#
+# Запуск з кореня репозиторію:
+#   python -m benchmarks.suite                          # розміри 1k і 100k, порівняння з baseline.json
+#   python -m benchmarks.suite --sizes 1k,100k,1m       # разом з книгами на мільйон записів
+#   python -m benchmarks.suite --update-baseline        # зберегти результати як нову базову лінію
+# Якщо якась команда стала повільнішою за базову лінію більше ніж на --tolerance, код виходу 1.
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime
+from pathlib import Path
+from src.general import is_error
+from src.personal_assistant import PersonalAssistant
+from . import data
+
+BENCHMARKS_FOLDER = Path(__file__).parent
+BASELINE_FILE = BENCHMARKS_FOLDER / "baseline.json"
+RESULTS_FILE = BENCHMARKS_FOLDER / "results.json"
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+MIN_DELTA = 0.00005  # різниця менша за 50 мкс вважається шумом, а не регресією
+TYPOS = ["add-contct", "get-contatcs", "delet-note", "chnage-phone", "get-notes-by-tgs", "hepl", "xyz"]
+REGEXES = [r"Kyiv, \w+ 1\d\b", r"(?i)invoice.*tomorrow", r"@(ukr|meta)\.", r"\b19[5-6]\d$", r"backup server"]
+
+
+# Контекст прогону: синтетичні контакти, за якими будуються аргументи команд.
+class Context:
+    def __init__(self, contacts: list[tuple], note_count: int, folder: str):
+        self.contacts = contacts
+        self.note_count = note_count
+        self.folder = folder
+
+    # i-й "випадковий" контакт: кроки з простим множником розкидають звернення по книзі
+    def contact(self, i: int, shift: int = 0) -> tuple:
+        return self.contacts[(i * 7919 + shift) % len(self.contacts)]
+
+    def name(self, i: int, shift: int = 0) -> str:
+        return self.contact(i, shift)[0]
+
+    def note_id(self, i: int, shift: int = 0) -> int:
+        return (i * 7919 + shift) % self.note_count + 1
+
+    def file(self, name: str) -> str:
+        return os.path.join(self.folder, name)
+
+
+# Ім'я з переставленими сусідніми літерами - типова опечатка для нечіткого пошуку.
+def typo(name: str, i: int) -> str:
+    position = 1 + i % 3
+    return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+
+
+# Аргументи кожної команди для i-го повтору і кількість повторів (None - значення --iterations).
+# Змінюючі команди працюють з різними контактами (shift), щоб не заважати одна одній.
+ABOOK_COMMANDS = {
+    "add-contact": (lambda ctx, i: [f"Bench-contact-{i}", f"0990{i:06d}", f"bench{i}@example.com", "01.01.2000"], None),
+    "add-phone": (lambda ctx, i: [ctx.name(i, 1), f"0980{i:06d}"], None),
+    "add-email": (lambda ctx, i: [ctx.name(i, 2), f"new{i}@example.com"], None),
+    "add-birthday": (lambda ctx, i: [ctx.name(i, 3), "15.06.1990"], None),
+    "add-address": (lambda ctx, i: [ctx.name(i, 4), "Kyiv,", "Sadova", str(i)], None),
+    "get-birthday": (lambda ctx, i: [ctx.name(i, 5)], None),
+    "get-upcoming-birthdays": (lambda ctx, i: ["7"], None),
+    "get-phone": (lambda ctx, i: [ctx.name(i, 6)], None),
+    "get-contacts": (lambda ctx, i: ["--page", str(i + 1)], None),
+    "get-info": (lambda ctx, i: [ctx.name(i, 7)], None),
+    "get-contact-by-phone": (lambda ctx, i: [ctx.contact(i, 8)[1][0]], None),
+    "find-contact-fuzzy": (lambda ctx, i: [typo(ctx.name(i, 15), i)], None),
+    "change-phone": (lambda ctx, i: [ctx.name(i, 9), ctx.contact(i, 9)[1][0], f"0970{i:06d}"], None),
+    "change-email": (lambda ctx, i: [ctx.name(i, 10), ctx.contact(i, 10)[2] or "-", f"changed{i}@example.com"], None),
+    "change-birthday": (lambda ctx, i: [ctx.name(i, 11), "20.02.1985"], None),
+    "change-address": (lambda ctx, i: [ctx.name(i, 12), "Lviv,", "Franka", str(i)], None),
+    "delete-contact": (lambda ctx, i: [ctx.name(i, 13)], None),
+    "delete-phone": (lambda ctx, i: [ctx.name(i, 14), ctx.contact(i, 14)[1][-1]], None),
+    "export-contacts": (lambda ctx, i: [ctx.file("contacts.csv")], 1),
+    "import-contacts": (lambda ctx, i: [ctx.file("contacts.csv")], 1),  # читає щойно експортований файл
+}
+
+NBOOK_COMMANDS = {
+    "add-note": (lambda ctx, i: ["Benchmark", "note", str(i), "call", "client", "tomorrow"], None),
+    "get-note": (lambda ctx, i: [str(ctx.note_id(i, 1))], None),
+    "get-notes": (lambda ctx, i: ["--page", str(i + 1)], None),
+    "change-note": (lambda ctx, i: [str(ctx.note_id(i, 2)), "Changed", "note", "text", str(i)], None),
+    "delete-note": (lambda ctx, i: [str(ctx.note_id(i, 3))], None),
+    "add-tag": (lambda ctx, i: [str(ctx.note_id(i, 4)), "benchmark"], None),
+    "delete-tag": (lambda ctx, i: [str(ctx.note_id(i, 4)), "benchmark"], None),
+    "get-notes-by-text": (lambda ctx, i: [data.WORDS[i % len(data.WORDS)], data.WORDS[(i * 7) % len(data.WORDS)]], None),
+    "get-notes-by-tag": (lambda ctx, i: [data.TAGS[i % len(data.TAGS)]], None),
+    "get-notes-sorted-by-tags": (lambda ctx, i: [], 1),
+    "export-notes": (lambda ctx, i: [ctx.file("notes.jsonl")], 1),
+    "import-notes": (lambda ctx, i: [ctx.file("notes.jsonl")], 1),  # читає щойно експортований файл
+}
+
+
+def percentile(sorted_times: list[float], fraction: float) -> float:
+    return sorted_times[min(len(sorted_times) - 1, int(fraction * len(sorted_times)))]
+
+
+def summary(times: list[float], errors: int = 0) -> dict:
+    times = sorted(times)
+    return {
+        "iterations": len(times),
+        "errors": errors,
+        "mean": sum(times) / len(times),
+        "p50": percentile(times, 0.5),
+        "p95": percentile(times, 0.95),
+        "max": times[-1],
+    }
+
+
+# Час одного виклику і його результат; генератор, який повертає обробник, вичитується повністю (без друку).
+def call(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    if isinstance(result, types.GeneratorType):
+        for _ in result:
+            pass
+    return time.perf_counter() - start, result
+
+
+def timed(func, *args) -> float:
+    return call(func, *args)[0]
+
+
+# Команди виконуються в порядку specs (експорт перед імпортом того самого файлу).
+# Команда асистента без аргументів у specs не вимірюється, про це виводиться попередження.
+def bench_commands(commands: dict, specs: dict, book, ctx: Context, iterations: int) -> dict:
+    for command in commands.keys() - specs.keys():
+        print(f"    {command}: no benchmark arguments, skipped", file=sys.stderr)
+
+    results = {}
+    for command, (make_args, count) in specs.items():
+        if command not in commands:
+            continue
+        times, errors = [], 0
+        for i in range(count or iterations):
+            elapsed, result = call(commands[command], make_args(ctx, i), book)
+            times.append(elapsed)
+            errors += is_error(result)
+        if errors:
+            print(f"    {command}: {errors} call(s) returned an error", file=sys.stderr)
+        results[command] = summary(times, errors)
+    return results
+
+
+def run_size(label: str, count: int, iterations: int, seed: int) -> dict:
+    folder = tempfile.mkdtemp(prefix="pa-bench-")
+    try:
+        print(f"[{label}] generating {count} contacts and {count} notes...", file=sys.stderr)
+        contacts = list(data.generate_contacts(count, seed))
+        assistant = PersonalAssistant()
+        assistant.__abook__ = data.build_address_book(contacts)
+        assistant.__nbook__ = data.build_note_book(data.generate_notes(count, seed))
+        ctx = Context(contacts, count, folder)
+
+        results = {"save": summary([timed(assistant.__save__, folder)])}
+
+        # команди виконуються на книгах, відкритих з щойно збережених файлів, як після запуску асистента
+        assistant = PersonalAssistant()
+        results["load"] = summary([timed(assistant.__load__, folder)])
+
+        print(f"[{label}] timing commands...", file=sys.stderr)
+        results.update(bench_commands(assistant.__abook_commands__, ABOOK_COMMANDS, assistant.__abook__, ctx, iterations))
+        results.update(bench_commands(assistant.__nbook_commands__, NBOOK_COMMANDS, assistant.__nbook__, ctx, iterations))
+        results["get_suggestion"] = summary([timed(assistant.get_suggestion, TYPOS[i % len(TYPOS)])
+                                             for i in range(iterations)])
+        results["regex"] = summary([timed(assistant.__regex_search__, [REGEXES[i % len(REGEXES)]])
+                                    for i in range(iterations)])
+        results["save (after commands)"] = summary([timed(assistant.__save__, folder)])
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+# Порівнює медіани з базовою лінією; повертає список регресій.
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for size, commands in results["sizes"].items():
+        base_commands = baseline.get("sizes", {}).get(size, {})
+        for command, stats in commands.items():
+            if command not in base_commands:
+                continue
+            base, current = base_commands[command]["p50"], stats["p50"]
+            ratio = current / base if base else float("inf")
+            marker = ""
+            if ratio > 1 + tolerance and current - base > MIN_DELTA:
+                marker = "  <-- REGRESSION"
+                regressions.append(f"{size} {command}: {base * 1000:.3f} ms -> {current * 1000:.3f} ms (x{ratio:.2f})")
+            print(f"{size:>5} {command:<28} {base * 1000:10.3f} ms {current * 1000:10.3f} ms  x{ratio:5.2f}{marker}")
+    return regressions
+
+
+def print_results(results: dict):
+    for size, commands in results["sizes"].items():
+        print(f"\n{size}: {'command':<28} {'p50':>10} {'p95':>10} {'max':>10}")
+        for command, stats in commands.items():
+            print(f"      {command:<28} {stats['p50'] * 1000:7.3f} ms {stats['p95'] * 1000:7.3f} ms "
+                  f"{stats['max'] * 1000:7.3f} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Personal assistant benchmark suite")
+    parser.add_argument("--sizes", default="1k,100k", help=f"comma-separated book sizes from {', '.join(SIZES)}")
+    parser.add_argument("--iterations", type=int, default=50, help="calls per command (default: 50)")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the synthetic data generator")
+    parser.add_argument("--output", default=str(RESULTS_FILE), help="where to write the JSON results")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="baseline JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown of a median against the baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "sizes": {},
+    }
+    gc.collect()
+    for size in sizes:
+        results["sizes"][size] = run_size(size, SIZES[size], args.iterations, args.seed)
+        gc.collect()
+
+    with open(args.output, "w", encoding="UTF-8") as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create it.")
+        return 0
+
+    with open(args.baseline, encoding="UTF-8") as f:
+        baseline = json.load(f)
+    print(f"\nComparison with baseline from {baseline.get('created', '?')} (p50):")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"    {regression}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
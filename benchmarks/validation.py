@@ -0,0 +1,106 @@
+# Мікробенчмарк валідації полів: масове створення записів з новим рушієм валідації
+# (телефон без регулярного виразу, скомпільований шаблон email, ручний розбір дати, LRU-кеш)
+# проти попередньої валідації (re.match з рядковим шаблоном і datetime.strptime на кожне присвоєння).
+#
+# Запуск з кореня репозиторію:  python -m benchmarks.validation [кількість_записів]
+import gc
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from unittest import mock
+from src import address_book
+from src import general
+from src.address_book import Record, Phone
+
+
+# --- попередня валідація (для порівняння) ---
+
+def legacy_phone(phone: str) -> int:
+    if not (isinstance(phone, str) and re.match(r"^\d{10}$", phone)):
+        raise general.ValidPhoneError("Invalid phone format.")
+    return int(phone)
+
+
+def legacy_email(email: str) -> str:
+    if not (isinstance(email, str) and re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email)):
+        raise general.ValidEmailError("Invalid email format.")
+    return email
+
+
+def legacy_date(value: str) -> int:
+    try:
+        return datetime.strptime(value, "%d.%m.%Y").date().toordinal()
+    except ValueError:
+        raise general.ValidBdayError("Invalid date format. Expect 'DD.MM.YYYY'.")
+
+
+# попередній пошук телефону створював тимчасовий Phone для кожного порівняння
+def legacy_find_phone(self, phone_number: str):
+    phones = list(filter(lambda phone: phone.value == Phone(phone_number).value, self.phones))
+    return phones[0] if len(phones) > 0 else None
+
+
+def legacy_add_phone(self, phone_number: str):
+    if not self.find_phone(phone_number):
+        self.phones.append(Phone(phone_number))
+
+
+# Рядки для створення записів: як при імпорті чи повторі журналу, дати і частина номерів повторюються.
+def generate_rows(count: int, seed: int = 1) -> list[tuple]:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        phones = [f"050{rnd.randrange(10 ** 7):07d}", f"067{i % 5000:07d}"]
+        birthday = f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1960, 2005)}"
+        rows.append((f"Contact{i}", phones, f"contact{i % 2000}@example.com", birthday))
+    return rows
+
+
+def create_records(rows: list[tuple]):
+    for name, phones, email, birthday in rows:
+        record = Record(name)
+        for phone in phones:
+            record.add_phone(phone)
+        record.add_email(email)
+        record.add_birthday(birthday)
+        record.find_phone(phones[-1])
+
+
+# час одного запуску; кеші валідації очищуються перед ним
+def measure(rows: list[tuple]) -> float:
+    for validator in (general.validate_phone, general.validate_email, general.validate_date):
+        validator.cache_clear()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        create_records(rows)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def measure_legacy(rows: list[tuple]) -> float:
+    with mock.patch.multiple(address_book, validate_phone=legacy_phone,
+                             validate_email=legacy_email, validate_date=legacy_date), \
+            mock.patch.object(Record, "find_phone", legacy_find_phone), \
+            mock.patch.object(Record, "add_phone", legacy_add_phone):
+        return measure(rows)
+
+
+# Найкращий час з repeat запусків кожного варіанта. Запуски чергуються, тож короткочасне
+# навантаження машини однаково впливає на обидва варіанти.
+def run(count: int = 100_000, repeat: int = 7) -> dict:
+    rows = generate_rows(count)
+    current = legacy = float("inf")
+    for _ in range(repeat):
+        current = min(current, measure(rows))
+        legacy = min(legacy, measure_legacy(rows))
+
+    print(f"{count} records: legacy {legacy:.3f}s, current {current:.3f}s, speedup x{legacy / current:.1f}")
+    return {"records": count, "legacy": legacy, "current": current, "speedup": legacy / current}
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
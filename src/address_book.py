@@ -1,26 +1,47 @@
 from collections import UserDict
-import re
-from datetime import datetime, timedelta
-from .general import ValidPhoneError
-from .general import ValidEmailError
-from .general import ValidBdayError
+import calendar
+import copy
+import itertools
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from .general import ValidPhoneDuplicateError
+from .general import validate_phone, validate_email, validate_date
+from .general import PAGE_SIZE
+from .indexes import TrigramIndex, NameIndex, SortedKeys, prefix_stop
+from .parallel_search import TextColumn
 
 
 # --- БЛОК ОСНОВНИХ КЛАСІВ AddressBook ---
 
 # Базовий клас для всіх полів (ім'я, телефон, дата народження).
+# Поля мають __slots__ і зберігають значення в компактному вигляді, щоб великі книги займали менше пам'яті.
 class Field:
+    __slots__ = ("__value__",)
 
     def __init__(self, value):
         self.value = value
 
     @property
     def value(self):
-        return self.__value
+        return self.__value__
 
     @value.setter
     def value(self, value):
-        self.__value = value
+        self.__value__ = value
+
+    # Знімок зі слотами приходить як (None, {слот: значення}); у старіших знімках слот мав інше ім'я
+    # (_Field__value, _Phone__value ...), але значення в ньому те саме.
+    # Старі знімки (до __slots__) приходять як __dict__ з публічним значенням поля.
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            for value in state[1].values():
+                self.__value__ = value
+        else:
+            for value in state.values():
+                self.__restore__(value)
+
+    def __restore__(self, value):
+        self.value = value
 
     def __str__(self):
         return str(self.value)
@@ -31,39 +52,58 @@ class Field:
 
 # Клас для зберігання імені. Успадковує Field.
 class Name(Field):
-    pass
+    __slots__ = ()
 
 
 # Клас для зберігання номера телефону. Включає валідацію.
+# Номер зберігається як ціле число (10 цифр вміщуються в 64 біти).
 class Phone(Field):
+    __slots__ = ()
 
     @property
     def value(self):
-        return self.__value
+        return f"{self.__value__:010d}"
 
     @value.setter
     def value(self, phone: str):
         # Валідація номера телефону (має бути 10 цифр).
-        if not (isinstance(phone, str) and re.match(r"^\d{10}$", phone)):
-            raise ValidPhoneError("Invalid phone format.")
-        self.__value = phone
+        self.__value__ = validate_phone(phone)
+
+    # номер як ціле число - для порівняння без форматування рядка
+    @property
+    def number(self) -> int:
+        return self.__value__
+
+    # телефон з уже перевіреного номера (validate_phone) без повторної валідації
+    @classmethod
+    def from_number(cls, number: int) -> "Phone":
+        phone = object.__new__(cls)
+        phone.__value__ = number
+        return phone
 
 
 # Клас для зберігання дати народження. Включає валідацію.
+# Дата зберігається як порядковий номер дня (date.toordinal).
 class Birthday(Field):
+    __slots__ = ()
 
     @property
     def value(self):
-        return self.__value
+        return date.fromordinal(self.__value__)
 
     @value.setter
     def value(self, value: str):
-        # Валідація дати. Приймає рядок 'DD.MM.YYYY' і зберігає як об'єкт date.
-        try:
-            parsed_date = datetime.strptime(value, "%d.%m.%Y").date()
-            self.__value = parsed_date
-        except ValueError:
-            raise ValidBdayError("Invalid date format. Expect 'DD.MM.YYYY'.")
+        # Валідація дати. Приймає рядок 'DD.MM.YYYY' і зберігає порядковий номер дня.
+        self.__value__ = validate_date(value)
+
+    # у старих знімках дата народження зберігалась як об'єкт date
+    def __restore__(self, value):
+        self.__value__ = value.toordinal()
+
+    # порядковий номер дня (date.toordinal) - без створення об'єкта date
+    @property
+    def ordinal(self) -> int:
+        return self.__value__
 
     def __str__(self):
         return self.value.strftime("%d.%m.%Y")
@@ -71,25 +111,25 @@ class Birthday(Field):
 
 # Клас для зберігання email. Включає валідацію.
 class Email(Field):
+    __slots__ = ()
 
     @property
     def value(self):
-        return self.__value
+        return self.__value__
 
     @value.setter
     def value(self, email: str):
-        if not (isinstance(email, str) and re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email)):
-            raise ValidEmailError("Invalid email format.")
-        self.__value = email
+        self.__value__ = validate_email(email)
 
 
 # Клас для зберігання адреси.
 class Address(Field):
-    pass
+    __slots__ = ()
 
 
 # Клас для зберігання запису про контакт.
 class Record:
+    __slots__ = ("name", "phones", "birthday", "email", "address", "book", "__weakref__")
 
     def __init__(self, name: str):
         self.name = Name(name)
@@ -97,34 +137,112 @@ class Record:
         self.birthday = None
         self.email = None
         self.address = None
+        self.book = None  # книга, в якій зберігається запис (для оновлення її індексів)
+
+    # Поля запису не змінюються на місці, а замінюються новими, тож копія запису (для історії змін)
+    # спільно використовує з ним усі поля і має лише власний список телефонів.
+    def __copy__(self) -> "Record":
+        record = object.__new__(Record)
+        record.name = self.name
+        record.phones = list(self.phones)
+        record.birthday = self.birthday
+        record.email = self.email
+        record.address = self.address
+        record.book = None
+        return record
+
+    # перед зміною (вже перевірених значень) дає книзі зберегти попередній стан запису для undo
+    def __changing__(self):
+        if self.book is not None:
+            self.book.remember(self.name.value)
+
+    # повідомляє книгу про зміну запису, щоб вона оновила свої індекси
+    def __changed__(self):
+        if self.book is not None:
+            self.book.reindex(self)
 
     def add_phone(self, phone_number: str):
-        if not self.find_phone(phone_number):
-            phone = Phone(phone_number)
+        number = validate_phone(phone_number)
+        if self.__phone_by_number__(number) is None:
+            phone = Phone.from_number(number)
+            if self.book is not None:
+                self.book.check_phone(self, phone.value)
+            self.__changing__()
             self.phones.append(phone)
+            self.__changed__()
 
     def add_birthday(self, bday: str):
-        self.birthday = Birthday(bday)
+        birthday = Birthday(bday)
+        self.__changing__()
+        self.birthday = birthday
+        self.__changed__()
 
     def add_email(self, email: str):
-        self.email = Email(email)
+        email = Email(email)
+        self.__changing__()
+        self.email = email
+        self.__changed__()
 
     def add_address(self, address: str):
-        self.address = Address(address)
+        address = Address(address)
+        self.__changing__()
+        self.address = address
+        self.__changed__()
 
     def remove_phone(self, phone_number: str):
-        phone_to_remove = self.find_phone(Phone(phone_number).value)  # use Phone(phone_number) for validating phone number
+        phone_to_remove = self.find_phone(phone_number)
         if phone_to_remove:
+            self.__changing__()
             self.phones.remove(phone_to_remove)
+            self.__changed__()
 
     def edit_phone(self, old_phone_number: str, new_phone_number: str):
-        phone_to_edit = self.find_phone(Phone(old_phone_number).value)  # use Phone(old_phone_number) for validating phone number
+        phone_to_edit = self.find_phone(old_phone_number)
         if phone_to_edit is not None:
-            phone_to_edit.value = new_phone_number
+            new_phone = Phone(new_phone_number)
+            if self.book is not None:
+                self.book.check_phone(self, new_phone.value)
+            self.__changing__()
+            self.phones[self.phones.index(phone_to_edit)] = new_phone
+            self.__changed__()
 
     def find_phone(self, phone_number: str) -> Phone | None:
-        phones = list(filter(lambda phone: phone.value == Phone(phone_number).value, self.phones))  # use Phone(phone_number) for validating phone number
-        return phones[0] if len(phones) > 0 else None
+        return self.__phone_by_number__(validate_phone(phone_number))
+
+    def __phone_by_number__(self, number: int) -> Phone | None:
+        for phone in self.phones:
+            if phone.number == number:
+                return phone
+        return None
+
+    # тексти полів запису, за якими ведеться пошук (у нижньому регістрі)
+    def search_texts(self) -> list[str]:
+        texts = [self.name.value.lower()]
+        if self.email:
+            texts.append(self.email.value.lower())
+        if self.address:
+            texts.append(self.address.value.lower())
+        texts.extend(phone.value for phone in self.phones)
+        return texts
+
+    # текст запису для пошуку регулярним виразом: поля в початковому вигляді, кожне з нового рядка
+    def full_text(self) -> str:
+        fields = [self.name.value, *(phone.value for phone in self.phones)]
+        fields += [str(field) for field in (self.email, self.birthday, self.address) if field]
+        return "\n".join(fields)
+
+    # перевіряє частковий збіг запиту (у нижньому регістрі) з будь-яким полем запису
+    def matches(self, query_lower: str) -> bool:
+        return any(query_lower in text for text in self.search_texts())
+
+    # запис у книзі зберігається без посилання на книгу — його відновлює сама книга
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in self.__slots__ if key not in ("book", "__weakref__")}
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+        self.book = None
 
     def get_table_row(self) -> list[str]:
         phones_str = ", ".join(str(p) for p in self.phones) or "Not set"
@@ -157,87 +275,359 @@ class Record:
 # Клас для зберігання адресної книги.
 class AddressBook(UserDict):
 
+    # Номер останнього запису журналу, врахованого у знімку книги.
+    journal_seq: int = 0
+    # Чи може один номер телефону належати лише одному контакту.
+    unique_phones: bool = False
+
+    def __init__(self, *args, **kwargs):
+        self.__build_indexes__()
+        super().__init__(*args, **kwargs)
+
+    # Індекси (атрибути виду __name__) будуються ліниво — при першому запиті, що їх потребує,
+    # щоб відкриття великої книги не вимагало декодування всіх записів.
+    def __build_indexes__(self):
+        self.__indexed__ = False
+        self.__search_index__ = TrigramIndex()
+        # індекс телефонів будується окремо від триграмного: пошук за номером і перевірка
+        # унікальності не чекають на індексування текстів усіх контактів
+        self.__phones_indexed__ = False
+        self.__birthdays_indexed__ = False  # так само окремо - індекси днів народження
+        self.__record_birthdays__: dict[str, tuple[int, int]] = {}  # ім'я -> (місяць, день) народження
+        self.__birthday_index__: dict[tuple[int, int], set[str]] = {}  # (місяць, день) -> імена
+        self.__record_phones__: dict[str, frozenset[str]] = {}  # ім'я -> проіндексовані телефони
+        self.__phone_index__: dict[str, set[str]] = {}  # телефон -> імена власників
+        self.__name_index__: NameIndex | None = None  # імена для нечіткого пошуку (будується з ключів книги)
+        self.__text_column__: TextColumn | None = None  # тексти записів для пошуку регулярним виразом
+        self.__sorted_names__: SortedKeys | None = None  # імена за алфавітом (будується з ключів книги)
+        self.__birthday_order__: SortedKeys | None = None  # (місяць, день, ім'я) за календарем
+        self.__changes__: dict | None = None  # попередні стани записів, змінених поточною командою (див. history)
+
+    def __ensure_indexes__(self):
+        if not self.__indexed__:
+            self.__indexed__ = True
+            for record in self.data.values():
+                self.__search_index__.update(record.name.value, record.search_texts())
+        self.__ensure_phone_index__()
+        self.__ensure_birthday_index__()
+
+    def __ensure_phone_index__(self):
+        if not self.__phones_indexed__:
+            self.__phones_indexed__ = True
+            phone_index = self.__phone_index__
+            for name, numbers in self.__column__("phones", lambda record: [phone.number for phone in record.phones]):
+                if numbers:
+                    phones = self.__record_phones__[name] = frozenset(map("{:010d}".format, numbers))
+                    for phone in phones:
+                        phone_index.setdefault(phone, set()).add(name)
+
+    # Індекс (місяць, день) -> імена для днів народження. Книга з файлу читає лише колонку дат.
+    def __ensure_birthday_index__(self):
+        if not self.__birthdays_indexed__:
+            self.__birthdays_indexed__ = True
+            birthday_index = self.__birthday_index__
+            month_days: dict[int, tuple[int, int]] = {}  # порядковий номер дня -> (місяць, день)
+            for name, ordinal in self.__column__("birthdays",
+                                                 lambda record: record.birthday.ordinal if record.birthday else 0):
+                if ordinal:
+                    month_day = month_days.get(ordinal)
+                    if month_day is None:
+                        day = date.fromordinal(ordinal)
+                        month_day = month_days[ordinal] = (day.month, day.day)
+                    self.__record_birthdays__[name] = month_day
+                    birthday_index.setdefault(month_day, set()).add(name)
+
+    # Масове додавання записів (імпорт). Триграмний індекс, індекс імен для нечіткого пошуку, впорядковані
+    # імена і дні народження та колонку текстів дорожче оновлювати на кожен запис, ніж побудувати заново,
+    # тож на час блоку вони скидаються і будуються першим запитом, що їх потребує (як після відкриття книги).
+    # Індекси телефонів (потрібний і для перевірки унікальності) та днів народження оновлюються як завжди.
+    @contextmanager
+    def bulk(self):
+        if self.__text_column__ is not None:
+            self.__text_column__.close()
+        self.__indexed__ = False
+        self.__search_index__ = TrigramIndex()
+        self.__name_index__ = None
+        self.__text_column__ = None
+        self.__sorted_names__ = None
+        self.__birthday_order__ = None
+        yield
+
+    # Пари (ім'я, значення поля) всіх контактів. Книга з файлу читає з блоків лише колонку поля,
+    # не декодуючи записи (див. storage.LazyRecords.column); value(запис) дає значення з запису.
+    def __column__(self, name: str, value):
+        if hasattr(self.data, "column"):
+            return self.data.column(name, value)
+        return ((key, value(record)) for key, record in self.data.items())
+
+    # індекси не зберігаються у знімку — вони перебудовуються при потребі після завантаження
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items()
+                if not (key.startswith("__") and key.endswith("__"))}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__build_indexes__()
+        for record in self.data.values():
+            record.book = self
+
+    def __setitem__(self, name: str, record: Record):
+        for phone in record.phones:
+            self.check_phone(record, phone.value)
+        self.remember(name)
+        if name in self.data:
+            del self[name]
+        self.data[name] = record
+        record.book = self
+        self.__index_record__(record)
+        if self.__name_index__ is not None:
+            self.__name_index__.add(name)
+        if self.__sorted_names__ is not None:
+            self.__sorted_names__.add(name)
+        if self.__text_column__ is not None:
+            self.__text_column__.add(name, record.full_text())
+
+    def __delitem__(self, name: str):
+        self.remember(name)
+        record = self.data.pop(name)
+        record.book = None
+        if self.__name_index__ is not None:
+            self.__name_index__.remove(name)
+        if self.__sorted_names__ is not None:
+            self.__sorted_names__.remove(name)
+        if self.__text_column__ is not None:
+            self.__text_column__.remove(name)
+        if self.__indexed__:
+            self.__search_index__.remove(name)
+        if self.__birthdays_indexed__:
+            self.__index_birthday__(name, None)
+        if self.__phones_indexed__:
+            self.__index_phones__(name, frozenset())
+
+    # Якщо книга записує версію (див. history), зберігає копію запису name (None - запису немає)
+    # перед його першою зміною в цій версії. Незмінені записи копіюються не будуть.
+    def remember(self, name: str):
+        changes = self.__changes__
+        if changes is not None and name not in changes:
+            record = self.data.get(name)
+            changes[name] = copy.copy(record) if record is not None else None
+
+    # оновлює книгу після зміни запису: записує його назад у сховище книги
+    # (для сховищ поза пам'яттю) і оновлює індекси
+    def reindex(self, record: Record):
+        name = record.name.value
+        if self.data.get(name) is not record:
+            return
+        self.data[name] = record
+        self.__index_record__(record)
+        if self.__text_column__ is not None:
+            self.__text_column__.add(name, record.full_text())
+
+    def __index_record__(self, record: Record):
+        name = record.name.value
+        if self.__indexed__:
+            self.__search_index__.update(name, record.search_texts())
+        if self.__birthdays_indexed__:
+            bday = record.birthday.value if record.birthday else None
+            self.__index_birthday__(name, (bday.month, bday.day) if bday else None)
+        if self.__phones_indexed__:
+            self.__index_phones__(name, frozenset(phone.value for phone in record.phones))
+
+    def __index_phones__(self, name: str, phones: frozenset[str]):
+        old_phones = self.__record_phones__.get(name, frozenset())
+        for phone in old_phones - phones:
+            names = self.__phone_index__[phone]
+            names.discard(name)
+            if not names:
+                del self.__phone_index__[phone]
+        for phone in phones - old_phones:
+            self.__phone_index__.setdefault(phone, set()).add(name)
+
+        if phones:
+            self.__record_phones__[name] = phones
+        else:
+            self.__record_phones__.pop(name, None)
+
+    # імена контактів, яким належить номер телефону
+    def __phone_owners__(self, phone_number: str) -> set[str]:
+        self.__ensure_phone_index__()
+        return self.__phone_index__.get(phone_number, set())
+
+    # при увімкненій унікальності номер не може належати іншому контакту
+    def check_phone(self, record: Record, phone_number: str):
+        if self.unique_phones and self.__phone_owners__(phone_number) - {record.name.value}:
+            raise ValidPhoneDuplicateError()
+
+    # Пошук контактів за точним номером телефону через індекс телефон -> імена: O(1).
+    def find_by_phone(self, phone_number: str) -> list[Record]:
+        phone_number = f"{validate_phone(phone_number):010d}"
+        return [self.data[name] for name in sorted(self.__phone_owners__(phone_number))]
+
+    def __index_birthday__(self, name: str, month_day: tuple[int, int] | None):
+        old_month_day = self.__record_birthdays__.get(name)
+        if old_month_day == month_day:
+            return
+
+        if old_month_day is not None:
+            names = self.__birthday_index__[old_month_day]
+            names.discard(name)
+            if not names:
+                del self.__birthday_index__[old_month_day]
+            del self.__record_birthdays__[name]
+            if self.__birthday_order__ is not None:
+                self.__birthday_order__.remove((*old_month_day, name))
+
+        if month_day is not None:
+            self.__birthday_index__.setdefault(month_day, set()).add(name)
+            self.__record_birthdays__[name] = month_day
+            if self.__birthday_order__ is not None:
+                self.__birthday_order__.add((*month_day, name))
+
+    # імена контактів, чий день народження святкується в цю дату
+    # (народжені 29 лютого у невисокосний рік святкують 28 лютого)
+    def __birthdays_on__(self, day: date) -> set[str]:
+        names = self.__birthday_index__.get((day.month, day.day), set())
+        if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+            names = names | self.__birthday_index__.get((2, 29), set())
+        return names
+
     def add_record(self, record: Record):
-        self.data[record.name.value] = record
+        self[record.name.value] = record
 
     def find(self, name: str) -> Record | None:
         return self.data.get(name)
 
     def delete(self, name: str):
-        del self.data[name]
-
+        del self[name]
+
+    # Імена, схожі на query, найближчі першими: кожне слово запиту має збігтися зі словом імені
+    # з урахуванням опечаток, транслітерації (Олена/Olena) і звучання (Serhii/Sergey).
+    # Використовується командою нечіткого пошуку і для підказки, коли find не знайшов контакт.
+    def find_similar(self, query: str, count: int = 3) -> list[str]:
+        if self.__name_index__ is None:
+            self.__name_index__ = NameIndex(self.data.keys())
+        return [name for _, name in self.__name_index__.search(query, count)]
+
+    # Імена контактів за алфавітом від first до last включно (обидві межі необов'язкові).
+    # last порівнюється як префікс: last="M" включає і "Mary". Початок діапазону знаходиться
+    # двійковим пошуком у впорядкованому індексі імен, тож запит коштує O(log n + k).
+    def iter_names(self, first: str | None = None, last: str | None = None):
+        if self.__sorted_names__ is None:
+            self.__sorted_names__ = SortedKeys(self.data.keys())
+        return self.__sorted_names__.irange(first, prefix_stop(last) if last else None)
+
+    # Імена, що починаються з prefix, за алфавітом (не більше limit) - для автодоповнення.
+    def complete_name(self, prefix: str, limit: int | None = None) -> list[str]:
+        return list(itertools.islice(self.iter_names(prefix, prefix), limit))
+
+    # Імена за днем народження в календарному порядку (місяць, день, ім'я), потім контакти
+    # без дня народження за алфавітом. first/last обмежують імена так само, як в iter_names.
+    def iter_names_by_birthday(self, first: str | None = None, last: str | None = None):
+        self.__ensure_birthday_index__()
+        if self.__birthday_order__ is None:
+            self.__birthday_order__ = SortedKeys(
+                (*month_day, name) for name, month_day in self.__record_birthdays__.items())
+
+        stop = prefix_stop(last) if last else None
+        for _, _, name in self.__birthday_order__.irange():
+            if (first is None or name >= first) and (stop is None or name < stop):
+                yield name
+        for name in self.iter_names(first, last):
+            if name not in self.__record_birthdays__:
+                yield name
+
+    # Дні народження на найближчі days днів (з переносом вихідних на понеділок).
+    # Обходяться лише дні вікна, а контакти на кожен день беруться з індексу (місяць, день).
     def get_upcoming_birthdays(self, days: int = 7) -> list:
+        self.__ensure_birthday_index__()
         result = []
-        curr_date: datetime.date = datetime.today().date()
-        user_bday_date_corrected: datetime.date = None
-
-        for key, record in self.data.items():
-            if record.birthday is None:
+        curr_date: date = datetime.today().date()
+        congratulated: set[str] = set()
+
+        # вікно довше за рік обмежуємо роком — кожен день народження в ньому вже є
+        for offset in range(min(days, 365) + 1):
+            bday_date = curr_date + timedelta(days=offset)
+            names = self.__birthdays_on__(bday_date) - congratulated
+            if not names:
                 continue
 
-            user_bday_date: datetime.date = record.birthday.value
-
-            if curr_date.month == 12 and user_bday_date.month == 1:
-                user_bday_date_corrected = user_bday_date.replace(year=curr_date.year+1)
-            else:
-                user_bday_date_corrected = user_bday_date.replace(year=curr_date.year)
+            if bday_date.weekday() > 4:
+                bday_date += timedelta(days=7-bday_date.weekday())
 
-            time_delta = user_bday_date_corrected - curr_date
-            if 0 <= time_delta.days <= days:
-                if user_bday_date_corrected.weekday() > 4:
-                    increment_days = timedelta(days=7-user_bday_date_corrected.weekday())
-                    user_bday_date_corrected += increment_days
+            if (bday_date - curr_date).days > days:
+                continue
 
-                time_delta = user_bday_date_corrected - curr_date
-                if time_delta.days >= 0 and time_delta.days <= days:
-                    result.append(f"{record.name.value}'s birthday {user_bday_date_corrected.strftime('%d.%m.%Y')}")
+            for name in sorted(names):
+                congratulated.add(name)
+                result.append(f"{name}'s birthday {bday_date.strftime('%d.%m.%Y')}")
         return result
 
     # Пошук контактів за частковим збігом в імені,
     # телефонах, email або адресі (нечутливий до регістру).
+    # Триграмний індекс відбирає кандидатів, і перевіряються лише вони. Результати впорядковані за іменем.
     def search(self, query: str) -> list[Record]:
-        results = []
+        self.__ensure_indexes__()
         query_lower = query.lower()
+        names = self.__search_index__.candidates(query_lower)
+        if names is None:
+            names = self.data.keys()
+
+        return [self.data[name] for name in sorted(names) if self.data[name].matches(query_lower)]
+
+    # Записи, в тексті яких (full_text) є збіг з регулярним виразом pattern, у порядку книги.
+    # Складати full_text кожного запису дорожче, ніж шукати в ньому, тож перший пошук заодно складає
+    # тексти в колонку, а наступні шукають у колонці: великі книги на кількох ядрах - пулом процесів
+    # (див. parallel_search), решта - в поточному процесі.
+    def search_regex(self, pattern: str, flags: int = 0) -> list[Record]:
+        column = self.__text_column__
+        if column is None or column.stale:
+            if column is not None:
+                column.close()
+            column = self.__text_column__ = TextColumn()
+            names = set(column.fill(((name, record.full_text()) for name, record in self.data.items()),
+                                    pattern, flags))
+        else:
+            names = set(column.search(pattern, flags))
+        return [self.data[name] for name in self.data if name in names]
+
+    # Записи книги з offset (не більше limit) без декодування пропущених записів.
+    # names задає порядок імен (наприклад, iter_names), за замовчуванням - порядок книги.
+    def iter_records(self, offset: int = 0, limit: int | None = None, names=None):
+        stop = None if limit is None else offset + limit
+        for name in itertools.islice(iter(self.data) if names is None else names, offset, stop):
+            yield self.data[name]
+
+    # Потоково будує таблицю контактів рядок за рядком.
+    # Ширина колонок береться з перших sample записів і далі лише збільшується,
+    # тож перші рядки з'являються одразу, без обходу всієї книги.
+    def iter_table(self, records, sample: int = PAGE_SIZE):
+        headers = ["Name", "Phone", "Email", "Birthday", "Address"]
+        records = iter(records)
+        rows = [record.get_table_row() for record in itertools.islice(records, sample)]
+        col_widths = [len(h) for h in headers]
 
-        for record in self.data.values():
-            if query_lower in record.name.value.lower():
-                results.append(record)
-                continue
-
-            if record.email and query_lower in record.email.value.lower():
-                results.append(record)
-                continue
-
-            if record.address and query_lower in record.address.value.lower():
-                results.append(record)
-                continue
+        def format_row(items):
+            for i, cell in enumerate(items):
+                col_widths[i] = max(col_widths[i], len(cell))
+            return " | ".join(item.ljust(col_widths[i]) for i, item in enumerate(items))
 
-            for phone in record.phones:
-                if query_lower in phone.value:
-                    results.append(record)
-                    break
+        for row in rows:
+            format_row(row)
 
-        return results
+        yield ""
+        yield format_row(headers)
+        yield "-+-".join("-" * w for w in col_widths)
+        for row in rows:
+            yield format_row(row)
+        for record in records:
+            yield format_row(record.get_table_row())
+        yield ""
 
     def __str__(self):
         if not self.data:
             return "Address book is empty."
 
-        headers = ["Name", "Phone", "Email", "Birthday", "Address"]
-        rows = [record.get_table_row() for record in self.data.values()]
-        col_widths = [len(h) for h in headers]
-        for row in rows:
-            for i, cell in enumerate(row):
-                col_widths[i] = max(col_widths[i], len(cell))
-
-        def format_row(items):
-            return " | ".join(item.ljust(col_widths[i]) for i, item in enumerate(items))
-
-        header_str = format_row(headers)
-        separator_str = "-+-".join("-" * w for w in col_widths)
-        row_strings = [format_row(row) for row in rows]
-
-        return f"\n{header_str}\n{separator_str}\n" + "\n".join(row_strings) + "\n"
+        return "\n".join(self.iter_table(self.data.values(), sample=len(self.data)))
 
     #  def __str__(self):
     #    if not self.data:
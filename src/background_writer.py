@@ -0,0 +1,49 @@
+# тут фоновий запис змін книг на диск, щоб користувач не чекав на дискові операції
+import sys
+import threading
+import time
+
+
+# Фоновий потік, який викликає flush() не пізніше ніж через delay секунд після першої
+# незаписаної зміни. Усі зміни, що надійшли за цей час, записуються одним викликом,
+# тож при збої втрачається не більше ніж одне вікно delay.
+class BackgroundWriter:
+
+    def __init__(self, flush, delay: float):
+        self.flush = flush
+        self.delay = delay
+        self.__condition__ = threading.Condition()
+        self.__due__ = None  # коли треба записати незаписані зміни (time.monotonic)
+        self.__closed__ = False
+        self.__thread__ = threading.Thread(target=self.__run__, name="book-writer", daemon=True)
+        self.__thread__.start()
+
+    # повідомляє про нову зміну; запис відбудеться після закінчення поточного вікна
+    def notify(self):
+        with self.__condition__:
+            if self.__due__ is None:
+                self.__due__ = time.monotonic() + self.delay
+                self.__condition__.notify()
+
+    # записує все незаписане і зупиняє потік
+    def close(self):
+        with self.__condition__:
+            self.__closed__ = True
+            self.__condition__.notify()
+        self.__thread__.join()
+
+    def __run__(self):
+        closed = False
+        while not closed:
+            with self.__condition__:
+                while not self.__closed__ and (self.__due__ is None or self.__due__ > time.monotonic()):
+                    self.__condition__.wait(None if self.__due__ is None else self.__due__ - time.monotonic())
+                closed = self.__closed__
+                self.__due__ = None
+            self.__write__()
+
+    def __write__(self):
+        try:
+            self.flush()
+        except Exception as e:  # потік не має зупинятись: незаписані зміни лишаються в журналі наступного запису
+            print(f"\nSaving changes failed: {type(e).__name__} {e}", file=sys.stderr)
@@ -0,0 +1,192 @@
+# тут колонкове кодування блоків записів для файлу книги (див. storage)
+# Блок - це кілька сотень записів, поля яких лежать колонками: спершу всі імена, потім усі телефони
+# і т.д. Однотипні значення поруч стискаються набагато краще, ніж окремі pickle кожного запису,
+# а декодування не викликає валідацію полів - значення у файлі вже перевірені при додаванні.
+import struct
+import sys
+from array import array
+from .address_book import AddressBook, Record, Name, Phone, Birthday, Email, Address
+from .note_book import NoteBook, Note, NoteContent, Tag
+
+SECTION = struct.Struct("<I")  # довжина наступної колонки в байтах
+NONE = 0xFFFFFFFF               # довжина рядка, що позначає відсутнє значення
+
+
+# Колонки чисел зберігаються в порядку байтів little-endian незалежно від платформи.
+def pack_array(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack_array(typecode: str, raw: bytes) -> array:
+    values = array(typecode, raw)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+# Колонка лічильників (телефонів чи тегів запису): завжди 32-бітні, по одному на кожен із count записів.
+def unpack_counts(raw: bytes, count: int) -> array:
+    if len(raw) != count * 4:
+        raise ValueError(f"count column of {len(raw)} bytes for {count} records")
+    return unpack_array("I", raw)
+
+
+# Колонка рядків: довжини (NONE для None) і всі рядки UTF-8 підряд.
+def pack_strings(values) -> list[bytes]:
+    lengths = array("I")
+    chunks = []
+    for value in values:
+        if value is None:
+            lengths.append(NONE)
+        else:
+            raw = value.encode("UTF-8")
+            lengths.append(len(raw))
+            chunks.append(raw)
+    return [pack_array(lengths), b"".join(chunks)]
+
+
+def unpack_strings(lengths: bytes, text: bytes) -> list[str | None]:
+    values = []
+    position = 0
+    for length in unpack_array("I", lengths):
+        if length == NONE:
+            values.append(None)
+        else:
+            values.append(text[position:position + length].decode("UTF-8"))
+            position += length
+    return values
+
+
+def join_sections(sections: list[bytes]) -> bytes:
+    return b"".join(SECTION.pack(len(section)) + section for section in sections)
+
+
+def split_sections(payload: bytes) -> list[bytes]:
+    sections = []
+    position = 0
+    while position < len(payload):
+        size, = SECTION.unpack_from(payload, position)
+        position += SECTION.size
+        sections.append(payload[position:position + size])
+        position += size
+    return sections
+
+
+# Поле зі збереженого значення без повторної валідації.
+def restore(field_class, value):
+    field = object.__new__(field_class)
+    field.__value__ = value
+    return field
+
+
+# Контакти: імена, кількість телефонів (32-бітні) і номери (64-бітні цілі), дати народження (порядковий
+# номер дня, 0 - немає), email та адреси.
+class ContactsCodec:
+    code = b"c"
+
+    @staticmethod
+    def encode(records: list[Record]) -> bytes:
+        phone_counts = array("I")
+        phones = array("Q")
+        birthdays = array("i")
+        for record in records:
+            phone_counts.append(len(record.phones))
+            phones.extend(phone.number for phone in record.phones)
+            birthdays.append(record.birthday.ordinal if record.birthday else 0)
+
+        return join_sections([
+            *pack_strings(record.name.value for record in records),
+            pack_array(phone_counts),
+            pack_array(phones),
+            pack_array(birthdays),
+            *pack_strings(record.email.value if record.email else None for record in records),
+            *pack_strings(record.address.value if record.address else None for record in records),
+        ])
+
+    @staticmethod
+    def decode(payload: bytes) -> list[Record]:
+        name_lengths, names, phone_counts, phones, birthdays, email_lengths, emails, address_lengths, addresses = \
+            split_sections(payload)
+        names = unpack_strings(name_lengths, names)
+        phone_counts = unpack_counts(phone_counts, len(names))
+        phones = iter(unpack_array("Q", phones))
+        birthdays = unpack_array("i", birthdays)
+        emails = unpack_strings(email_lengths, emails)
+        addresses = unpack_strings(address_lengths, addresses)
+
+        records = []
+        for number, name in enumerate(names):
+            record = object.__new__(Record)
+            record.name = restore(Name, name)
+            record.phones = [restore(Phone, next(phones)) for _ in range(phone_counts[number])]
+            record.birthday = restore(Birthday, birthdays[number]) if birthdays[number] else None
+            record.email = restore(Email, emails[number]) if emails[number] is not None else None
+            record.address = restore(Address, addresses[number]) if addresses[number] is not None else None
+            record.book = None
+            records.append(record)
+        return records
+
+    # Колонка телефонів блоку без декодування записів: номери (цілі) кожного запису.
+    @staticmethod
+    def phones(payload: bytes) -> list[list[int]]:
+        name_lengths, _, phone_counts, phones, *_ = split_sections(payload)
+        phones = unpack_array("Q", phones)
+        result = []
+        position = 0
+        for count in unpack_counts(phone_counts, len(name_lengths) // 4):
+            result.append(phones[position:position + count].tolist())
+            position += count
+        return result
+
+    # Колонка дат народження блоку: порядкові номери днів (0 - немає).
+    @staticmethod
+    def birthdays(payload: bytes) -> array:
+        return unpack_array("i", split_sections(payload)[4])
+
+
+# Нотатки: id, тексти, кількість тегів і самі теги.
+class NotesCodec:
+    code = b"n"
+
+    @staticmethod
+    def encode(notes: list[Note]) -> bytes:
+        ids = array("q", (note.id for note in notes))
+        tag_counts = array("I", (len(note.tags) for note in notes))
+        return join_sections([
+            pack_array(ids),
+            *pack_strings(note.content.value for note in notes),
+            pack_array(tag_counts),
+            *pack_strings(tag.value for note in notes for tag in note.tags),
+        ])
+
+    @staticmethod
+    def decode(payload: bytes) -> list[Note]:
+        ids, content_lengths, contents, tag_counts, tag_lengths, tags = split_sections(payload)
+        contents = unpack_strings(content_lengths, contents)
+        ids = unpack_array("q", ids)
+        tag_counts = unpack_counts(tag_counts, len(ids))
+        tags = iter(unpack_strings(tag_lengths, tags))
+
+        notes = []
+        for number, note_id in enumerate(ids):
+            note = object.__new__(Note)
+            note.id = note_id
+            note.content = restore(NoteContent, contents[number])
+            note.tags = [restore(Tag, next(tags)) for _ in range(tag_counts[number])]
+            note.book = None
+            notes.append(note)
+        return notes
+
+
+CODECS = {codec.code: codec for codec in (ContactsCodec, NotesCodec)}
+
+
+def codec_for(book):
+    if isinstance(book, AddressBook):
+        return ContactsCodec
+    if isinstance(book, NoteBook):
+        return NotesCodec
+    raise TypeError(f"No snapshot codec for {type(book).__name__}")
@@ -0,0 +1,171 @@
+# тут книги багатьох користувачів (орендарів) для серверного режиму
+# Книги кожного орендаря лежать в окремій папці (<корінь>/<id>/abook.dat, nbook.dat, journal.log
+# або books.db). Менеджер тримає в пам'яті лише нещодавно використані пари книг (LRU): коли
+# оцінка зайнятої пам'яті перевищує бюджет, найдавніше використані книги зберігаються і закриваються.
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from .address_book import AddressBook
+from .storage import LazyRecords
+
+MEMORY_BUDGET = 512 * 1024 * 1024
+MAX_OPEN = 256  # відкриті книги тримають файли (mmap), тож їхня кількість обмежена окремо від пам'яті
+TENANT_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")  # id орендаря - ім'я його папки
+
+# Приблизна пам'ять на запис (виміряно tracemalloc на згенерованих книгах): декодований запис
+# і його частка в індексах книги (найбільше займають триграми контактів).
+RECORD_BYTES = 800
+CONTACT_INDEX_BYTES = 8 * 1024
+NOTE_INDEX_BYTES = 4 * 1024
+
+
+# Папка книг орендаря tenant у корені root.
+def tenant_folder(root: str, tenant: str) -> str:
+    if not TENANT_PATTERN.fullmatch(tenant):
+        raise ValueError(f"Invalid tenant id: {tenant}")
+    return os.path.join(root, tenant)
+
+
+# Оцінка пам'яті книги без обходу записів: книги з файлу чи бази тримають лише декодовані записи.
+def estimate_size(book) -> int:
+    loaded = getattr(book.data, "__loaded__", book.data)
+    size = len(loaded) * RECORD_BYTES
+    if book.__indexed__:
+        size += len(book.data) * (CONTACT_INDEX_BYTES if isinstance(book, AddressBook) else NOTE_INDEX_BYTES)
+    return size
+
+
+# Завантажені книги одного орендаря. Команди орендаря виконуються по одній під lock,
+# команди різних орендарів - одночасно.
+class TenantBooks:
+
+    def __init__(self, tenant: str, folder: str, abook, nbook, journal):
+        self.tenant = tenant
+        self.folder = folder
+        self.abook = abook
+        self.nbook = nbook
+        self.journal = journal
+        self.lock = threading.Lock()
+        self.users = 0  # скільки команд зараз працює з книгами (такі книги не витісняються)
+        self.size = 0
+
+    def estimate_size(self) -> int:
+        return estimate_size(self.abook) + estimate_size(self.nbook)
+
+    # Закриває файли книг (mmap) або з'єднання з базою одразу, не чекаючи, поки збирач сміття
+    # звільнить книги (записи і книга посилаються одне на одного).
+    def close(self):
+        for book in (self.abook, self.nbook):
+            if isinstance(book.data, LazyRecords):
+                book.data.close()
+        conn = getattr(self.abook.data, "conn", None)
+        if conn is not None:
+            conn.close()
+
+
+class BookManager:
+
+    # load(folder) -> (abook, nbook, journal) відкриває книги папки,
+    # save(books) зберігає книги орендаря (TenantBooks) повним знімком.
+    def __init__(self, root: str, load, save, memory_budget: int = MEMORY_BUDGET, max_open: int = MAX_OPEN):
+        self.root = root
+        self.load = load
+        self.save = save
+        self.memory_budget = memory_budget
+        self.max_open = max_open
+        self.__condition__ = threading.Condition()
+        self.__open__: OrderedDict[str, TenantBooks] = OrderedDict()  # від найдавніше використаних
+        self.__closing__: dict[str, TenantBooks] = {}  # витіснені книги, що саме зберігаються
+        self.__loading__: set[str] = set()  # орендарі, чиї книги саме завантажуються
+        self.__size__ = 0
+
+    def folder(self, tenant: str) -> str:
+        return tenant_folder(self.root, tenant)
+
+    # Книги орендаря на час блоку: завантажуються при потребі і не витісняються, доки блок триває.
+    # Книги читаються з диска поза спільним замком (поки орендар у __loading__, інші запити того ж
+    # орендаря чекають), тож повільне завантаження одного орендаря не зупиняє інших.
+    # Після блоку оцінка пам'яті оновлюється, і зайве витісняється.
+    @contextmanager
+    def use(self, tenant: str):
+        folder = self.folder(tenant)
+        books = self.__acquire__(tenant, folder)
+        try:
+            yield books
+        finally:
+            with self.__condition__:
+                books.users -= 1
+                size = books.estimate_size()
+                self.__size__ += size - books.size
+                books.size = size
+            self.__evict__()
+
+    # Відкриті книги орендаря з позначкою використання; завантажує їх, якщо їх ще немає.
+    def __acquire__(self, tenant: str, folder: str) -> TenantBooks:
+        with self.__condition__:
+            # не читати файли, поки їх ще записує витіснення або завантажує інший запит
+            while tenant in self.__closing__ or tenant in self.__loading__:
+                self.__condition__.wait()
+            books = self.__open__.get(tenant)
+            if books is not None:
+                self.__open__.move_to_end(tenant)
+                books.users += 1
+                return books
+            self.__loading__.add(tenant)
+
+        try:
+            os.makedirs(folder, exist_ok=True)
+            books = TenantBooks(tenant, folder, *self.load(folder))
+        finally:
+            with self.__condition__:
+                self.__loading__.discard(tenant)
+                if books is not None:
+                    self.__open__[tenant] = books
+                    books.users += 1
+                self.__condition__.notify_all()
+        return books
+
+    # Зберігає і закриває найдавніше використані книги, доки оцінка пам'яті більша за бюджет
+    # або відкрито більше max_open орендарів.
+    # Знімок пишеться поза спільним замком, тож витіснення не зупиняє команди інших орендарів.
+    def __evict__(self):
+        while True:
+            with self.__condition__:
+                if self.__size__ <= self.memory_budget and len(self.__open__) <= self.max_open:
+                    return
+                victim = next((books for books in self.__open__.values() if not books.users), None)
+                if victim is None:
+                    return
+                del self.__open__[victim.tenant]
+                self.__size__ -= victim.size
+                self.__closing__[victim.tenant] = victim
+            try:
+                with victim.lock:
+                    try:
+                        self.save(victim)
+                    except OSError as e:  # зміни вже в журналі орендаря і повторяться при наступному відкритті
+                        print(f"Saving books of tenant {victim.tenant} failed: {e}", file=sys.stderr)
+                    victim.close()
+            finally:
+                with self.__condition__:
+                    del self.__closing__[victim.tenant]
+                    self.__condition__.notify_all()
+
+    # (кількість відкритих орендарів, оцінка їхньої пам'яті в байтах)
+    def stats(self) -> tuple[int, int]:
+        with self.__condition__:
+            return len(self.__open__), self.__size__
+
+    # Зберігає книги всіх відкритих орендарів (при зупинці сервера).
+    def close(self):
+        with self.__condition__:
+            open_books = list(self.__open__.values())
+            self.__open__.clear()
+            self.__size__ = 0
+        for books in open_books:
+            with books.lock:
+                self.save(books)
+                books.close()
@@ -0,0 +1,90 @@
+# тут автодоповнення в діалозі клавішею Tab: назви команд, імена контактів, id нотаток і теги
+# Назви команд лежать у префіксному дереві, а імена, id і теги беруться з упорядкованих індексів
+# книг (див. AddressBook.complete_name, NoteBook.complete_note_id/complete_tag), які книги оновлюють
+# при кожній зміні - тож натискання Tab не переглядає книгу, навіть якщо в ній мільйон контактів.
+try:
+    import readline
+except ImportError:  # на Windows readline немає - діалог працює без автодоповнення
+    readline = None
+
+MAX_COMPLETIONS = 100  # більше варіантів readline однаково не показує зручно
+
+
+# Префіксне дерево: кожен вузол - словник символ -> вузол, ключ "" позначає кінець слова.
+class Trie:
+
+    def __init__(self, words=()):
+        self.root: dict = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = word
+
+    # слова з префіксом prefix за алфавітом (не більше limit)
+    def complete(self, prefix: str, limit: int | None = None) -> list[str]:
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        words = []
+        stack = [node]
+        while stack and (limit is None or len(words) < limit):
+            node = stack.pop()
+            if "" in node:
+                words.append(node[""])
+            stack.extend(node[char] for char in sorted(node, reverse=True) if char)
+        return words
+
+
+# Функція доповнення для readline.
+# arguments: команда -> види її позиційних аргументів ("name", "note", "tag"),
+# options: опція -> вид її значення, sources: вид -> функція (префікс, limit) -> варіанти.
+class Completer:
+
+    def __init__(self, commands, arguments: dict[str, tuple[str, ...]], options: dict[str, str], sources: dict):
+        self.commands = Trie(commands)
+        self.arguments = arguments
+        self.options = options
+        self.sources = sources
+        self.matches: list[str] = []
+
+    # варіанти для слова text; words - слова рядка перед ним
+    def complete(self, words: list[str], text: str) -> list[str]:
+        if not words:
+            return self.commands.complete(text.lower(), MAX_COMPLETIONS)
+        if text.startswith("--"):
+            return []
+
+        kind = self.options.get(words[-1])
+        if kind is None:
+            kinds = self.arguments.get(words[0].lower(), ())
+            position = sum(1 for word in words[1:] if not word.startswith("--"))
+            kind = kinds[position] if position < len(kinds) else None
+        return self.sources[kind](text, MAX_COMPLETIONS) if kind else []
+
+    # readline викликає функцію з state = 0, 1, 2, ... доки вона не поверне None
+    def __call__(self, text: str, state: int) -> str | None:
+        if state == 0:
+            words = readline.get_line_buffer()[:readline.get_begidx()].split()
+            self.matches = self.complete(words, text)
+            if len(self.matches) == 1:  # readline Python сам не додає пробіл після єдиного варіанта
+                self.matches[0] += " "
+        return self.matches[state] if state < len(self.matches) else None
+
+    # Вмикає автодоповнення, якщо readline доступний; повертає, чи вдалося.
+    def install(self) -> bool:
+        if readline is None:
+            return False
+        readline.set_completer(self)
+        readline.set_completer_delims(" \t\n")  # "-" - частина назв команд
+        if "libedit" in (readline.__doc__ or ""):  # readline Python на macOS
+            readline.parse_and_bind("bind ^I rl_complete")
+        else:
+            readline.parse_and_bind("tab: complete")
+        return True
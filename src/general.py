@@ -1,4 +1,7 @@
 # тут створюємо спільні винятки, констатнти та інші спілні для всього модуля функції
+import re
+from datetime import date, datetime
+from functools import lru_cache
 
 # Базовий виняток для помилок валідації.
 class ValidError(Exception):
@@ -10,6 +13,11 @@ class ValidPhoneError(ValidError):
     pass
 
 
+# Виняток для номера телефону, що вже належить іншому контакту.
+class ValidPhoneDuplicateError(ValidPhoneError):
+    pass
+
+
 # Виняток для невалідної дати народження.
 class ValidBdayError(ValidError):
     pass
@@ -39,6 +47,7 @@ class ValidSearchQueryError(ValidError):
 INVALID_PHONE = "Inavlid phone number! " \
     "Enter the phone number in the format 10 digits"
 INVALID_ARGUMENTS = "Enter valid arguments for the command."
+DUPLICATE_PHONE = "This phone number already belongs to another contact."
 KEY_ERROR = "Record is missing!"
 INVALID_COMMAND = "Enter valid command."
 INVALID_BDAY = "Invalid date format. Use DD.MM.YYYY"
@@ -46,6 +55,101 @@ INVALID_EMAIl = "Invalid email format. Use xxx@xxx.xx"
 INVALID_NOTE_CONTENT = "Note content cannot be empty."
 INVALID_TAG = "Tag cannot be empty."
 INVALID_SEARCH_QUERY = "Search query cannot be empty."
+# Повідомлення, якими обробники команд сповіщають про помилку
+ERROR_MESSAGES = frozenset({
+    INVALID_PHONE, DUPLICATE_PHONE, INVALID_ARGUMENTS, KEY_ERROR, INVALID_BDAY, INVALID_EMAIl,
+    INVALID_NOTE_CONTENT, INVALID_TAG, INVALID_SEARCH_QUERY,
+})
+PAGE_SIZE = 20  # кількість записів на одній сторінці виводу
+VALIDATION_CACHE_SIZE = 4096  # скільки останніх перевірених значень пам'ятає кожен валідатор
+
+
+# --- Валідація полів ---
+# Шаблони компілюються один раз, а результати останніх перевірок кешуються (LRU):
+# повторні значення (пошук, заміна номера, повтор журналу, імпорт) не перевіряються заново.
+# Кешуються лише успішні перевірки — для невалідного значення виняток виникає щоразу.
+PHONE_LENGTH = 10  # номер - рівно 10 цифр; перевіряється без регулярного виразу (len і str.isdecimal)
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+DATE_FORMAT = "%d.%m.%Y"
+
+
+# Перевіряє номер телефону (10 цифр) і повертає його як ціле число.
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def validate_phone(phone: str) -> int:
+    if not (isinstance(phone, str) and len(phone) == PHONE_LENGTH and phone.isdecimal()):
+        raise ValidPhoneError("Invalid phone format.")
+    return int(phone)
+
+
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def validate_email(email: str) -> str:
+    if not (isinstance(email, str) and EMAIL_PATTERN.match(email)):
+        raise ValidEmailError("Invalid email format.")
+    return email
+
+
+# Перевіряє дату 'DD.MM.YYYY' і повертає її порядковий номер дня (date.toordinal).
+# Звичайна дата переставляється в ISO-формат і розбирається date.fromisoformat - це в рази швидше за strptime.
+# Інші записи, які приймає strptime (наприклад '1.2.2000'), розбираються через strptime, як і раніше.
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def validate_date(value: str) -> int:
+    if len(value) == 10 and value[2] == value[5] == ".":
+        try:
+            return date.fromisoformat(f"{value[6:]}-{value[3:5]}-{value[:2]}").toordinal()
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(value, DATE_FORMAT).toordinal()
+    except ValueError:
+        raise ValidBdayError("Invalid date format. Expect 'DD.MM.YYYY'.") from None
+
+
+# Виймає з аргументів команди іменовані опції виду "--page 2" і повертає їх словником.
+def pop_options(args: list, *names: str) -> dict[str, str]:
+    options = {}
+    for name in names:
+        flag = "--" + name
+        if flag in args:
+            index = args.index(flag)
+            options[name] = args[index + 1]
+            del args[index:index + 2]
+    return options
+
+
+# Виймає з аргументів команди прапорець виду "--pager".
+def pop_flag(args: list, name: str) -> bool:
+    flag = "--" + name
+    if flag in args:
+        args.remove(flag)
+        return True
+    return False
+
+
+# Виймає з аргументів опції --page/--offset/--limit і повертає (offset, limit).
+# limit=None означає "до кінця книги".
+def pop_page(args: list) -> tuple[int, int | None]:
+    options = pop_options(args, "page", "offset", "limit")
+    limit = int(options["limit"]) if "limit" in options else None
+    offset = int(options.get("offset", 0))
+    if "page" in options:
+        limit = limit or PAGE_SIZE
+        offset += (int(options["page"]) - 1) * limit
+    if offset < 0 or (limit is not None and limit < 1):
+        raise ValueError
+    return offset, limit
+
+
+# Пейджер: після кожних PAGE_SIZE рядків чекає на Enter (q - завершити перегляд).
+def pager(lines):
+    for number, line in enumerate(lines, 1):
+        yield line
+        if number % PAGE_SIZE == 0 and input("-- More -- [Enter]=next page, q=quit ").strip().lower() == "q":
+            return
+
+
+# Чи є результат обробника повідомленням про помилку (зокрема KEY_ERROR з підказкою схожих імен).
+def is_error(result) -> bool:
+    return isinstance(result, str) and (result in ERROR_MESSAGES or result.startswith(KEY_ERROR + " "))
 
 
 # Декоратор
@@ -57,6 +161,8 @@ def input_error(func):
             return INVALID_ARGUMENTS
         except KeyError:
             return KEY_ERROR
+        except ValidPhoneDuplicateError:
+            return DUPLICATE_PHONE
         except ValidPhoneError:
             return INVALID_PHONE
         except ValidBdayError:
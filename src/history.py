@@ -0,0 +1,74 @@
+# тут історія змін книг для команд undo, redo і history
+# Кожна змінююча команда створює версію книги. Версія зберігає лише попередні стани записів,
+# які змінила команда (книга копіює запис перед його першою зміною, див. AddressBook.remember),
+# а всі інші записи спільні з поточною книгою - тож пам'ять росте зі змінами, а не з розміром книги.
+from collections import deque
+from contextlib import contextmanager
+
+HISTORY_LIMIT = 100  # скільки останніх змін можна скасувати
+
+
+# Одна зміна книги: command - команда, що її зробила, states - стани змінених записів
+# (ключ -> запис або None, якщо запису не було).
+class Version:
+    __slots__ = ("command", "book", "states")
+
+    def __init__(self, command: str, book, states: dict):
+        self.command = command
+        self.book = book
+        self.states = states
+
+    # Повертає записам збережені стани, а їхні поточні стани зберігає натомість, тож та сама
+    # версія і скасовує зміну, і повторює її. Спершу прибираються всі поточні записи, щоб
+    # перевірка унікальності телефонів не бачила станів з різних версій.
+    def swap(self):
+        book = self.book
+        current = {key: book.data.get(key) for key in self.states}
+        for key, record in current.items():
+            if record is not None:
+                del book[key]
+        for key, record in self.states.items():
+            if record is not None:
+                book[key] = record
+        self.states = current
+
+
+class History:
+
+    def __init__(self, limit: int = HISTORY_LIMIT):
+        self.done: deque[Version] = deque(maxlen=limit)
+        self.undone: list[Version] = []
+
+    # Записує зміни book, зроблені всередині блоку, як нову версію. Нова зміна скасовує можливість redo.
+    @contextmanager
+    def version(self, command: str, book):
+        book.__changes__ = {}
+        try:
+            yield
+        finally:
+            states, book.__changes__ = book.__changes__, None
+            if states:
+                self.done.append(Version(command, book, states))
+                self.undone.clear()
+
+    def undo(self) -> Version | None:
+        if not self.done:
+            return None
+        version = self.done.pop()
+        version.swap()
+        self.undone.append(version)
+        return version
+
+    def redo(self) -> Version | None:
+        if not self.undone:
+            return None
+        version = self.undone.pop()
+        version.swap()
+        self.done.append(version)
+        return version
+
+    # рядки для команди history: виконані зміни (останні - внизу) і скасовані, які можна повторити
+    def lines(self) -> list[str]:
+        lines = [f"{number:>4}. {version.command}" for number, version in enumerate(self.done, 1)]
+        lines += [f"      (undone) {version.command}" for version in reversed(self.undone)]
+        return lines
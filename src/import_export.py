@@ -0,0 +1,248 @@
+# тут імпорт та експорт книг у форматах CSV, vCard (.vcf) і JSON Lines (.jsonl)
+# Файли читаються і пишуться потоково (генераторами), тож великий файл не тримається в пам'яті цілком.
+import copy
+import csv
+import json
+import os
+from datetime import datetime
+from .address_book import AddressBook, Record
+from .note_book import NoteBook, Note
+from .general import ValidError, PAGE_SIZE
+
+CONTACT_FIELDS = ["name", "phones", "email", "birthday", "address"]
+NOTE_FIELDS = ["content", "tags"]
+LIST_SEPARATOR = ";"  # роздільник телефонів і тегів у CSV
+
+
+def file_format(file_name: str) -> str:
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension not in (".csv", ".vcf", ".jsonl"):
+        raise ValueError(f"Unsupported file format {extension}")
+    return extension
+
+
+# --- читання ---
+# Читачі видають пари (номер рядка файлу, рядок). Рядок JSON Lines видається нерозібраним:
+# його розбирає decode_row, щоб помилка в одному рядку не зупиняла імпорт решти.
+
+def read_csv(f):
+    reader = csv.DictReader(f)
+    reader.fieldnames  # читає заголовок
+    line_number = reader.line_num + 1
+    for row in reader:
+        yield line_number, {key: (value or "").strip() for key, value in row.items() if key}
+        line_number = reader.line_num + 1
+
+
+def read_jsonl(f):
+    for line_number, line in enumerate(f, 1):
+        if line.strip():
+            yield line_number, line
+
+
+def decode_row(row) -> dict:
+    if isinstance(row, str):
+        row = json.loads(row)
+    if not isinstance(row, dict):
+        raise ValueError("a JSON object is expected")
+    return row
+
+
+# vCard: з кожної картки беремо FN, TEL, EMAIL, BDAY та ADR
+def read_vcf(f):
+    card = None
+    card_line = 0
+    for line_number, line in enumerate(f, 1):
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+
+        key, _, value = line.partition(":")
+        key = key.split(";")[0].upper()
+        if key == "BEGIN":
+            card = {"phones": []}
+            card_line = line_number
+        elif key == "END" and card is not None:
+            yield card_line, card
+            card = None
+        elif card is None:
+            continue
+        elif key == "FN":
+            card["name"] = value.strip()
+        elif key == "TEL":
+            card["phones"].append(value.strip())
+        elif key == "EMAIL":
+            card["email"] = value.strip()
+        elif key == "BDAY":
+            card["birthday"] = value.strip()
+        elif key == "ADR":
+            card["address"] = " ".join(part for part in value.split(";") if part).strip()
+
+
+READERS = {".csv": read_csv, ".jsonl": read_jsonl, ".vcf": read_vcf}
+
+
+def split_list(value) -> list[str]:
+    if isinstance(value, list):
+        return [item for item in value if item]
+    return [item.strip() for item in (value or "").split(LIST_SEPARATOR) if item.strip()]
+
+
+# дата у vCard має вигляд YYYY-MM-DD або YYYYMMDD; у книзі - DD.MM.YYYY
+def vcard_birthday(value: str) -> str:
+    digits = value.replace("-", "")
+    if len(digits) == 8 and digits.isdigit():
+        return datetime.strptime(digits, "%Y%m%d").strftime("%d.%m.%Y")
+    return value
+
+
+# Будує запис контакту з рядка файлу; всі поля валідуються до того, як запис потрапить у книгу.
+def contact_from_row(row: dict) -> Record:
+    name = (row.get("name") or "").strip()
+    if not name:
+        raise ValueError("name is missing")
+
+    record = Record(name.capitalize())
+    for phone in split_list(row.get("phones")):
+        record.add_phone(phone)
+    if row.get("email"):
+        record.add_email(row["email"])
+    if row.get("birthday"):
+        record.add_birthday(vcard_birthday(row["birthday"]))
+    if row.get("address"):
+        record.add_address(row["address"])
+    return record
+
+
+# Дописує поля імпортованого запису до копії наявного контакту з тим самим іменем:
+# книга отримує злитий запис цілком або (при помилці) не змінюється.
+def merge_contact(existing: Record, imported: Record) -> Record:
+    record = copy.copy(existing)
+    for phone in imported.phones:
+        record.add_phone(phone.value)
+    if imported.email:
+        record.add_email(imported.email.value)
+    if imported.birthday:
+        record.add_birthday(str(imported.birthday))
+    if imported.address:
+        record.add_address(imported.address.value)
+    return record
+
+
+# Імпортує контакти з файлу. Повертає кількість імпортованих рядків і список помилок по рядках;
+# рядок з помилкою (зокрема з номером, що вже належить іншому контакту) пропускається цілком.
+# Індекси книги не оновлюються на кожен рядок, а будуються заново після імпорту (AddressBook.bulk).
+def import_contacts(book: AddressBook, file_name: str) -> tuple[int, list[str]]:
+    reader = READERS[file_format(file_name)]
+    imported = 0
+    errors: list[str] = []
+
+    with open(file_name, encoding="UTF-8", newline="") as f, book.bulk():
+        for line_number, row in reader(f):
+            try:
+                record = contact_from_row(decode_row(row))
+                existing = book.find(record.name.value)
+                book.add_record(record if existing is None else merge_contact(existing, record))
+            except (ValidError, ValueError, TypeError, AttributeError) as e:
+                errors.append(f"Line {line_number}: {type(e).__name__} {e}".strip())
+                continue
+            imported += 1
+
+    return imported, errors
+
+
+def import_notes(book: NoteBook, file_name: str) -> tuple[int, list[str]]:
+    extension = file_format(file_name)
+    if extension == ".vcf":
+        raise ValueError("Notes cannot be imported from vCard")
+
+    imported = 0
+    errors: list[str] = []
+    with open(file_name, encoding="UTF-8", newline="") as f:
+        for line_number, row in READERS[extension](f):
+            try:
+                # нотатка спершу перевіряється окремо, а в книгу додається через add_note:
+                # так книга сама видає id (SqliteNoteBook ще й зберігає лічильник id у базі)
+                row = decode_row(row)
+                checked = Note(row.get("content"), 0)
+                for tag in split_list(row.get("tags")):
+                    checked.add_tag(tag)
+                note = book.find_note_by_id(book.add_note(checked.content.value))
+                for tag in checked.tags:
+                    note.add_tag(tag.value)
+            except (ValidError, ValueError, TypeError, AttributeError) as e:
+                errors.append(f"Line {line_number}: {type(e).__name__} {e}".strip())
+                continue
+            imported += 1
+
+    return imported, errors
+
+
+# Підсумок імпорту: кількість рядків і помилки по рядках (перші PAGE_SIZE з них).
+def import_report(kind: str, imported: int, errors: list[str]) -> str:
+    lines = [f"Imported {imported} {kind}, errors: {len(errors)}."]
+    lines += [f"    {error}" for error in errors[:PAGE_SIZE]]
+    if len(errors) > PAGE_SIZE:
+        lines.append(f"    ... and {len(errors) - PAGE_SIZE} more errors.")
+    return "\n".join(lines)
+
+
+# --- запис ---
+
+def contact_row(record: Record) -> dict:
+    return {
+        "name": record.name.value,
+        "phones": [phone.value for phone in record.phones],
+        "email": record.email.value if record.email else "",
+        "birthday": str(record.birthday) if record.birthday else "",
+        "address": record.address.value if record.address else "",
+    }
+
+
+def write_contacts_vcf(f, records):
+    for record in records:
+        f.write("BEGIN:VCARD\r\nVERSION:3.0\r\n")
+        f.write(f"FN:{record.name.value}\r\n")
+        for phone in record.phones:
+            f.write(f"TEL:{phone.value}\r\n")
+        if record.email:
+            f.write(f"EMAIL:{record.email.value}\r\n")
+        if record.birthday:
+            f.write(f"BDAY:{record.birthday.value.isoformat()}\r\n")
+        if record.address:
+            f.write(f"ADR:;;{record.address.value};;;;\r\n")
+        f.write("END:VCARD\r\n")
+
+
+# Записує рядки у файл потоково; повертає кількість записаних рядків.
+def write_rows(file_name: str, rows, fields: list[str]) -> int:
+    count = 0
+    extension = file_format(file_name)
+    with open(file_name, "w", encoding="UTF-8", newline="") as f:
+        if extension == ".csv":
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+        for row in rows:
+            if extension == ".csv":
+                writer.writerow({key: LIST_SEPARATOR.join(value) if isinstance(value, list) else value
+                                 for key, value in row.items()})
+            else:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def export_contacts(book: AddressBook, file_name: str) -> int:
+    if file_format(file_name) == ".vcf":
+        with open(file_name, "w", encoding="UTF-8", newline="") as f:
+            write_contacts_vcf(f, book.data.values())
+        return len(book)
+    return write_rows(file_name, (contact_row(record) for record in book.data.values()), CONTACT_FIELDS)
+
+
+def export_notes(book: NoteBook, file_name: str) -> int:
+    if file_format(file_name) == ".vcf":
+        raise ValueError("Notes cannot be exported to vCard")
+    rows = ({"content": note.content.value, "tags": [tag.value for tag in note.tags]}
+            for note in book.data.values())
+    return write_rows(file_name, rows, NOTE_FIELDS)
@@ -0,0 +1,508 @@
+# тут зібрані спільні структури індексів, які книги підтримують в актуальному стані
+import bisect
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+
+
+# Інвертований індекс триграм для пошуку за підрядком.
+# Кожен запис отримує ціле число - номер, і для кожної триграми зберігається відсортований масив
+# номерів записів (array("I"), 4 байти на запис), а не множина ключів. Замість множини триграм запису
+# зберігаються лише його тексти одним рядком: старі триграми розбиваються з нього заново при зміні.
+class TrigramIndex:
+    SEPARATOR = "\n"
+
+    def __init__(self):
+        self.grams: dict[str, array] = {}  # триграма -> відсортовані номери записів
+        self.ids: dict = {}                # ключ запису -> номер
+        self.keys: list = []               # номер -> ключ запису (None - номер вільний)
+        self.texts: list[str] = []         # номер -> тексти запису через SEPARATOR
+        self.free: list[int] = []          # номери видалених записів для повторного використання
+        # Останній видалений ключ, триграми якого ще не прибрані. Книга замінює запис видаленням
+        # і додаванням під тим самим ключем, тож таке додавання просто повертає запису його номер.
+        self.removed = None
+
+    @staticmethod
+    def split(text: str) -> set[str]:
+        return {text[i:i+3] for i in range(len(text) - 2)}
+
+    def __split_texts__(self, texts) -> set[str]:
+        grams: set[str] = set()
+        for text in texts:
+            grams |= self.split(text)
+        return grams
+
+    # Оновлює триграми запису: додаються лише нові і прибираються лише зниклі.
+    def update(self, key, texts: list[str]):
+        if self.removed is not None:
+            if self.removed == key:
+                self.removed = None
+            else:
+                self.__purge__()
+
+        text = self.SEPARATOR.join(texts)
+        number = self.ids.get(key)
+        if number is None:
+            old_grams = set()
+            if self.free:
+                number = self.free.pop()
+                self.keys[number] = key
+                self.texts[number] = text
+            else:
+                number = len(self.keys)
+                self.keys.append(key)
+                self.texts.append(text)
+            self.ids[key] = number
+        else:
+            if self.texts[number] == text:
+                return
+            old_grams = self.__split_texts__(self.texts[number].split(self.SEPARATOR))
+            self.texts[number] = text
+        new_grams = self.__split_texts__(texts)
+
+        for gram in old_grams - new_grams:
+            numbers = self.grams[gram]
+            del numbers[bisect.bisect_left(numbers, number)]
+            if not numbers:
+                del self.grams[gram]
+
+        for gram in new_grams - old_grams:
+            numbers = self.grams.get(gram)
+            if numbers is None:
+                self.grams[gram] = array("I", (number,))
+            elif numbers[-1] < number:
+                numbers.append(number)
+            else:
+                bisect.insort(numbers, number)
+
+    def remove(self, key):
+        if key in self.ids and self.removed != key:
+            self.__purge__()
+            self.removed = key
+
+    # Прибирає триграми відкладено видаленого ключа і звільняє його номер.
+    def __purge__(self):
+        key, self.removed = self.removed, None
+        if key is None:
+            return
+        number = self.ids[key]
+        self.update(key, [])
+        del self.ids[key]
+        self.keys[number] = None
+        self.texts[number] = ""
+        self.free.append(number)
+
+    # Повертає множину ключів-кандидатів, що містять усі триграми запиту,
+    # або None, якщо запит коротший за триграму і індекс не може звузити пошук.
+    def candidates(self, query: str) -> set | None:
+        grams = self.split(query)
+        if not grams:
+            return None
+        self.__purge__()
+
+        # Списки перетинаються від найкоротшого. Коли кандидатів лишилося набагато менше, ніж номерів
+        # у наступному списку, кандидати шукаються в ньому двійковим пошуком, а не перебором списку.
+        postings = sorted((self.grams.get(gram, ()) for gram in grams), key=len)
+        numbers = set(postings[0])
+        for posting in postings[1:]:
+            if len(posting) > 16 * len(numbers):
+                size = len(posting)
+                numbers = {number for number in numbers
+                           if (i := bisect.bisect_left(posting, number)) < size and posting[i] == number}
+            else:
+                numbers.intersection_update(posting)
+        return set(map(self.keys.__getitem__, numbers))
+
+
+# Повнотекстовий інвертований індекс: термін -> {ключ документа: частота терміна}.
+# Результати ранжуються за формулою BM25.
+class FullTextIndex:
+    WORD_PATTERN = re.compile(r"\w+")
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.postings: dict[str, dict] = {}  # термін -> {ключ: частота}
+        self.terms: dict = {}                # ключ -> Counter термінів документа
+        self.texts: dict = {}                # ключ -> проіндексований текст
+        self.total_length = 0
+
+    @classmethod
+    def tokenize(cls, text: str) -> list[str]:
+        return cls.WORD_PATTERN.findall(text.lower())
+
+    def update(self, key, text: str):
+        if self.texts.get(key) == text:
+            return
+
+        self.remove(key)
+        terms = Counter(self.tokenize(text))
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[key] = frequency
+
+        self.terms[key] = terms
+        self.texts[key] = text
+        self.total_length += terms.total()
+
+    def remove(self, key):
+        terms = self.terms.pop(key, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            keys = self.postings[term]
+            del keys[key]
+            if not keys:
+                del self.postings[term]
+
+        del self.texts[key]
+        self.total_length -= terms.total()
+
+    # Повертає {ключ: оцінка BM25} для документів, що містять усі терміни (match_all=True)
+    # або хоча б один з них (match_all=False).
+    def search(self, terms: list[str], match_all: bool = True) -> dict:
+        postings = [self.postings.get(term, {}) for term in set(terms)]
+        if not postings:
+            return {}
+
+        if match_all:
+            postings.sort(key=len)
+            keys = set(postings[0]).intersection(*postings[1:])
+        else:
+            keys = set().union(*postings)
+
+        count = len(self.terms)
+        avg_length = self.total_length / count if count else 0
+        scores = dict.fromkeys(keys, 0.0)
+        for posting in postings:
+            idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for key in keys.intersection(posting):
+                frequency = posting[key]
+                length = self.terms[key].total()
+                scores[key] += idf * frequency * (self.K1 + 1) / (
+                    frequency + self.K1 * (1 - self.B + self.B * length / avg_length))
+
+        return scores
+
+
+# Впорядкована множина ключів для запитів за діапазоном і префіксом.
+# Ключі лежать у відсортованих шматках до 2*LOAD елементів (як листки B-дерева), а maxes - найбільші
+# ключі шматків: позиція знаходиться двома двійковими пошуками, а вставка і видалення зсувають
+# лише один шматок, тож навіть на мільйоні ключів зміна коштує мікросекунди, а не копіювання списку.
+class SortedKeys:
+    LOAD = 1000
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self.chunks: list[list] = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self.maxes: list = [chunk[-1] for chunk in self.chunks]
+        self.size = len(keys)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, key):
+        if not self.chunks:
+            self.chunks.append([key])
+            self.maxes.append(key)
+            self.size = 1
+            return
+
+        i = min(bisect.bisect_left(self.maxes, key), len(self.maxes) - 1)
+        chunk = self.chunks[i]
+        bisect.insort(chunk, key)
+        self.maxes[i] = chunk[-1]
+        self.size += 1
+        if len(chunk) > 2 * self.LOAD:
+            self.chunks[i:i + 1] = [chunk[:self.LOAD], chunk[self.LOAD:]]
+            self.maxes[i:i + 1] = [chunk[self.LOAD - 1], chunk[-1]]
+
+    def remove(self, key):
+        i = bisect.bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return
+        chunk = self.chunks[i]
+        j = bisect.bisect_left(chunk, key)
+        if chunk[j] != key:
+            return
+
+        del chunk[j]
+        self.size -= 1
+        if not chunk:
+            del self.chunks[i]
+            del self.maxes[i]
+        elif j == len(chunk):
+            self.maxes[i] = chunk[-1]
+
+    # Ключі first <= key < stop по порядку (None - без межі): O(log n) на пошук початку і O(1) на ключ.
+    def irange(self, first=None, stop=None):
+        i = 0 if first is None else bisect.bisect_left(self.maxes, first)
+        j = 0 if first is None or i == len(self.chunks) else bisect.bisect_left(self.chunks[i], first)
+        while i < len(self.chunks):
+            for key in self.chunks[i][j:]:
+                if stop is not None and key >= stop:
+                    return
+                yield key
+            i += 1
+            j = 0
+
+
+# Найменший рядок, більший за всі рядки з префіксом prefix (межа stop для SortedKeys.irange).
+def prefix_stop(prefix: str) -> str | None:
+    while prefix and prefix[-1] == chr(0x10FFFF):
+        prefix = prefix[:-1]
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else None
+
+
+# Бітові маски позицій кожного символу рядка (для бітово-паралельного обчислення відстані).
+def char_masks(text: str) -> dict[str, int]:
+    masks: dict[str, int] = {}
+    for position, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+# Відстань Дамерау-Левенштейна (варіант optimal string alignment): кількість вставок, видалень,
+# замін і перестановок сусідніх символів, щоб отримати з pattern рядок text.
+# З transpositions=False - звичайна відстань Левенштейна (без перестановок).
+# Бітово-паралельний алгоритм Хюрьо: один стовпчик таблиці відстаней - кілька операцій з цілим числом,
+# тож відстань рахується за O(len(text)) замість O(len(pattern) * len(text)).
+def edit_distance(masks: dict[str, int], length: int, text: str, transpositions: bool = True) -> int:
+    if not length or not text:
+        return length or len(text)
+
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    vp, vn, d0, previous_mask = full, 0, 0, 0
+    distance = length
+    for char in text:
+        mask = masks.get(char, 0)
+        transposition = ((~d0 & mask) << 1) & previous_mask if transpositions else 0
+        d0 = ((((mask & vp) + vp) ^ vp) | mask | vn | transposition) & full
+        hp = (vn | ~(d0 | vp)) & full
+        hn = d0 & vp
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = (hn | ~(d0 | hp)) & full
+        vn = hp & d0
+        previous_mask = mask
+    return distance
+
+
+def damerau_levenshtein(a: str, b: str) -> int:
+    return edit_distance(char_masks(a), len(a), b)
+
+
+def levenshtein(a: str, b: str) -> int:
+    return edit_distance(char_masks(a), len(a), b, transpositions=False)
+
+
+# Нечіткий пошук серед невеликого сталого набору слів (наприклад, назв команд).
+# Бітові маски слів і їхні літери пораховані заздалегідь. Кожна правка змінює спільні літери
+# щонайбільше на одну, тож слова, яким спільних літер замало для потрібної схожості,
+# відкидаються без обчислення відстані.
+class FuzzyMatcher:
+
+    def __init__(self, words):
+        self.words = {word: (char_masks(word), Counter(word)) for word in words}
+
+    # До count слів зі схожістю не менше cutoff, найсхожіші першими.
+    # Схожість = 1 - відстань Дамерау-Левенштейна / довжина довшого рядка.
+    def match(self, query: str, cutoff: float, count: int) -> list[str]:
+        query_letters = Counter(query)
+        matches = []
+        for word, (masks, letters) in self.words.items():
+            longest = max(len(query), len(word))
+            if sum((query_letters & letters).values()) < cutoff * longest:
+                continue
+            distance = edit_distance(masks, len(word), query)
+            if 1 - distance / longest >= cutoff:
+                matches.append((distance / longest, word))
+        return [word for _, word in sorted(matches)[:count]]
+
+
+# Нечіткий пошук слів (наприклад, імен контактів) з відстанню Дамерау-Левенштейна не більше max_distance.
+# Слова індексуються за триграмами з відступами по краях. Одна правка зачіпає щонайбільше 4 триграми,
+# тож схоже слово має спільними щонайменше len(триграм запиту) - 4 * max_distance з них, а отже -
+# хоча б одну з 4 * max_distance + 1 найрідших триграм запиту. Кандидати беруться лише з цих
+# найкоротших списків, відсіюються за кількістю спільних триграм, і лише для решти рахується відстань.
+# Для коротких запитів, де фільтр нічого не відсікає, перебираються слова схожої довжини.
+class FuzzyIndex:
+    PAD = "\0"  # символ відступу, якого немає в словах
+
+    def __init__(self, words=()):
+        self.grams: dict[str, set[str]] = {}   # триграма -> слова
+        self.lengths: dict[int, set[str]] = {}  # довжина -> слова
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return sum(len(words) for words in self.lengths.values())
+
+    @classmethod
+    def split(cls, word: str) -> set[str]:
+        return TrigramIndex.split(cls.PAD * 2 + word + cls.PAD * 2)
+
+    def add(self, word: str):
+        for gram in self.split(word):
+            self.grams.setdefault(gram, set()).add(word)
+        self.lengths.setdefault(len(word), set()).add(word)
+
+    def remove(self, word: str):
+        words = self.lengths.get(len(word))
+        if words is None or word not in words:
+            return
+        words.discard(word)
+        for gram in self.split(word):
+            words = self.grams[gram]
+            words.discard(word)
+            if not words:
+                del self.grams[gram]
+
+    # Слова на відстані не більше max_distance від word: список (відстань, слово), найближчі першими.
+    def search(self, word: str, max_distance: int) -> list[tuple[int, str]]:
+        grams = self.split(word)
+        need = len(grams) - 4 * max_distance
+        lengths = range(len(word) - max_distance, len(word) + max_distance + 1)
+
+        if need > 0:
+            postings = sorted((self.grams.get(gram, set()) for gram in grams), key=len)
+            candidates = set().union(*postings[:4 * max_distance + 1])
+            candidates = [candidate for candidate in candidates
+                          if len(candidate) in lengths and len(grams & self.split(candidate)) >= need]
+        else:
+            candidates = [candidate for length in lengths for candidate in self.lengths.get(length, ())]
+
+        masks = char_masks(word)
+        found = []
+        for candidate in candidates:
+            distance = edit_distance(masks, len(word), candidate)
+            if distance <= max_distance:
+                found.append((distance, candidate))
+        return sorted(found)
+
+
+# --- Нечіткий пошук імен ---
+# Латинізація кирилиці (українська - за офіційною транслітерацією 2010 року, плюс російські літери),
+# щоб "Олена" і "Olena" потрапляли в один ключ індексу.
+TRANSLITERATION = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e", "є": "ie", "ж": "zh", "з": "z",
+    "и": "y", "і": "i", "ї": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p",
+    "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh",
+    "щ": "shch", "ь": "", "ю": "iu", "я": "ia", "'": "", "’": "", "ʼ": "",
+    "ё": "io", "ы": "y", "э": "e", "ъ": "",
+})
+NAME_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+# Заміни для фонетичного ключа: варіанти запису того самого звуку зводяться до одного символу.
+PHONETIC_REPLACEMENTS = [
+    (re.compile(pattern), replacement) for pattern, replacement in (
+        (r"shch|sch|sh", "s"), (r"zh", "z"), (r"kh", "h"), (r"ch|ts|tz", "c"), (r"ck|c(?=[aou])|q", "k"),
+        (r"ph", "f"), (r"w", "v"), (r"x", "ks"), (r"g", "h"), (r"[jy]", "i"),
+    )
+]
+VOWELS = re.compile(r"[aeiou]+")
+
+
+# Слова імені в нижньому регістрі латиницею: "Олена-Коваленко" -> ["olena", "kovalenko"].
+def name_tokens(name: str) -> list[str]:
+    return NAME_TOKEN_PATTERN.findall(name.lower().translate(TRANSLITERATION))
+
+
+# Фонетичний ключ слова: однаково звучні варіанти запису (Serhii/Sergiy, Kovalenko/Kowalenko,
+# Oleksandr/Aleksandr) дають однаковий ключ. Голосні відкидаються (крім першої, що стає "a"),
+# однакові сусідні приголосні зливаються.
+def phonetic_key(token: str) -> str:
+    for pattern, replacement in PHONETIC_REPLACEMENTS:
+        token = pattern.sub(replacement, token)
+    key = ("a" if VOWELS.match(token) else "") + VOWELS.sub("", token)
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+# Індекс імен для нечіткого пошуку за словами імені. Для кожного слова запиту шукаються слова
+# словника на невеликій відстані Дамерау-Левенштейна (FuzzyIndex) або з тим самим фонетичним ключем,
+# а імена-кандидати - перетин множин імен, що містять знайдені слова. Словник різних слів (без чисел)
+# набагато менший за кількість імен, тож пошук не переглядає всі імена.
+class NameIndex:
+
+    def __init__(self, names=()):
+        self.words = FuzzyIndex()                  # словник слів імен
+        self.postings: dict[str, set[str]] = {}    # слово -> імена, що його містять
+        self.sounds: dict[str, set[str]] = {}      # фонетичний ключ -> слова
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str):
+        for token in set(name_tokens(name)):
+            names = self.postings.get(token)
+            if names is None:
+                names = self.postings[token] = set()
+                if not token.isdigit():
+                    self.words.add(token)
+                    self.sounds.setdefault(phonetic_key(token), set()).add(token)
+            names.add(name)
+
+    def remove(self, name: str):
+        for token in set(name_tokens(name)):
+            names = self.postings.get(token)
+            if names is None:
+                continue
+            names.discard(name)
+            if not names:
+                del self.postings[token]
+                if token.isdigit():
+                    continue
+                self.words.remove(token)
+                key = phonetic_key(token)
+                self.sounds[key].discard(token)
+                if not self.sounds[key]:
+                    del self.sounds[key]
+
+    # Слова словника, схожі на token: слово -> відстань.
+    # Дозволено по одній помилці на кожні 4 символи (не більше 2), фонетично однакові слова - завжди.
+    # Числа (наприклад, номер у імені) порівнюються лише точно.
+    def __similar_tokens__(self, token: str) -> dict[str, int]:
+        if token.isdigit():
+            return {token: 0} if token in self.postings else {}
+        matches = {word: distance for distance, word in self.words.search(token, min(2, (len(token) + 1) // 4))}
+        masks = char_masks(token)
+        for word in self.sounds.get(phonetic_key(token), ()):
+            if word not in matches:
+                matches[word] = edit_distance(masks, len(token), word)
+        return matches
+
+    # До count імен, що містять схоже слово для кожного слова запиту, найближчі першими.
+    # Відстань імені - сума відстаней його слів до слів запиту.
+    def search(self, query: str, count: int) -> list[tuple[int, str]]:
+        tokens = name_tokens(query)
+        if not tokens:
+            return []
+
+        matches = [self.__similar_tokens__(token) for token in tokens]
+        matches.sort(key=lambda words: sum(len(self.postings[word]) for word in words))
+
+        # перше (найвужче) слово задає кандидатів, наступні лише звужують їх перетином множин
+        distances: dict[str, int] = {}
+        for word, distance in matches[0].items():
+            for name in self.postings[word]:
+                if distances.get(name, distance + 1) > distance:
+                    distances[name] = distance
+
+        for words in matches[1:]:
+            narrowed: dict[str, int] = {}
+            for word, distance in words.items():
+                for name in distances.keys() & self.postings[word]:
+                    total = distances[name] + distance
+                    if narrowed.get(name, total + 1) > total:
+                        narrowed[name] = total
+            distances = narrowed
+            if not distances:
+                return []
+
+        return heapq.nsmallest(count, ((distance, name) for name, distance in distances.items()),
+                               key=lambda item: (item[0], len(item[1]), item[1]))
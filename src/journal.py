@@ -0,0 +1,82 @@
+import os
+
+
+# Кількість записів у журналі, після якої журнал згортається у повний знімок книг.
+COMPACT_LIMIT = 1000
+
+
+# Журнал змін (write-ahead log) між повними знімками книг.
+# Кожна змінююча команда дописується окремим рядком "<seq>\t<команда>\n",
+# тому збереження коштує O(зміни), а не O(книга).
+# preamble - записи, що передують першим командам кожного сеансу (наприклад, налаштування,
+# з якими команди виконувались): вони дописуються перед першим записом після відкриття чи очищення.
+class Journal:
+
+    def __init__(self, file_name: str, preamble: list[str] = ()):
+        self.file_name = file_name
+        self.seq = 0   # номер останнього записаного запису
+        self.size = 0  # кількість записів з моменту останнього знімка
+        self.preamble = list(preamble)
+        self.__started__ = False  # чи записана преамбула цього сеансу
+
+    # Читає журнал і повертає список (seq, команда).
+    # Обірваний останній запис (збій під час запису) відкидається, а файл обрізається до нього.
+    def load(self) -> list[tuple[int, str]]:
+        entries: list[tuple[int, str]] = []
+        valid_size = 0
+        try:
+            with open(self.file_name, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    seq, sep, command = line.decode("UTF-8", errors="replace").rstrip("\n").partition("\t")
+                    if not sep or not seq.isdigit():
+                        break
+                    entries.append((int(seq), command))
+                    valid_size += len(line)
+        except FileNotFoundError:
+            return entries
+
+        if valid_size < os.path.getsize(self.file_name):
+            with open(self.file_name, "r+b") as f:
+                f.truncate(valid_size)
+
+        if entries:
+            self.seq = max(self.seq, entries[-1][0])
+        self.size = len(entries)
+        return entries
+
+    # Дописує команди в кінець журналу одним записом з fsync.
+    def extend(self, commands: list[str]) -> int:
+        if not commands:
+            return self.seq
+        if not self.__started__:
+            commands = [*self.preamble, *commands]
+
+        lines = []
+        for command in commands:
+            self.seq += 1
+            lines.append(f"{self.seq}\t{command.replace(chr(10), ' ')}\n")
+
+        with open(self.file_name, "a", encoding="UTF-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.__started__ = True
+        self.size += len(commands)
+        return self.seq
+
+    def append(self, command: str) -> int:
+        return self.extend([command])
+
+    # Очищує журнал після того, як усі його записи потрапили у знімок.
+    def clear(self):
+        with open(self.file_name, "w", encoding="UTF-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.size = 0
+        self.__started__ = False
+
+    def need_compact(self) -> bool:
+        return self.size >= COMPACT_LIMIT
@@ -1,5 +1,12 @@
 from collections import UserDict
+import bisect
+import copy
+import heapq
+import itertools
+import re
 from .address_book import Field
+from .indexes import FullTextIndex, SortedKeys, prefix_stop
+from .parallel_search import TextColumn, use_pool
 from .general import (
     ValidNoteContentError,
     ValidTagError,
@@ -9,60 +16,90 @@ from .general import (
 
 # Клас для контенту нотатки з валідацією.
 class NoteContent(Field):
+    __slots__ = ()
 
     @property
     def value(self):
-        return self.__value
+        return self.__value__
 
     @value.setter
     def value(self, text: str):
         # Порожній або нестроковий текст нотатки вважаємо невалідним.
         if not isinstance(text, str) or not text.strip():
             raise ValidNoteContentError()
-        self.__value = text
+        self.__value__ = text
 
 
 # Клас для тегів нотаток з валідацією.
 class Tag(Field):
+    __slots__ = ()
 
     @property
     def value(self):
-        return self.__value
+        return self.__value__
 
     @value.setter
     def value(self, tag: str):
         # Тег не може бути порожнім або з одних пробілів.
         if not isinstance(tag, str) or not tag.strip():
             raise ValidTagError()
-        self.__value = tag.lower()
+        self.__value__ = tag.lower()
 
 
 # Клас для представлення однієї нотатки.
 class Note:
+    __slots__ = ("id", "content", "tags", "book", "__weakref__")
+
     def __init__(self, content: str, note_id: int):
         self.id = note_id
         self.content = NoteContent(content)
         self.tags: list[Tag] = []
+        self.book = None  # книга, в якій зберігається нотатка (для оновлення її індексів)
+
+    # копія нотатки для історії змін: текст і теги не змінюються на місці, тож вони спільні з копією
+    def __copy__(self) -> "Note":
+        note = object.__new__(Note)
+        note.id = self.id
+        note.content = self.content
+        note.tags = list(self.tags)
+        note.book = None
+        return note
+
+    # перед зміною (вже перевірених значень) дає книзі зберегти попередній стан нотатки для undo
+    def __changing__(self):
+        if self.book is not None:
+            self.book.remember(self.id)
+
+    # повідомляє книгу про зміну нотатки, щоб вона оновила свої індекси
+    def __changed__(self):
+        if self.book is not None:
+            self.book.reindex(self)
 
     def add_tag(self, tag_str: str):
         tag = Tag(tag_str)
         if not self.has_tag(tag.value):
+            self.__changing__()
             self.tags.append(tag)
+            self.__changed__()
 
     def find_tag(self, tag_str: str) -> Tag | None:
         tag_lower = tag_str.lower()
-        tags = list(filter(lambda tag: tag.value == tag_lower, self.tags))
-        return tags[0] if len(tags) > 0 else None
+        return next((tag for tag in self.tags if tag.value == tag_lower), None)
 
     def remove_tag(self, tag_str: str) -> bool:
         tag_to_remove = self.find_tag(tag_str)
         if tag_to_remove:
+            self.__changing__()
             self.tags.remove(tag_to_remove)
+            self.__changed__()
             return True
         return False
 
     def edit_content(self, new_content: str):
-        self.content.value = new_content
+        content = NoteContent(new_content)
+        self.__changing__()
+        self.content = content
+        self.__changed__()
 
     def has_tag(self, tag_query: str) -> bool:
         return self.find_tag(tag_query) is not None
@@ -74,18 +111,185 @@ class Note:
     def __repr__(self):
         return str(self)
 
+    # нотатка в книзі зберігається без посилання на книгу — його відновлює сама книга
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in self.__slots__ if key not in ("book", "__weakref__")}
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+        self.book = None
+
 
 # Клас для зберігання книги нотаток.
 class NoteBook(UserDict):
 
+    # Номер останнього запису журналу, врахованого у знімку книги.
+    journal_seq: int = 0
+
     def __init__(self):
+        self.__build_indexes__()
         super().__init__()
         self.note_id_counter = 1
 
+    # Індекси (атрибути виду __name__) будуються ліниво — при першому запиті, що їх потребує,
+    # щоб відкриття великої книги не вимагало декодування всіх нотаток.
+    def __build_indexes__(self):
+        self.__indexed__ = False
+        self.__content_index__ = FullTextIndex()
+        # індекси тегів будуються окремо від повнотекстового: автодоповнення й пошук за тегом
+        # не чекають на індексування текстів усіх нотаток
+        self.__tags_indexed__ = False
+        self.__note_tags__: dict[int, tuple[str, ...]] = {}  # id -> проіндексовані теги нотатки
+        self.__tag_index__: dict[str, set[int]] = {}          # тег -> id нотаток з цим тегом
+        self.__first_tag_index__: dict[str, set[int]] = {}    # перший тег ("" - без тегів) -> id нотаток
+        self.__sorted_tags__: list[str] = []                  # усі теги книги у відсортованому порядку
+        self.__text_column__: TextColumn | None = None         # тексти нотаток для пошуку регулярним виразом
+        self.__sorted_ids__: SortedKeys | None = None          # id нотаток за зростанням (будується з ключів книги)
+        self.__changes__: dict | None = None                   # попередні стани нотаток поточної версії (див. history)
+
+    def __ensure_indexes__(self):
+        if not self.__indexed__:
+            self.__indexed__ = True
+            for note in self.data.values():
+                self.__content_index__.update(note.id, note.content.value)
+        self.__ensure_tag_indexes__()
+
+    def __ensure_tag_indexes__(self):
+        if not self.__tags_indexed__:
+            self.__tags_indexed__ = True
+            for note in self.data.values():
+                self.__index_tags__(note.id, tuple(tag.value for tag in note.tags))
+
+    # індекси не зберігаються у знімку — вони перебудовуються при потребі після завантаження
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items()
+                if not (key.startswith("__") and key.endswith("__"))}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__build_indexes__()
+        for note in self.data.values():
+            note.book = self
+
+    def __setitem__(self, note_id: int, note: Note):
+        self.remember(note_id)
+        if note_id in self.data:
+            del self[note_id]
+        self.data[note_id] = note
+        note.book = self
+        self.__index_note__(note)
+        if self.__sorted_ids__ is not None:
+            self.__sorted_ids__.add(note_id)
+        if self.__text_column__ is not None:
+            self.__text_column__.add(note_id, note.content.value)
+
+    def __delitem__(self, note_id: int):
+        self.remember(note_id)
+        note = self.data.pop(note_id)
+        note.book = None
+        if self.__sorted_ids__ is not None:
+            self.__sorted_ids__.remove(note_id)
+        if self.__text_column__ is not None:
+            self.__text_column__.remove(note_id)
+        if self.__indexed__:
+            self.__content_index__.remove(note_id)
+        if self.__tags_indexed__:
+            self.__index_tags__(note_id, None)
+
+    # Якщо книга записує версію (див. history), зберігає копію нотатки перед її першою зміною в цій версії.
+    def remember(self, note_id: int):
+        changes = self.__changes__
+        if changes is not None and note_id not in changes:
+            note = self.data.get(note_id)
+            changes[note_id] = copy.copy(note) if note is not None else None
+
+    # оновлює книгу після зміни нотатки: записує її назад у сховище книги
+    # (для сховищ поза пам'яттю) і оновлює індекси
+    def reindex(self, note: Note):
+        if self.data.get(note.id) is not note:
+            return
+        self.data[note.id] = note
+        self.__index_note__(note)
+        if self.__text_column__ is not None:
+            self.__text_column__.add(note.id, note.content.value)
+
+    def __index_note__(self, note: Note):
+        if self.__indexed__:
+            self.__content_index__.update(note.id, note.content.value)
+        if self.__tags_indexed__:
+            self.__index_tags__(note.id, tuple(tag.value for tag in note.tags))
+
+    # оновлює індекси тегів нотатки; new_tags=None прибирає нотатку з індексів
+    def __index_tags__(self, note_id: int, new_tags: tuple[str, ...] | None):
+        old_tags = self.__note_tags__.get(note_id)
+        if old_tags == new_tags:
+            return
+
+        if old_tags is not None:
+            self.__first_tag_index__[old_tags[0] if old_tags else ""].discard(note_id)
+            for tag in set(old_tags) - set(new_tags or ()):
+                note_ids = self.__tag_index__[tag]
+                note_ids.discard(note_id)
+                if not note_ids:
+                    del self.__tag_index__[tag]
+                    del self.__sorted_tags__[bisect.bisect_left(self.__sorted_tags__, tag)]
+            old_tags = set(old_tags)
+        else:
+            old_tags = set()
+
+        if new_tags is None:
+            self.__note_tags__.pop(note_id, None)
+            return
+
+        for tag in set(new_tags) - old_tags:
+            if tag not in self.__tag_index__:
+                self.__tag_index__[tag] = set()
+                bisect.insort(self.__sorted_tags__, tag)
+            self.__tag_index__[tag].add(note_id)
+
+        self.__first_tag_index__.setdefault(new_tags[0] if new_tags else "", set()).add(note_id)
+        self.__note_tags__[note_id] = new_tags
+
+    # усі теги книги у відсортованому порядку
+    def get_tags(self) -> list[str]:
+        self.__ensure_tag_indexes__()
+        return list(self.__sorted_tags__)
+
+    # теги, що починаються з prefix, за алфавітом (не більше limit) - для автодоповнення
+    def complete_tag(self, prefix: str, limit: int | None = None) -> list[str]:
+        self.__ensure_tag_indexes__()
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.__sorted_tags__, prefix)
+        stop = prefix_stop(prefix)
+        end = len(self.__sorted_tags__) if stop is None else bisect.bisect_left(self.__sorted_tags__, stop, start)
+        return self.__sorted_tags__[start:end if limit is None else min(end, start + limit)]
+
+    # id нотаток з low до high (не включно) за зростанням
+    def __iter_note_ids__(self, low: int, high: int):
+        if self.__sorted_ids__ is None:
+            self.__sorted_ids__ = SortedKeys(self.data.keys())
+        return self.__sorted_ids__.irange(low, high)
+
+    # id нотаток, запис яких починається з prefix (для автодоповнення): "12" - це 12, 120..129,
+    # 1200..1299 і т.д. Кожна довжина id - один діапазон упорядкованого індексу id, тож обходяться
+    # лише id, що підходять.
+    def complete_note_id(self, prefix: str, limit: int | None = None) -> list[str]:
+        if prefix and (not prefix.isdigit() or prefix.startswith("0")):
+            return []
+
+        found: list[int] = []
+        low, high = (int(prefix), int(prefix) + 1) if prefix else (1, 10)
+        while low < self.note_id_counter and (limit is None or len(found) < limit):
+            found.extend(itertools.islice(self.__iter_note_ids__(low, high),
+                                          None if limit is None else limit - len(found)))
+            low, high = (low * 10, high * 10) if prefix else (high, high * 10)
+        return [str(note_id) for note_id in found]
+
     def add_note(self, content: str) -> int:
         new_id = self.note_id_counter
         note = Note(content, new_id)
-        self.data[new_id] = note
+        self[new_id] = note
         self.note_id_counter += 1
         return new_id
 
@@ -94,7 +298,7 @@ class NoteBook(UserDict):
 
     def delete_note(self, note_id: int) -> bool:
         if note_id in self.data:
-            del self.data[note_id]
+            del self[note_id]
             return True
         return False
 
@@ -105,36 +309,78 @@ class NoteBook(UserDict):
             return True
         return False
 
-    def search_notes_by_content(self, query: str) -> list[Note]:
-        query = query.strip()
-        if not query:
+    # Пошук нотаток за словами через повнотекстовий індекс.
+    # Слова запиту поєднуються через AND; "OR" між словами дає пошук будь-якого з них.
+    # Результати впорядковані за релевантністю (BM25); offset/limit повертають лише потрібну сторінку.
+    def search_notes_by_content(self, query: str, offset: int = 0, limit: int | None = None) -> list[Note]:
+        words = query.split()
+        match_all = "OR" not in words
+        terms = FullTextIndex.tokenize(" ".join(word for word in words if word != "OR"))
+        if not terms:
             raise ValidSearchQueryError()
-        results: list[Note] = []
-        query_lower = query.lower()
-        for note in self.data.values():
-            if query_lower in note.content.value.lower():
-                results.append(note)
-        return results
 
+        self.__ensure_indexes__()
+        scores = self.__content_index__.search(terms, match_all)
+        # вища оцінка — вище; за однакової оцінки раніша нотатка йде першою
+        def rank_key(item):
+            return item[1], -item[0]
+
+        if limit is None:
+            ranked = sorted(scores.items(), key=rank_key, reverse=True)[offset:]
+        else:
+            ranked = heapq.nlargest(offset + limit, scores.items(), key=rank_key)[offset:]
+
+        return [self.data[note_id] for note_id, _ in ranked]
+
+    # Нотатки, в тексті яких є збіг з регулярним виразом pattern, у порядку id.
+    # Тексти нотаток - готові рядки, тож в одному процесі найшвидше переглянути самі нотатки. Колонка
+    # текстів потрібна лише великим книгам на кількох ядрах: її шматки переглядає пул процесів
+    # (див. parallel_search). Перший такий пошук переглядає нотатки і заодно заповнює колонку.
+    def search_notes_by_regex(self, pattern: str, flags: int = 0) -> list[Note]:
+        if not use_pool(len(self.data)):
+            search = re.compile(pattern, flags).search
+            return sorted((note for note in self.data.values() if search(note.content.value)),
+                          key=lambda note: note.id)
+
+        column = self.__text_column__
+        if column is None or column.stale:
+            if column is not None:
+                column.close()
+            column = self.__text_column__ = TextColumn()
+            note_ids = column.fill(((note_id, note.content.value) for note_id, note in self.data.items()),
+                                   pattern, flags)
+        else:
+            note_ids = column.search(pattern, flags)
+        return [self.data[note_id] for note_id in sorted(note_ids)]
+
+    # Пошук нотаток за тегом через індекс тег -> id нотаток.
     def search_notes_by_tag(self, tag_query: str) -> list[Note]:
         tag_query = tag_query.strip()
         if not tag_query:
             raise ValidTagError()
-        results: list[Note] = []
-        tag_query_lower = tag_query.lower()
-        for note in self.data.values():
-            if note.has_tag(tag_query_lower):
-                results.append(note)
-        return results
+        self.__ensure_tag_indexes__()
+        note_ids = self.__tag_index__.get(tag_query.lower(), set())
+        return [self.data[note_id] for note_id in sorted(note_ids)]
+
+    # Нотатки в порядку першого тегу (без тегів — в кінці) без повного сортування книги:
+    # обходимо відсортований список тегів і беремо нотатки, для яких цей тег перший.
+    def iter_notes_sorted_by_tags(self):
+        self.__ensure_tag_indexes__()
+        for tag in self.__sorted_tags__:
+            for note_id in sorted(self.__first_tag_index__.get(tag, ())):
+                yield self.data[note_id]
+
+        for note_id in sorted(self.__first_tag_index__.get("", ())):
+            yield self.data[note_id]
 
     def sort_notes_by_tags(self) -> list[Note]:
-        # \uffff - символ, який гарантовано буде "більшим" за будь-який інший тег
-        def sort_key(note: Note):
-            if note.tags:
-                return note.tags[0].value
-            return "\uffff"
+        return list(self.iter_notes_sorted_by_tags())
 
-        return sorted(self.data.values(), key=sort_key)
+    # Нотатки книги з offset (не більше limit) без декодування пропущених нотаток.
+    def iter_notes(self, offset: int = 0, limit: int | None = None):
+        stop = None if limit is None else offset + limit
+        for note_id in itertools.islice(iter(self.data), offset, stop):
+            yield self.data[note_id]
 
     def __str__(self):
         if not self.data:
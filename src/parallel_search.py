@@ -0,0 +1,128 @@
+# тут паралельний пошук регулярним виразом по текстах записів великих книг
+# Тексти записів складаються в один файл-колонку (utf-8, записи розділені байтом 0xFF, якого
+# не буває в utf-8). Процеси пулу відкривають колонку через mmap і переглядають кожен свій шматок,
+# тож записи не передаються їм через pickle: у завдання потрапляють лише межі шматка і шаблон.
+import mmap
+import os
+import re
+import tempfile
+import weakref
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+SEPARATOR = b"\xff"
+# Менші книги переглядаються в поточному процесі. Простий перегляд 50k нотаток триває ~0.17 с на шаблон,
+# а перший пошук пулом додає ~0.3 с на запуск процесів і побудову колонки (див. benchmarks.parallel_regex).
+PARALLEL_THRESHOLD = 50_000
+SHARDS_PER_WORKER = 4        # дрібніші шматки вирівнюють навантаження між процесами
+
+__pool__: ProcessPoolExecutor | None = None
+
+
+def workers() -> int:
+    return os.cpu_count() or 1
+
+
+# Чи варто шукати в count записах пулом процесів. На одному ядрі пул лише додає витрати на колонку
+# і передачу шматків, а в малих книгах простий перегляд записів швидший за запуск завдань пулу.
+def use_pool(count: int) -> bool:
+    return workers() > 1 and count >= PARALLEL_THRESHOLD
+
+
+# Пул процесів створюється при першому паралельному пошуку і живе до кінця роботи.
+# Процеси запускаються через spawn: асистент має фонові потоки, з якими fork небезпечний.
+def get_pool() -> ProcessPoolExecutor:
+    global __pool__
+    if __pool__ is None:
+        __pool__ = ProcessPoolExecutor(workers(), mp_context=get_context("spawn"))
+    return __pool__
+
+
+# Переглядає записи колонки з байтів [start, stop) і повертає номери записів, у яких є збіг.
+# first - номер першого запису шматка. Виконується в процесах пулу.
+def scan_shard(file_name: str, start: int, stop: int, first: int, pattern: str, flags: int) -> list[int]:
+    search = re.compile(pattern, flags).search
+    with open(file_name, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        entries = data[start:stop].split(SEPARATOR)
+    return [first + number for number, text in enumerate(entries[:-1]) if search(text.decode("UTF-8"))]
+
+
+# Колонка текстів записів книги. Зміни дописуються в кінець файлу, а застарілі версії записів
+# відкидаються при злитті результатів; коли застарілих стає більше, ніж живих, книга будує колонку заново.
+class TextColumn:
+
+    def __init__(self, items=()):
+        handle, self.file_name = tempfile.mkstemp(prefix="book-column-")
+        self.__file__ = os.fdopen(handle, "wb")
+        self.__finalizer__ = weakref.finalize(self, remove_column, self.__file__, self.file_name)
+        self.offsets = array("q")          # номер запису -> зсув його тексту у файлі
+        self.keys: list = []               # номер запису -> ключ
+        self.live: dict = {}               # ключ -> номер його актуального запису
+        self.size = 0
+        for key, text in items:
+            self.add(key, text)
+
+    def add(self, key, text: str):
+        raw = text.encode("UTF-8") + SEPARATOR
+        self.__file__.write(raw)
+        self.offsets.append(self.size)
+        self.size += len(raw)
+        self.live[key] = len(self.keys)
+        self.keys.append(key)
+
+    def remove(self, key):
+        self.live.pop(key, None)
+
+    # Додає записи items (пари ключ, текст) і повертає ключі тих, у тексті яких є збіг з pattern.
+    # Так перший пошук коштує один перегляд записів, а не побудову колонки і ще один перегляд.
+    def fill(self, items, pattern: str, flags: int = 0) -> list:
+        search = re.compile(pattern, flags).search
+        found = []
+        for key, text in items:
+            self.add(key, text)
+            if search(text):
+                found.append(key)
+        return found
+
+    @property
+    def stale(self) -> bool:
+        return len(self.keys) > 2 * len(self.live) + 1000
+
+    def close(self):
+        self.__finalizer__()
+
+    # Ключі записів, текст яких містить збіг з pattern, у порядку запису в колонку.
+    # Великі колонки діляться на шматки по межах записів і переглядаються пулом процесів.
+    def search(self, pattern: str, flags: int = 0) -> list:
+        count = len(self.keys)
+        if not count:
+            return []
+        self.__file__.flush()
+        if not use_pool(count):
+            shards = [(0, count)]
+        else:
+            step = -(-count // (workers() * SHARDS_PER_WORKER))
+            shards = [(first, min(first + step, count)) for first in range(0, count, step)]
+
+        def bounds(first: int, last: int) -> tuple:
+            stop = self.offsets[last] if last < count else self.size
+            return self.file_name, self.offsets[first], stop, first, pattern, flags
+
+        if len(shards) == 1:
+            found = [scan_shard(*bounds(*shards[0]))]
+        else:
+            pool = get_pool()
+            # результати збираються в порядку шматків, тож загальний порядок - порядок колонки
+            found = list(pool.map(scan_shard, *zip(*(bounds(*shard) for shard in shards))))
+
+        return [self.keys[number] for numbers in found for number in numbers
+                if self.live.get(self.keys[number]) == number]
+
+
+def remove_column(file, file_name: str):
+    file.close()
+    try:
+        os.remove(file_name)
+    except OSError:
+        pass
@@ -1,23 +1,61 @@
 from . import address_book
 from . import note_book
-import pickle
 import os
 from .personal_assistant_address_book_handler import PersonalAssistantAddressBookHandler
 from .personal_assistant_note_book_handler import PersonalAssistantNoteBookHandler
-from .general import input_error
-import difflib
+from .general import input_error, is_error, pop_flag, INVALID_ARGUMENTS
+from .journal import Journal
+from .profiler import Profiler, UNKNOWN_COMMAND
+from .background_writer import BackgroundWriter
+from . import server
+from .indexes import FuzzyMatcher
+from .completion import Completer
+from .history import History
+from .book_manager import BookManager, TenantBooks, MEMORY_BUDGET, tenant_folder
+from . import storage
+from . import sqlite_storage
+import argparse
+import asyncio
+from contextlib import nullcontext
+import sys
+import threading
+import time
+import types
 import re
 from pathlib import Path
 from . import __version__
 
+# запис журналу "unique-phones on|off": з цим налаштуванням виконані наступні команди журналу
+UNIQUE_PHONES_SETTING = "unique-phones"
+
 
 # Main Class
 class PersonalAssistant:
-    def __init__(self):
+    # storage: "files" - файли .dat з журналом змін, "sqlite" - база books.db (кожна зміна - транзакція)
+    # unique_phones: заборонити один номер телефону у кількох контактів
+    # profile: вимірювати час, процесорний час і пам'ять кожної команди (команда stats)
+    # save_delay: у діалозі зміни записуються фоновим потоком не пізніше ніж через стільки секунд
+    #     (всі зміни за цей час - одним записом); 0 - запис одразу після кожної команди
+    # folder: папка книг (за замовчуванням домашня папка користувача)
+    def __init__(self, storage: str = "files", unique_phones: bool = False, profile: bool = False,
+                 save_delay: float = 1.0, folder: str | None = None):
+        self.__storage__ = storage
+        self.__folder__ = folder
+        self.__tenants__: BookManager | None = None  # книги орендарів у серверному режимі з --tenants
+        self.__unique_phones__ = unique_phones
+        self.__profiler__ = Profiler(profile)
+        self.__save_delay__ = save_delay
+        self.__writer__ = None
+        self.__lock__ = threading.RLock()  # книги змінюються або записуються лише під цим замком
+        self.__pending__: list[str] = []  # змінюючі команди, ще не записані фоновим потоком
+        self.__pending_snapshot__ = False  # фоновий потік має записати повний знімок
         self.__abook__ = None
         self.__nbook__ = None
+        self.__save_folder__ = None
+        self.__journal__ = None
         self.__assistant_handler__ = PersonalAssistantAddressBookHandler()
         self.__note_handler__ = PersonalAssistantNoteBookHandler()
+        self.__history__ = History()  # версії книг для undo/redo у діалозі
 
         self.__sys_commands__ = {
             "close": [self.__exit__, True],
@@ -28,6 +66,11 @@ class PersonalAssistant:
             "clear": [self.__clear_console__, False],
             "help": [self.__show_help__, False],
             "version": [(lambda args: __version__), False],
+            "stats": [self.__show_stats__, False],
+            "regex": [self.__regex_search__, False],
+            "undo": [self.__undo__, False],
+            "redo": [self.__redo__, False],
+            "history": [self.__show_history__, False],
         }
 
         self.__abook_commands__ = {
@@ -41,12 +84,16 @@ class PersonalAssistant:
             "get-phone": self.__assistant_handler__.get_phone_by_name,
             "get-contacts": self.__assistant_handler__.get_all_contacts,
             "get-info": self.__assistant_handler__.get_contact_info,
+            "get-contact-by-phone": self.__assistant_handler__.get_contact_by_phone,
+            "find-contact-fuzzy": self.__assistant_handler__.find_contact_fuzzy,
             "change-phone": self.__assistant_handler__.change_phone,
             "change-email": self.__assistant_handler__.change_email,
             "change-birthday": self.__assistant_handler__.add_birthday,
             "change-address": self.__assistant_handler__.add_address,
             "delete-contact": self.__assistant_handler__.delete_contact,
-            "delete-phone": self.__assistant_handler__.delete_phone
+            "delete-phone": self.__assistant_handler__.delete_phone,
+            "import-contacts": self.__assistant_handler__.import_contacts,
+            "export-contacts": self.__assistant_handler__.export_contacts,
          }
 
         self.__nbook_commands__ = {
@@ -60,9 +107,35 @@ class PersonalAssistant:
             "get-notes-by-text": self.__note_handler__.search_notes,
             "get-notes-by-tag":  self.__note_handler__.search_by_tag,
             "get-notes-sorted-by-tags": self.__note_handler__.sort_by_tags,
+            "import-notes": self.__note_handler__.import_notes,
+            "export-notes": self.__note_handler__.export_notes,
+        }
+
+        # команди, що читають зовнішній файл або повертають книги до попередньої версії: їх не можна
+        # повторити з журналу, тому після них книги одразу зберігаються повним знімком
+        self.__snapshot_commands__ = {"import-contacts", "import-notes", "undo", "redo"}
+
+        # команди книг, що лише читають їх: не фіксуються в журналі, не створюють версій для undo
+        # і на сервері виконуються під замком читання; решта команд книг змінює книги
+        self.__read_commands__ = {
+            "get-birthday", "get-upcoming-birthdays", "get-phone", "get-contacts", "get-info",
+            "get-contact-by-phone", "find-contact-fuzzy", "export-contacts",
+            "get-note", "get-notes", "get-notes-by-text", "get-notes-by-tag", "get-notes-sorted-by-tags",
+            "export-notes",
         }
 
         self.__pool_commands__ = [self.__abook_commands__, self.__nbook_commands__, self.__sys_commands__]
+        # нечіткий пошук команд для підказок будується один раз
+        self.__command_matcher__ = FuzzyMatcher(command for commands in self.__pool_commands__ for command in commands)
+        # що доповнювати клавішею Tab в аргументах команд: ім'я контакту, id нотатки чи тег
+        self.__command_arguments__ = {
+            **dict.fromkeys(("add-phone", "add-email", "add-birthday", "add-address", "get-birthday", "get-phone",
+                             "get-info", "change-phone", "change-email", "change-birthday", "change-address",
+                             "delete-contact", "delete-phone"), ("name",)),
+            **dict.fromkeys(("get-note", "change-note", "delete-note"), ("note",)),
+            **dict.fromkeys(("add-tag", "delete-tag"), ("note", "tag")),
+            "get-notes-by-tag": ("tag",),
+        }
 
     # privat methods
     def __exit__(self, args) -> str:
@@ -113,6 +186,84 @@ class PersonalAssistant:
 
         return help
 
+    # stats - таблиця p50/p95/p99 по командах; stats json|prometheus [файл] - експорт вимірів
+    def __show_stats__(self, args) -> str:
+        if not self.__profiler__.enabled:
+            return "Profiling is off. Start the assistant with --profile."
+
+        export_format = args[0].lower() if args else "table"
+        if export_format == "json":
+            text = self.__profiler__.to_json()
+        elif export_format == "prometheus":
+            text = self.__profiler__.to_prometheus()
+        elif export_format == "table":
+            return self.__profiler__.report()
+        else:
+            return "Use: stats [json|prometheus] [file]"
+
+        if len(args) < 2:
+            return text
+        file_name = os.path.expanduser(args[1])
+        try:
+            with open(file_name, "w", encoding="UTF-8") as f:
+                f.write(text)
+        except OSError as e:
+            return f"Cannot write {file_name}: {e.strerror}"
+        return f"Stats written to {file_name}."
+
+    # Пошук регулярним виразом у контактах і нотатках: regex <шаблон...> [--contacts] [--notes].
+    # Без прапорців шукає в обох книгах; великі книги переглядаються паралельно кількома процесами.
+    # books - пара (abook, nbook) орендаря, за замовчуванням книги асистента.
+    def __regex_search__(self, args, books: tuple = None) -> str:
+        args = list(args)
+        contacts, notes = pop_flag(args, "contacts"), pop_flag(args, "notes")
+        if not (contacts or notes):
+            contacts = notes = True
+
+        pattern = " ".join(args)
+        if not pattern:
+            return INVALID_ARGUMENTS
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            return f"Invalid regular expression: {e}"
+
+        lines = []
+        abook, nbook = books or (self.__abook__, self.__nbook__)
+        with self.__lock__ if books is None else nullcontext():  # книги орендаря вже під його замком
+            if contacts:
+                lines += [str(record) for record in abook.search_regex(pattern)]
+            if notes:
+                lines += [str(note) for note in nbook.search_notes_by_regex(pattern)]
+        return "\n".join(lines) if lines else "No matches."
+
+    # undo [N] / redo [N] - скасовує або повторює N останніх змін книг (за замовчуванням одну).
+    # Історія живе лише в межах сеансу діалогу; після кроку книги зберігаються повним знімком.
+    def __undo__(self, args) -> str:
+        return self.__step_history__("undo", args, self.__history__.undo, "Undone", "Nothing to undo.")
+
+    def __redo__(self, args) -> str:
+        return self.__step_history__("redo", args, self.__history__.redo, "Redone", "Nothing to redo.")
+
+    def __step_history__(self, command: str, args, step, done: str, empty: str) -> str:
+        if args and not (args[0].isdigit() and int(args[0]) > 0):
+            return INVALID_ARGUMENTS
+
+        lines = []
+        with self.__lock__:
+            for _ in range(int(args[0]) if args else 1):
+                version = step()
+                if version is None:
+                    break
+                lines.append(f"{done}: {version.command}")
+            if lines:
+                self.__commit_later__(command)
+        return "\n".join(lines) or empty
+
+    def __show_history__(self, args) -> str:
+        with self.__lock__:
+            return "\n".join(self.__history__.lines()) or "History is empty."
+
     def __clear_console__(self, args) -> str:
         if os.name == 'nt':  # For Windows
             os.system('cls')
@@ -121,40 +272,162 @@ class PersonalAssistant:
 
         return ""
 
+    # Книга відкривається з файлу .dat через mmap (записи декодуються при зверненні).
+    # Якщо його ще немає — завантажується старий знімок .pkl, який при збереженні перейде у .dat.
+    # Знімок, який не вдається прочитати, - помилка storage.BookFileError, а не порожня книга.
     def __load_abook__(self, file_name: str) -> address_book.AddressBook:
+        if os.path.exists(file_name):
+            return storage.open_book(file_name, address_book.AddressBook)
         try:
-            with open(file_name, "rb") as f:
-                return pickle.load(f)
+            with open(os.path.splitext(file_name)[0] + ".pkl", "rb") as f:
+                return storage.load_pickle(f.read(), f.name)
         except FileNotFoundError:
             return address_book.AddressBook()
-        except ModuleNotFoundError:
-            return address_book.AddressBook()
 
     def __load_nbook__(self, file_name: str) -> note_book.NoteBook:
+        if os.path.exists(file_name):
+            return storage.open_book(file_name, note_book.NoteBook)
         try:
-            with open(file_name, "rb") as f:
-                return pickle.load(f)
+            with open(os.path.splitext(file_name)[0] + ".pkl", "rb") as f:
+                return storage.load_pickle(f.read(), f.name)
         except FileNotFoundError:
             return note_book.NoteBook()
-        except ModuleNotFoundError:
-            return note_book.NoteBook()
 
+    # повний знімок книг (згортання журналу); файли замінюються атомарно
     def __save__(self, save_folder_path: str = None):
         if save_folder_path is None:
-            save_folder_path = os.path.expanduser("~")
+            save_folder_path = self.__save_folder__ or os.path.expanduser("~")
+        self.__save_books__(self.__abook__, self.__nbook__, self.__journal__, save_folder_path)
+
+    def __save_books__(self, abook, nbook, journal: Journal | None, save_folder_path: str):
+        if self.__storage__ == "sqlite":  # зміни вже збережені транзакціями бази
+            return
 
-        with open(save_folder_path + "/abook.pkl", "wb") as f:
-            pickle.dump(self.__abook__, f)
+        with self.__profiler__.phase("save_seconds"):
+            if journal is not None:
+                abook.journal_seq = journal.seq
+                nbook.journal_seq = journal.seq
 
-        with open(save_folder_path + "/nbook.pkl", "wb") as f:
-            pickle.dump(self.__nbook__, f)
+            storage.save_book(abook, save_folder_path + "/abook.dat")
+            storage.save_book(nbook, save_folder_path + "/nbook.dat")
+
+            if journal is not None:
+                journal.clear()
 
     def __load__(self, save_folder_path: str = None):
         if save_folder_path is None:
-            save_folder_path = os.path.expanduser("~")
+            save_folder_path = self.__folder__ or os.path.expanduser("~")
+        self.__save_folder__ = save_folder_path
+        self.__abook__, self.__nbook__, self.__journal__ = self.__load_books__(save_folder_path)
+
+    # Відкриває книги папки і повторює ще не згорнутий журнал. Повертає (abook, nbook, журнал або None).
+    def __load_books__(self, save_folder_path: str) -> tuple:
+        if self.__storage__ == "sqlite":
+            # нова база заповнюється книгами з файлового сховища (.dat або старих .pkl)
+            abook, nbook = sqlite_storage.open_books(
+                save_folder_path + "/books.db",
+                migrate_from=lambda: (self.__load_abook__(save_folder_path + "/abook.dat"),
+                                      self.__load_nbook__(save_folder_path + "/nbook.dat")))
+            abook.unique_phones = self.__unique_phones__
+            return abook, nbook, None
+
+        abook = self.__load_abook__(save_folder_path + "/abook.dat")
+        nbook = self.__load_nbook__(save_folder_path + "/nbook.dat")
+        abook.unique_phones = self.__unique_phones__
+
+        # Команди журналу повторюються з тими налаштуваннями, з якими їх виконав сеанс, що їх записав:
+        # інакше відхилений з --unique-phones номер після перезапуску без прапорця потрапив би в книгу.
+        journal = Journal(save_folder_path + "/journal.log", [self.__setting_entry__()])
+        journal.seq = max(abook.journal_seq, nbook.journal_seq)
+        for seq, user_input in journal.load():
+            self.__replay__(seq, user_input, (abook, nbook))
+        abook.unique_phones = self.__unique_phones__
+        return abook, nbook, journal
+
+    # запис журналу з налаштуваннями сеансу, що впливають на результат змінюючих команд
+    def __setting_entry__(self) -> str:
+        return f"{UNIQUE_PHONES_SETTING} {'on' if self.__unique_phones__ else 'off'}"
+
+    # повторно застосовує запис журналу, якщо він ще не потрапив у знімок відповідної книги
+    def __replay__(self, seq: int, user_input: str, books: tuple = None):
+        command, *args = self.__parse_input__(user_input)
+        if command == UNIQUE_PHONES_SETTING:
+            (books or (self.__abook__, self.__nbook__))[0].unique_phones = args == ["on"]
+            return
+
+        book_command = self.__book_command__(command, books)
+        if book_command is not None and self.__is_mutating__(command) and seq > book_command[1].journal_seq:
+            book_command[0](args, book_command[1])
+
+    # фіксує змінюючі команди в журналі одним записом; час від часу журнал згортається у знімок.
+    # books - книги орендаря (TenantBooks), за замовчуванням книги асистента
+    def __commit__(self, *user_inputs: str, books: TenantBooks = None):
+        journal = self.__journal__ if books is None else books.journal
+        if journal is None:
+            if self.__storage__ == "sqlite" and user_inputs:  # у пакеті команд фіксується його транзакція
+                self.__abook__.__conn__.checkpoint()
+            return
+        save = self.__save__ if books is None else (lambda: self.__tenants__.save(books))
+
+        commands = [self.__parse_input__(user_input)[0] for user_input in user_inputs]
+        if self.__snapshot_commands__.intersection(commands):
+            # журнал до цих команд і самі команди вже відображені у знімку
+            save()
+            return
+
+        if journal.need_compact():
+            journal.extend(list(user_inputs))
+            save()
+        else:
+            with self.__profiler__.phase("save_seconds"):
+                journal.extend(list(user_inputs))
+
+    # У діалозі з фоновим записом команда лише ставиться в чергу, і підказка з'являється одразу.
+    def __commit_later__(self, user_input: str):
+        if self.__writer__ is None:
+            self.__commit__(user_input)
+            return
+
+        if self.__parse_input__(user_input)[0] in self.__snapshot_commands__:
+            self.__pending_snapshot__ = True
+        else:
+            self.__pending__.append(user_input)
+        self.__writer__.notify()
 
-        self.__abook__ = self.__load_abook__(save_folder_path+"/abook.pkl")
-        self.__nbook__ = self.__load_nbook__(save_folder_path+"/nbook.pkl")
+    # Викликається фоновим потоком: записує накопичені команди в журнал одним записом
+    # (або одразу повний знімок) під замком, тож книги в цей час не змінюються.
+    def __flush__(self):
+        with self.__lock__:
+            if self.__pending_snapshot__:
+                self.__save__()  # знімок уже містить усі зміни з черги
+            else:
+                with self.__profiler__.phase("save_seconds"):
+                    self.__journal__.extend(self.__pending__)
+                if self.__journal__.need_compact():
+                    self.__save__()
+            self.__pending__.clear()
+            self.__pending_snapshot__ = False
+
+    # результат обробника - рядок або генератор рядків, які виводяться по мірі готовності
+    def __print__(self, result):
+        if isinstance(result, types.GeneratorType):
+            for line in result:
+                print(line)
+        else:
+            print(result)
+
+    def __is_mutating__(self, command: str) -> bool:
+        return command not in self.__read_commands__
+
+    # обробник команди книги і книга, з якою він працює, або None для інших команд;
+    # books - пара (abook, nbook), за замовчуванням книги асистента
+    def __book_command__(self, command: str, books: tuple = None) -> tuple | None:
+        abook, nbook = books or (self.__abook__, self.__nbook__)
+        if command in self.__nbook_commands__:
+            return self.__nbook_commands__[command], nbook
+        if command in self.__abook_commands__:
+            return self.__abook_commands__[command], abook
+        return None
 
     # handlers
     @input_error
@@ -166,24 +439,32 @@ class PersonalAssistant:
     @input_error
     def __run_command__(self, user_input: str) -> bool:
         command, *args = self.__parse_input__(user_input)
+        known = self.__book_command__(command) is not None or command in self.__sys_commands__
+        with self.__profiler__.command(command if known else UNKNOWN_COMMAND):
+            return self.__execute__(command, args, user_input)
 
-        if command in self.__nbook_commands__:
-            print(self.__nbook_commands__[command](args, self.__nbook__))
-            if not command.startswith("get"):
-                self.__save__()
-        elif command in self.__abook_commands__:
-            print(self.__abook_commands__[command](args, self.__abook__))
-            if not command.startswith("get"):
-                self.__save__()
+    def __execute__(self, command: str, args: list, user_input: str) -> bool:
+        book_command = self.__book_command__(command)
+
+        if book_command is not None:
+            handler, book = book_command
+            mutating = self.__is_mutating__(command)
+            with self.__lock__:
+                with self.__profiler__.phase("handler_seconds"), \
+                        self.__history__.version(user_input, book) if mutating else nullcontext():
+                    result = handler(args, book)
+                    self.__print__(result)
+                if mutating:
+                    self.__commit_later__(user_input)
+            if is_error(result):
+                self.__profiler__.error()
         elif command in self.__sys_commands__:
             print(self.__sys_commands__[command][0](args))
             if self.__sys_commands__[command][1]:
                 return True
         else:
             print("Invalid command.")
-            suggestions_list = self.get_suggestion(command)
-            if suggestions_list is None or len(suggestions_list) == 0:
-                suggestions_list = self.get_suggestion(command, 1, 0.45)  # шукаю з меншою точністю команди
+            suggestions_list = self.get_suggestion(command, 3, 0.45)
 
             if suggestions_list is not None and len(suggestions_list) > 0:
                 commands_str: str = ", ".join(suggestions_list)
@@ -192,21 +473,49 @@ class PersonalAssistant:
 
         return False
 
+    # Автодоповнення клавішею Tab. Індекси імен, id нотаток і тегів будуються фоновим потоком під замком книг,
+    # поки користувач набирає першу команду, тож перше ж натискання Tab не чекає на побудову.
+    def __install_completion__(self):
+        def locked(complete):
+            def inner(prefix: str, limit: int) -> list[str]:
+                with self.__lock__:
+                    return complete(prefix, limit)
+            return inner
+
+        completer = Completer(
+            (command for commands in self.__pool_commands__ for command in commands),
+            self.__command_arguments__,
+            {"--from": "name", "--to": "name"},
+            {
+                "name": locked(lambda prefix, limit: self.__abook__.complete_name(prefix.capitalize(), limit)),
+                "note": locked(lambda prefix, limit: self.__nbook__.complete_note_id(prefix, limit)),
+                "tag": locked(lambda prefix, limit: self.__nbook__.complete_tag(prefix, limit)),
+            })
+        if not completer.install():
+            return
+
+        def warm_up():
+            with self.__lock__:
+                self.__abook__.iter_names()
+                self.__nbook__.complete_note_id("", 1)
+                self.__nbook__.complete_tag("", 1)
+        threading.Thread(target=warm_up, name="completion-warm-up", daemon=True).start()
+
     def __main_run__(self):
         print("Welcome to the assistant bot!")
+        if sys.stdin.isatty():
+            self.__install_completion__()
         while True:
             user_input = input("Enter a command: ")
             if self.__run_command__(user_input):
                 break
 
     # public methods
+    # До count команд зі схожістю не менше prc, найсхожіші першими (один прохід по заздалегідь
+    # підготовлених назвах команд; схожість рахується за відстанню Дамерау-Левенштейна).
     @input_error
     def get_suggestion(self, command: str, count: int = 1, prc: float = 0.6) -> list | None:
-        matches: list = []
-        for cmd_dic in self.__pool_commands__:
-            matches += difflib.get_close_matches(command, cmd_dic.keys(), n=count, cutoff=max(0.2, min(1, prc)))
-
-        return matches
+        return self.__command_matcher__.match(command, max(0.2, min(1, prc)), count)
 
     def apply_suggestion(self, params: str) -> bool:
         print(f"\nDo you want run this command: {params} \n[y]=yes [any key]=no")
@@ -217,11 +526,229 @@ class PersonalAssistant:
 
         return False
 
+    # Діалог. Зміни записує фоновий потік; при виході (і при перериванні) все незаписане
+    # дописується в журнал, а після звичайного виходу журнал згортається у знімок.
     def run(self):
         self.__load__()
-        self.__main_run__()
+        if self.__save_delay__ > 0 and self.__journal__ is not None:
+            self.__writer__ = BackgroundWriter(self.__flush__, self.__save_delay__)
+        try:
+            self.__main_run__()
+        finally:
+            if self.__writer__ is not None:
+                self.__writer__.close()
+                self.__writer__ = None
+        with self.__profiler__.command("exit"):
+            self.__save__()
+
+    # Виконує команду клієнта сервера і повертає її вивід замість друку.
+    # Команди, що лише читають книги, виконуються одночасно під замком читання, змінюючі - по одній під замком
+    # запису, а їхня фіксація в журналі групується фоновим потоком, як у діалозі. Книги SQLite
+    # мають одне з'єднання з базою, тож з ними всі команди виконуються по одній.
+    # session - стан з'єднання клієнта (обраний командою tenant <id> орендар).
+    @input_error
+    def __serve_command__(self, user_input: str, session: dict = None) -> str:
+        command, *args = self.__parse_input__(user_input)
+        args = [arg for arg in args if arg != "--pager"]  # на сервері немає кому гортати сторінки
+        if self.__tenants__ is not None:
+            if command == "tenant":
+                self.__tenants__.folder(args[0])  # перевіряє id
+                session["tenant"] = args[0]
+                return f"Using books of tenant {args[0]}."
+            if command == "regex" or command in self.__abook_commands__ or command in self.__nbook_commands__:
+                return self.__serve_tenant_command__(command, args, user_input, session.get("tenant"))
+        book_command = self.__book_command__(command)
+
+        if book_command is None:
+            if command in server.SYSTEM_COMMANDS:
+                with self.__profiler__.command(command):
+                    return str(self.__sys_commands__[command][0](args))
+            if command in server.PROMPT_COMMANDS:
+                return f"{command} is only available in the interactive prompt."
+            suggestions = self.get_suggestion(command, 3, 0.45)
+            return "Invalid command." + (f" Did you mean: {', '.join(suggestions)}?" if suggestions else "")
+
+        handler, book = book_command
+        mutating = self.__is_mutating__(command)
+        exclusive = mutating or self.__storage__ == "sqlite"
+        with self.__profiler__.command(command):
+            with self.__lock__ if exclusive else self.__lock__.read():
+                with self.__profiler__.phase("handler_seconds"):
+                    result = handler(args, book)
+                    output = "\n".join(result) if isinstance(result, types.GeneratorType) else str(result)
+                if mutating:
+                    # індекси, скинуті масовим імпортом (AddressBook.bulk), будуються ще під замком запису
+                    book.__ensure_indexes__()
+                    self.__commit_later__(user_input)
+            if is_error(result):
+                self.__profiler__.error()
+        return output
+
+    # Команда клієнта над книгами обраного ним орендаря (сервер з --tenants). Команди одного орендаря
+    # виконуються по одній, різних орендарів - одночасно; зміни одразу фіксуються в журналі орендаря,
+    # тож його книги можна витіснити з пам'яті в будь-який момент між командами.
+    def __serve_tenant_command__(self, command: str, args: list, user_input: str, tenant: str | None) -> str:
+        if tenant is None:
+            return "Select a tenant first: tenant <id>"
+
+        with self.__profiler__.command(command):
+            try:
+                with self.__tenants__.use(tenant) as books, books.lock:
+                    if command == "regex":
+                        return self.__regex_search__(args, (books.abook, books.nbook))
+                    handler, book = self.__book_command__(command, (books.abook, books.nbook))
+                    with self.__profiler__.phase("handler_seconds"):
+                        result = handler(args, book)
+                        output = "\n".join(result) if isinstance(result, types.GeneratorType) else str(result)
+                    if self.__is_mutating__(command):
+                        self.__commit__(user_input, books=books)
+            except storage.BookFileError as e:
+                return f"{e}\nThe books of tenant {tenant} were not changed."
+            if is_error(result):
+                self.__profiler__.error()
+        return output
+
+    # Серверний режим: книги завантажуються один раз і спільні для всіх клієнтів (див. server).
+    # Індекси будуються одразу, бо ліниве заповнення змінювало б книгу під час одночасних читань.
+    # З tenants книги не спільні: кожен клієнт обирає орендаря командою tenant <id>, а книги орендарів
+    # (папки в tenants) відкриваються при потребі і витісняються менеджером у межах memory_budget.
+    def run_server(self, address: str, tenants: str | None = None, memory_budget: int = MEMORY_BUDGET):
+        self.__lock__ = server.ReadWriteLock()
+        self.__profiler__.disable_memory()  # команди клієнтів ідуть одночасно, а пік tracemalloc - спільний
+        if tenants is not None:
+            self.__tenants__ = BookManager(
+                tenants, self.__load_books__,
+                lambda books: self.__save_books__(books.abook, books.nbook, books.journal, books.folder),
+                memory_budget)
+            try:
+                asyncio.run(server.serve(self, server.parse_address(address)))
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.__tenants__.close()
+            return
+
+        self.__load__()
+        self.__abook__.__ensure_indexes__()
+        self.__nbook__.__ensure_indexes__()
+        if self.__save_delay__ > 0 and self.__journal__ is not None:
+            self.__writer__ = BackgroundWriter(self.__flush__, self.__save_delay__)
+        try:
+            asyncio.run(server.serve(self, server.parse_address(address)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.__writer__ is not None:
+                self.__writer__.close()
+                self.__writer__ = None
+        with self.__profiler__.command("exit"):
+            self.__save__()
+
+    # Пакетний режим: виконує команди з файлу або stdin без діалогу.
+    # Змінюючі команди фіксуються в журналі групами по commit_every (0 - однією групою в кінці).
+    # Повідомляє про помилки в окремих командах і виводить пропускну здатність.
+    def run_batch(self, source, commit_every: int = 0):
+        self.__load__()
+        pending: list[str] = []
+        count = 0
+        errors = 0
+        start = time.perf_counter()
+
+        # у SQLite пакет - одна транзакція, яку __commit__ фіксує кожні commit_every команд
+        batch = sqlite_storage.batch(self.__abook__.__conn__) if self.__storage__ == "sqlite" else nullcontext()
+        with batch:
+            for line_number, line in enumerate(source, 1):
+                user_input = line.strip()
+                if not user_input or user_input.startswith("#"):
+                    continue
+
+                count += 1
+                command, *args = self.__parse_input__(user_input)
+                book_command = self.__book_command__(command)
+
+                if book_command is not None:
+                    result = book_command[0](args, book_command[1])
+                    if is_error(result):
+                        errors += 1
+                        print(f"Line {line_number}: {user_input}: {result}")
+                    elif not self.__is_mutating__(command):
+                        self.__print__(result)
+
+                    # як і в діалозі, в журнал іде кожна змінююча команда (навіть з помилкою,
+                    # бо вона могла частково змінити книгу) — повтор дасть той самий стан
+                    if self.__is_mutating__(command):
+                        pending.append(user_input)
+                elif command in self.__sys_commands__:
+                    print(self.__sys_commands__[command][0](args))
+                    if self.__sys_commands__[command][1]:
+                        break
+                else:
+                    errors += 1
+                    print(f"Line {line_number}: {user_input}: Invalid command.")
+
+                if commit_every and len(pending) >= commit_every:
+                    self.__commit__(*pending)
+                    pending.clear()
+
+            self.__commit__(*pending)
         self.__save__()
 
+        elapsed = time.perf_counter() - start
+        print(f"Processed {count} commands in {elapsed:.2f}s "
+              f"({count / elapsed if elapsed else 0:.0f} commands/s), errors: {errors}.")
+
 
 def run():
-    PersonalAssistant().run()
+    parser = argparse.ArgumentParser(description="Personal assistant")
+    parser.add_argument("--storage", choices=["files", "sqlite"], default="files",
+                        help="where books are stored (default: files)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="run commands from FILE ('-' for stdin) instead of the interactive prompt")
+    parser.add_argument("--commit-every", metavar="N", type=int, default=0,
+                        help="in batch mode, commit changes every N commands (default: once at the end)")
+    parser.add_argument("--unique-phones", action="store_true",
+                        help="reject a phone number that already belongs to another contact")
+    parser.add_argument("--profile", action="store_true",
+                        help="measure time and memory of every command (see the stats command)")
+    parser.add_argument("--save-delay", metavar="SECONDS", type=float, default=1.0,
+                        help="write changes in the background at most SECONDS after they are made "
+                             "(default: 1; 0 writes after every command)")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="serve many clients over a Unix socket (path) or TCP (host:port) "
+                             "instead of the interactive prompt")
+    parser.add_argument("--tenants", metavar="DIR",
+                        help="keep the books of each tenant in DIR/<tenant id>; with --serve, every client "
+                             "selects a tenant with 'tenant <id>'")
+    parser.add_argument("--tenant", metavar="ID",
+                        help="in the interactive prompt or batch mode, work with the books of this tenant "
+                             "(requires --tenants)")
+    parser.add_argument("--memory-budget", metavar="MB", type=int, default=MEMORY_BUDGET // 2**20,
+                        help="with --serve --tenants, close the least recently used books when the loaded "
+                             "books take more than about MB megabytes (default: %(default)s)")
+    args = parser.parse_args()
+
+    folder = None
+    if args.tenant is not None:
+        if args.tenants is None:
+            parser.error("--tenant requires --tenants")
+        try:
+            folder = tenant_folder(os.path.expanduser(args.tenants), args.tenant)
+        except ValueError as e:
+            parser.error(str(e))
+        os.makedirs(folder, exist_ok=True)
+
+    assistant = PersonalAssistant(args.storage, args.unique_phones, args.profile, args.save_delay, folder)
+    try:
+        if args.serve is not None:
+            assistant.run_server(args.serve, args.tenants and os.path.expanduser(args.tenants),
+                                 args.memory_budget * 2**20)
+        elif args.batch is None:
+            assistant.run()
+        elif args.batch == "-":
+            assistant.run_batch(sys.stdin, args.commit_every)
+        else:
+            with open(args.batch, encoding="UTF-8") as f:
+                assistant.run_batch(f, args.commit_every)
+    except storage.BookFileError as e:
+        # книги не зберігаються: інакше пошкоджений файл замінила б порожня книга
+        sys.exit(f"{e}\nThe books were not changed.")
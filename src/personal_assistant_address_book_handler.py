@@ -1,11 +1,20 @@
+import os
 from . import address_book
-from .general import input_error
+from . import import_export
+from .general import input_error, pop_flag, pop_options, pop_page, pager, KEY_ERROR
 
 
 class PersonalAssistantAddressBookHandler:
     def __init__(self):
         pass
 
+    # повідомлення про відсутній контакт з підказкою схожих імен
+    def __not_found__(self, book: address_book.AddressBook, name: str) -> str:
+        similar = book.find_similar(name)
+        if not similar:
+            return KEY_ERROR
+        return f"{KEY_ERROR} Did you mean: {', '.join(similar)}?"
+
     # handlers
     @input_error
     def add_contact(self, args: list, book: address_book.AddressBook) -> str:
@@ -50,6 +59,8 @@ class PersonalAssistantAddressBookHandler:
     def delete_contact(self, args: list, book: address_book.AddressBook) -> str:
         name = args[0]
         name = name.capitalize()
+        if book.find(name) is None:
+            return self.__not_found__(book, name)
 
         book.delete(name)
         return f"Contact {name} deleted."
@@ -92,6 +103,8 @@ class PersonalAssistantAddressBookHandler:
 
         name = name.capitalize()
         record = book.find(name)
+        if record is None:
+            return self.__not_found__(book, name)
         if record.find_phone(phone):
             record.remove_phone(phone)
             return f"Phone {phone} removed for contact {name}"
@@ -161,6 +174,8 @@ class PersonalAssistantAddressBookHandler:
         name = name.capitalize()
 
         record = book.find(name)
+        if record is None:
+            return self.__not_found__(book, name)
         return list(map(lambda phone: phone.value, record.phones))
 
     @input_error
@@ -169,6 +184,8 @@ class PersonalAssistantAddressBookHandler:
 
         name = name.capitalize()
         record = book.find(name)
+        if record is None:
+            return self.__not_found__(book, name)
         record.add_birthday(bday)
 
         return f"Birthday {record.birthday.value} successfully added for {record.name.value} "
@@ -179,15 +196,41 @@ class PersonalAssistantAddressBookHandler:
         name = name.capitalize()
 
         record = book.find(name)
+        if record is None:
+            return self.__not_found__(book, name)
         return record.birthday if record.birthday is not None else "Birthday record absent."
 
+    @input_error
+    def get_contact_by_phone(self, args: list, book: address_book.AddressBook) -> str:
+        phone = args[0]
+        records = book.find_by_phone(phone)
+
+        if not records:
+            return f"No contact has phone number {phone}."
+
+        return "\n".join(str(record) for record in records)
+
+    # Нечіткий пошук контактів за іменем: find-contact-fuzzy <запит...> [--limit N] (за замовчуванням 5).
+    @input_error
+    def find_contact_fuzzy(self, args: list, book: address_book.AddressBook) -> str:
+        limit = int(pop_options(args, "limit").get("limit", 5))
+        query = " ".join(args)
+        if not query or limit < 1:
+            raise ValueError
+
+        names = book.find_similar(query, limit)
+        if not names:
+            return f"No contacts similar to {query}."
+
+        return "\n".join(str(book.find(name)) for name in names)
+
     @input_error
     def get_contact_info(self, args: list, book: address_book.AddressBook) -> str:
         name = args[0]
         name = name.capitalize()
 
         record = book.find(name)
-        return str(record) if record is not None else "Record is missing."
+        return str(record) if record is not None else self.__not_found__(book, name)
 
     @input_error
     def get_upcoming_birthdays(self, args: list, book: address_book.AddressBook) -> str:
@@ -198,5 +241,49 @@ class PersonalAssistantAddressBookHandler:
 
         return book.get_upcoming_birthdays(days)
 
-    def get_all_contacts(self, args: list, book: address_book.AddressBook) -> str:
-        return f"{book}"
+    # Повертає генератор рядків таблиці, щоб перші рядки виводились одразу.
+    # [--page N] [--offset N] [--limit N] обмежують вивід, --pager показує його посторінково.
+    # --sort name|birthday впорядковує контакти за індексом, --from A --to M обмежує діапазон імен
+    # (--to порівнюється як префікс, тож --from Ol --to Ol показує всі імена на "Ol").
+    @input_error
+    def get_all_contacts(self, args: list, book: address_book.AddressBook):
+        show_pager = pop_flag(args, "pager")
+        offset, limit = pop_page(args)
+        options = pop_options(args, "sort", "from", "to")
+        sort = options.get("sort", "name" if "from" in options or "to" in options else None)
+        first = options["from"].capitalize() if "from" in options else None
+        last = options["to"].capitalize() if "to" in options else None
+        if sort not in (None, "name", "birthday"):
+            raise ValueError
+
+        if not book.data:
+            return "Address book is empty."
+
+        if sort == "name":
+            names = book.iter_names(first, last)
+        elif sort == "birthday":
+            names = book.iter_names_by_birthday(first, last)
+        else:
+            names = None
+        lines = book.iter_table(book.iter_records(offset, limit, names))
+        return pager(lines) if show_pager else lines
+
+    @input_error
+    def import_contacts(self, args: list, book: address_book.AddressBook) -> str:
+        file_name = os.path.expanduser(args[0])
+        try:
+            imported, errors = import_export.import_contacts(book, file_name)
+        except OSError:
+            return f"Cannot read file {file_name}."
+
+        return import_export.import_report("contacts", imported, errors)
+
+    @input_error
+    def export_contacts(self, args: list, book: address_book.AddressBook) -> str:
+        file_name = os.path.expanduser(args[0])
+        try:
+            count = import_export.export_contacts(book, file_name)
+        except OSError:
+            return f"Cannot write file {file_name}."
+
+        return f"Exported {count} contacts to {file_name}."
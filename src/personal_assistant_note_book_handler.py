@@ -1,5 +1,7 @@
+import os
 from . import note_book
-from .general import input_error
+from . import import_export
+from .general import input_error, pop_options, pop_flag, pop_page, pager, PAGE_SIZE
 
 
 class PersonalAssistantNoteBookHandler:
@@ -43,9 +45,18 @@ class PersonalAssistantNoteBookHandler:
 
         return str(note)
 
+    # Повертає генератор нотаток, щоб перші з них виводились одразу.
+    # [--page N] [--offset N] [--limit N] обмежують вивід, --pager показує його посторінково.
     @input_error
-    def get_all_notes(self, args: list, nbook: note_book.NoteBook) -> str:
-        return str(nbook)
+    def get_all_notes(self, args: list, nbook: note_book.NoteBook):
+        show_pager = pop_flag(args, "pager")
+        offset, limit = pop_page(args)
+
+        if not nbook.data:
+            return "Note book is empty."
+
+        lines = (str(note) for note in nbook.iter_notes(offset, limit))
+        return pager(lines) if show_pager else lines
 
     @input_error
     def add_tag(self, args: list, nbook: note_book.NoteBook) -> str:
@@ -77,13 +88,20 @@ class PersonalAssistantNoteBookHandler:
 
     @input_error
     def search_notes(self, args: list, nbook: note_book.NoteBook) -> str:
+        page = int(pop_options(args, "page").get("page", 1))
+        if page < 1:
+            raise ValueError
+
         query = " ".join(args)
-        found = nbook.search_notes_by_content(query)
+        # беремо на один результат більше, щоб знати, чи є наступна сторінка
+        found = nbook.search_notes_by_content(query, (page - 1) * PAGE_SIZE, PAGE_SIZE + 1)
 
         if not found:
             return "No matches."
 
-        lines = [str(note) for note in found]
+        lines = [str(note) for note in found[:PAGE_SIZE]]
+        if len(found) > PAGE_SIZE:
+            lines.append(f"More matches: get-notes-by-text {query} --page {page + 1}")
         return "\n".join(lines)
 
     @input_error
@@ -97,12 +115,33 @@ class PersonalAssistantNoteBookHandler:
         lines = [str(note) for note in found]
         return "\n".join(lines)
 
+    # Повертає генератор нотаток, як get-notes, щоб перші з них виводились одразу; --pager - посторінково.
     @input_error
-    def sort_by_tags(self, args: list, nbook: note_book.NoteBook) -> str:
-        sorted_notes = nbook.sort_notes_by_tags()
+    def sort_by_tags(self, args: list, nbook: note_book.NoteBook):
+        show_pager = pop_flag(args, "pager")
 
-        if not sorted_notes:
+        if not nbook.data:
             return "Note book is empty."
 
-        lines = [str(note) for note in sorted_notes]
-        return "\n".join(lines)
+        lines = (str(note) for note in nbook.iter_notes_sorted_by_tags())
+        return pager(lines) if show_pager else lines
+
+    @input_error
+    def import_notes(self, args: list, nbook: note_book.NoteBook) -> str:
+        file_name = os.path.expanduser(args[0])
+        try:
+            imported, errors = import_export.import_notes(nbook, file_name)
+        except OSError:
+            return f"Cannot read file {file_name}."
+
+        return import_export.import_report("notes", imported, errors)
+
+    @input_error
+    def export_notes(self, args: list, nbook: note_book.NoteBook) -> str:
+        file_name = os.path.expanduser(args[0])
+        try:
+            count = import_export.export_notes(nbook, file_name)
+        except OSError:
+            return f"Cannot write file {file_name}."
+
+        return f"Exported {count} notes to {file_name}."
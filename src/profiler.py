@@ -0,0 +1,211 @@
+# тут профілювання команд асистента: час виконання, процесорний час, пік виділеної пам'яті
+# (tracemalloc) і час збереження книг для кожної команди. Значення складаються в гістограми
+# в пам'яті, з яких рахуються p50/p95/p99 і які експортуються в JSON або текстовий формат Prometheus.
+import json
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Межі кошиків гістограм: кожна наступна більша на 25%, тож перцентиль відомий з точністю до кошика.
+GROWTH = 1.25
+TIME_BOUNDS = [1e-6 * GROWTH ** i for i in range(94)]  # від 1 мкс до ~1200 с
+SIZE_BOUNDS = [64 * GROWTH ** i for i in range(94)]    # від 64 байт до ~80 ГБ
+UNKNOWN_COMMAND = "unknown"  # мітка для невідомих команд, щоб опечатки не множили метрики
+
+# метрика -> (межі кошиків, опис для Prometheus)
+METRICS = {
+    "command_seconds": (TIME_BOUNDS, "Wall time of a command, including output and saving."),
+    "handler_seconds": (TIME_BOUNDS, "Wall time of the command handler and its output."),
+    "cpu_seconds": (TIME_BOUNDS, "CPU time of a command."),
+    "alloc_peak_bytes": (SIZE_BOUNDS, "Peak memory allocated by Python while the command ran (tracemalloc)."),
+    "save_seconds": (TIME_BOUNDS, "Time spent writing the journal and book snapshots."),
+}
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+# Гістограма з фіксованими кошиками: пам'ять не залежить від кількості вимірів.
+class Histogram:
+    def __init__(self, bounds: list[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # останній кошик - все, що більше за межі
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    # Перцентиль з лінійною інтерполяцією всередині кошика, обмежений спостереженими min/max.
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def to_dict(self) -> dict:
+        result = {"count": self.count, "sum": self.sum, "min": self.min if self.count else 0.0, "max": self.max}
+        for fraction in PERCENTILES:
+            result[f"p{round(fraction * 100)}"] = self.percentile(fraction)
+        return result
+
+
+# Профайлер команд. Вимкнений профайлер нічого не міряє, тож його можна викликати завжди.
+class Profiler:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: dict[tuple[str, str], Histogram] = {}  # (метрика, команда) -> гістограма
+        self.errors: dict[str, int] = {}  # команда -> кількість команд, що завершились помилкою
+        self.__current__ = threading.local()  # команда, яка виконується зараз у цьому потоці
+        self.__lock__ = threading.Lock()  # виміри надходять і з потоку фонового запису
+        self.memory = enabled  # чи міряти пік пам'яті команд
+        self.__tracing__ = False  # чи tracemalloc запустив цей профайлер
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__tracing__ = True
+
+    # Пік tracemalloc один на весь процес. Коли команди виконуються одночасно (серверний режим),
+    # пік однієї команди включав би виділення інших, тож пам'ять команд тоді не міряється.
+    def disable_memory(self):
+        self.memory = False
+        if self.__tracing__:
+            tracemalloc.stop()
+            self.__tracing__ = False
+
+    def observe(self, metric: str, command: str, value: float):
+        key = (metric, command)
+        with self.__lock__:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(METRICS[metric][0])
+            self.histograms[key].observe(value)
+
+    def __command__(self) -> str | None:
+        return getattr(self.__current__, "command", None)
+
+    # Вимірює одну команду. Вкладена команда (виконання запропонованої команди) міряється окремо.
+    @contextmanager
+    def command(self, command: str):
+        if not self.enabled:
+            yield
+            return
+
+        outer = self.__command__()
+        self.__current__.command = command
+        memory = self.memory
+        if memory:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.observe("command_seconds", command, time.perf_counter() - start)
+            self.observe("cpu_seconds", command, time.process_time() - start_cpu)
+            if memory:
+                self.observe("alloc_peak_bytes", command, max(0, tracemalloc.get_traced_memory()[1] - start_memory))
+            self.__current__.command = outer
+
+    # Вимірює частину команди (обробник або збереження) як окрему метрику.
+    # Поза командою (наприклад, у потоці фонового запису) вимір належить мітці command.
+    @contextmanager
+    def phase(self, metric: str, command: str = "background"):
+        if not self.enabled:
+            yield
+            return
+
+        command = self.__command__() or command
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(metric, command, time.perf_counter() - start)
+
+    def error(self):
+        command = self.__command__()
+        if self.enabled and command is not None:
+            with self.__lock__:
+                self.errors[command] = self.errors.get(command, 0) + 1
+
+    def commands(self) -> list[str]:
+        return sorted({command for _, command in self.histograms} | set(self.errors))
+
+    def to_dict(self) -> dict:
+        result = {}
+        for command in self.commands():
+            result[command] = {metric: self.histograms[(metric, command)].to_dict()
+                               for metric in METRICS if (metric, command) in self.histograms}
+            result[command]["errors"] = self.errors.get(command, 0)
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    # Текстовий формат Prometheus: кожна метрика - гістограма з міткою command, плюс лічильник помилок.
+    def to_prometheus(self) -> str:
+        lines = []
+        for metric, (bounds, description) in METRICS.items():
+            name = f"personal_assistant_{metric}"
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            for command in self.commands():
+                histogram = self.histograms.get((metric, command))
+                if histogram is None:
+                    continue
+                label = f'command="{command}"'
+                cumulative = 0
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label},le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{label}}} {histogram.sum:.9g}")
+                lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+        name = "personal_assistant_command_errors_total"
+        lines += [f"# HELP {name} Commands that ended with an error message.", f"# TYPE {name} counter"]
+        lines += [f'{name}{{command="{command}"}} {count}' for command, count in sorted(self.errors.items())]
+        return "\n".join(lines) + "\n"
+
+    # Таблиця p50/p95/p99 часу команд, обробника, збереження і піку пам'яті.
+    def report(self) -> str:
+        header = f"{'command':<26} {'count':>6} {'p50':>10} {'p95':>10} {'p99':>10} " \
+                 f"{'handler p95':>12} {'save p95':>10} {'cpu p95':>10} {'mem p95':>10} {'errors':>6}"
+        lines = [header, "-" * len(header)]
+        for command in self.commands():
+            total = self.histograms.get(("command_seconds", command))
+            count = total.count if total else 0
+
+            def p95(metric: str) -> str:
+                histogram = self.histograms.get((metric, command))
+                return format_value(metric, histogram.percentile(0.95)) if histogram else "-"
+
+            percentiles = [format_value("command_seconds", total.percentile(fraction)) if total else "-"
+                           for fraction in PERCENTILES]
+            lines.append(f"{command:<26} {count:>6} {percentiles[0]:>10} {percentiles[1]:>10} {percentiles[2]:>10} "
+                         f"{p95('handler_seconds'):>12} {p95('save_seconds'):>10} {p95('cpu_seconds'):>10} "
+                         f"{p95('alloc_peak_bytes'):>10} {self.errors.get(command, 0):>6}")
+        return "\n".join(lines)
+
+
+def format_value(metric: str, value: float) -> str:
+    if metric.endswith("_bytes"):
+        for unit in ("B", "KB", "MB"):
+            if value < 1024:
+                return f"{value:.0f} {unit}"
+            value /= 1024
+        return f"{value:.1f} GB"
+    if value < 1:
+        return f"{value * 1000:.2f} ms"
+    return f"{value:.2f} s"
@@ -0,0 +1,142 @@
+# тут серверний режим: один процес обслуговує багатьох клієнтів зі спільними книгами
+# Протокол рядковий: клієнт надсилає команду одним рядком (та сама граматика, що й у діалозі),
+# сервер відповідає виводом команди і рядком ".". Рядки виводу, що починаються з ".", отримують
+# ще одну крапку на початку (як у SMTP), тож відповідь завжди читається до рядка ".".
+#   nc -U ~/assistant.sock              # python main.py --serve ~/assistant.sock
+#   nc 127.0.0.1 8765                   # python main.py --serve 127.0.0.1:8765
+# З --tenants DIR клієнт спершу обирає орендаря (tenant <id>), і його команди працюють з книгами DIR/<id>.
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from functools import partial
+
+END = "."
+EXIT_COMMANDS = {"close", "exit", "bye", "bye-bye"}
+SYSTEM_COMMANDS = {"hello", "version", "help", "stats", "regex"}  # системні команди, доступні клієнтам
+PROMPT_COMMANDS = {"undo", "redo", "history"}  # історія змін живе лише в сеансі діалогу
+WORKERS = 8  # скільки команд клієнтів може виконуватись одночасно
+
+
+# Замок читачів-письменників: читачі тримають його одночасно, письменник - сам.
+# Письменник, що чекає, не пропускає нових читачів, тож потік читань не відкладає зміни безкінечно.
+# `with lock:` - замок запису (повторний вхід тим самим потоком дозволено), `with lock.read():` - читання.
+class ReadWriteLock:
+
+    def __init__(self):
+        self.__condition__ = threading.Condition()
+        self.__readers__ = 0
+        self.__waiting_writers__ = 0
+        self.__owner__ = None  # потік, що тримає замок запису
+        self.__depth__ = 0
+
+    def acquire(self):
+        me = threading.get_ident()
+        with self.__condition__:
+            if self.__owner__ == me:
+                self.__depth__ += 1
+                return
+            self.__waiting_writers__ += 1
+            while self.__owner__ is not None or self.__readers__:
+                self.__condition__.wait()
+            self.__waiting_writers__ -= 1
+            self.__owner__ = me
+            self.__depth__ = 1
+
+    def release(self):
+        with self.__condition__:
+            self.__depth__ -= 1
+            if not self.__depth__:
+                self.__owner__ = None
+                self.__condition__.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    @contextmanager
+    def read(self):
+        if self.__owner__ == threading.get_ident():  # письменник уже має виключний доступ
+            yield
+            return
+
+        with self.__condition__:
+            while self.__owner__ is not None or self.__waiting_writers__:
+                self.__condition__.wait()
+            self.__readers__ += 1
+        try:
+            yield
+        finally:
+            with self.__condition__:
+                self.__readers__ -= 1
+                if not self.__readers__:
+                    self.__condition__.notify_all()
+
+
+# "шлях/до/сокета" - Unix-сокет, "host:port" або ":port" - TCP (за замовчуванням 127.0.0.1).
+def parse_address(address: str) -> str | tuple[str, int]:
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return os.path.expanduser(address)
+
+
+def encode_response(text: str) -> bytes:
+    lines = ["." + line if line.startswith(END) else line for line in text.splitlines()]
+    return "\n".join(lines + [END, ""]).encode("UTF-8")
+
+
+# Обслуговує одного клієнта: команди виконуються в пулі потоків, тож повільна команда
+# одного клієнта не зупиняє інших, а команди читання різних клієнтів ідуть одночасно.
+async def handle_client(assistant, executor: ThreadPoolExecutor, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter):
+    loop = asyncio.get_running_loop()
+    session: dict = {}  # стан з'єднання (наприклад, обраний орендар)
+    try:
+        writer.write(encode_response("Welcome to the assistant bot!"))
+        await writer.drain()
+        while line := await reader.readline():
+            user_input = line.decode("UTF-8", errors="replace").strip()
+            if not user_input:
+                continue
+            if user_input.split()[0].lower() in EXIT_COMMANDS:
+                writer.write(encode_response("Good bye!"))
+                await writer.drain()
+                break
+            output = await loop.run_in_executor(executor, assistant.__serve_command__, user_input, session)
+            writer.write(encode_response(output))
+            await writer.drain()
+    except ConnectionError:
+        pass  # клієнт обірвав з'єднання
+    except asyncio.CancelledError:
+        # Сервер зупиняється (Ctrl+C). Скасування не передається далі, бо asyncio до Python 3.12
+        # друкує трасу для скасованого обробника з'єднання.
+        pass
+    finally:
+        # з'єднання закривається за будь-якого виходу: обрив клієнтом, зупинка сервера чи "exit"
+        writer.close()
+        with suppress(ConnectionError, asyncio.CancelledError):
+            await writer.wait_closed()
+
+
+async def serve(assistant, address: str | tuple[str, int], workers: int = WORKERS):
+    executor = ThreadPoolExecutor(workers, thread_name_prefix="assistant-client")
+    handler = partial(handle_client, assistant, executor)
+    if isinstance(address, str):
+        server = await asyncio.start_unix_server(handler, address)
+    else:
+        server = await asyncio.start_server(handler, *address)
+
+    print(f"Serving on {address if isinstance(address, str) else '%s:%d' % address}. Press Ctrl+C to stop.")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=True)
+        if isinstance(address, str):
+            with suppress(OSError):
+                os.remove(address)
@@ -0,0 +1,394 @@
+# тут описане сховище книг у локальній базі SQLite (альтернатива файлам .dat і журналу)
+import calendar
+import sqlite3
+import weakref
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from datetime import date
+from . import address_book
+from . import note_book
+from .indexes import prefix_stop
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,  -- порядок додавання контактів
+    name TEXT NOT NULL UNIQUE,
+    email TEXT,
+    address TEXT,
+    birthday INTEGER,                       -- date.toordinal()
+    bday_month INTEGER,
+    bday_day INTEGER
+);
+CREATE INDEX IF NOT EXISTS contacts_email ON contacts (email);
+CREATE INDEX IF NOT EXISTS contacts_birthday ON contacts (bday_month, bday_day);
+CREATE TABLE IF NOT EXISTS phones (
+    name TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    PRIMARY KEY (name, pos)
+);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones (phone);
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    content TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS note_tags (
+    note_id INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (note_id, pos)
+);
+CREATE INDEX IF NOT EXISTS note_tags_tag ON note_tags (tag, note_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5 (content, content='notes', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO notes_fts (rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+
+# З'єднання з базою книг. Кожна зміна книги (with conn:) - окрема транзакція, а в пакеті змін (batch)
+# зміна стає точкою збереження всередині спільної транзакції: помилка відкочує лише цю зміну,
+# а фіксує все разом checkpoint() або кінець пакета.
+class BookConnection(sqlite3.Connection):
+    batch = False
+
+    def __enter__(self):
+        if not self.batch:
+            return super().__enter__()
+        self.execute("SAVEPOINT change")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.batch:
+            return super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            self.execute("ROLLBACK TO change")
+        self.execute("RELEASE change")
+        return False
+
+    # фіксує зміни пакета і відкриває транзакцію для наступних; поза пакетом нічого не робить
+    def checkpoint(self):
+        if self.batch:
+            self.commit()
+            self.execute("BEGIN")
+
+
+# Пакет змін (run_batch): усі зміни йдуть однією транзакцією, яку фіксує checkpoint() і кінець пакета.
+# Якщо пакет перервано, незафіксовані зміни відкочуються.
+@contextmanager
+def batch(conn: BookConnection):
+    conn.batch = True
+    conn.execute("BEGIN")
+    try:
+        yield
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.batch = False
+
+
+def connect(file_name: str) -> BookConnection:
+    # з'єднання може використовуватись з різних потоків (серверний режим), але не одночасно:
+    # доступ до книг SQLite асистент виконує під своїм замком по одній команді
+    conn = sqlite3.connect(file_name, check_same_thread=False, factory=BookConnection)
+    conn.execute("PRAGMA journal_mode=WAL")  # читачі не блокуються записом
+    # lower() в SQLite змінює регістр лише латиниці, тому використовуємо str.lower з Python
+    conn.create_function("py_lower", 1, lambda text: text.lower() if text else text, deterministic=True)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# Базовий словник поверх таблиці SQLite. Кожна зміна — окрема транзакція (або точка збереження в пакеті).
+# Декодовані об'єкти кешуються слабкими посиланнями, щоб той самий ключ давав той самий об'єкт,
+# поки ним хтось користується, але книга не трималась у пам'яті повністю.
+class SqliteRecords(MutableMapping):
+    TABLE = ""
+    KEY = ""
+    ORDER = ""
+
+    def __init__(self, conn: sqlite3.Connection, on_load=None):
+        self.conn = conn
+        self.on_load = on_load
+        self.__loaded__ = weakref.WeakValueDictionary()
+
+    def __contains__(self, key) -> bool:
+        return self.conn.execute(
+            f"SELECT 1 FROM {self.TABLE} WHERE {self.KEY} = ?", (key,)).fetchone() is not None
+
+    def __getitem__(self, key):
+        value = self.__loaded__.get(key)
+        if value is None:
+            value = self.__read__(key)
+            if value is None:
+                raise KeyError(key)
+            self.__loaded__[key] = value
+            if self.on_load is not None:
+                self.on_load(value)
+        return value
+
+    def __setitem__(self, key, value):
+        with self.conn:
+            self.__write__(key, value)
+        self.__loaded__[key] = value
+
+    def __delitem__(self, key):
+        with self.conn:
+            if self.conn.execute(f"DELETE FROM {self.TABLE} WHERE {self.KEY} = ?", (key,)).rowcount == 0:
+                raise KeyError(key)
+            self.__clear_related__(key)
+        self.__loaded__.pop(key, None)
+
+    def __iter__(self):
+        keys = self.conn.execute(f"SELECT {self.KEY} FROM {self.TABLE} ORDER BY {self.ORDER}").fetchall()
+        for key, in keys:
+            yield key
+
+    def __len__(self) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+    # значення з бази в пам'ять не копіюються — при pickle книга отримує звичайний словник
+    def __reduce__(self):
+        return dict, (dict(self.items()),)
+
+    def __read__(self, key):
+        raise NotImplementedError
+
+    def __write__(self, key, value):
+        raise NotImplementedError
+
+    def __clear_related__(self, key):
+        pass
+
+
+class SqliteContacts(SqliteRecords):
+    TABLE = "contacts"
+    KEY = "name"
+    ORDER = "seq"
+
+    def __read__(self, name: str) -> address_book.Record | None:
+        row = self.conn.execute(
+            "SELECT email, address, birthday FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+
+        email, address, birthday = row
+        record = address_book.Record(name)
+        record.phones = [address_book.Phone(phone) for phone, in self.conn.execute(
+            "SELECT phone FROM phones WHERE name = ? ORDER BY pos", (name,))]
+        if email is not None:
+            record.email = address_book.Email(email)
+        if address is not None:
+            record.address = address_book.Address(address)
+        if birthday is not None:
+            record.birthday = address_book.Birthday(date.fromordinal(birthday).strftime("%d.%m.%Y"))
+        return record
+
+    def __write__(self, name: str, record: address_book.Record):
+        bday = record.birthday.value if record.birthday else None
+        self.conn.execute(
+            "INSERT INTO contacts (name, email, address, birthday, bday_month, bday_day) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (name) DO UPDATE SET "
+            "email = excluded.email, address = excluded.address, birthday = excluded.birthday, "
+            "bday_month = excluded.bday_month, bday_day = excluded.bday_day",
+            (name,
+             record.email.value if record.email else None,
+             record.address.value if record.address else None,
+             bday.toordinal() if bday else None,
+             bday.month if bday else None,
+             bday.day if bday else None))
+        self.__clear_related__(name)
+        self.conn.executemany(
+            "INSERT INTO phones (name, pos, phone) VALUES (?, ?, ?)",
+            [(name, pos, phone.value) for pos, phone in enumerate(record.phones)])
+
+    def __clear_related__(self, name: str):
+        self.conn.execute("DELETE FROM phones WHERE name = ?", (name,))
+
+
+class SqliteNotes(SqliteRecords):
+    TABLE = "notes"
+    KEY = "id"
+    ORDER = "id"
+
+    def __read__(self, note_id: int) -> note_book.Note | None:
+        row = self.conn.execute("SELECT content FROM notes WHERE id = ?", (note_id,)).fetchone()
+        if row is None:
+            return None
+
+        note = note_book.Note(row[0], note_id)
+        note.tags = [note_book.Tag(tag) for tag, in self.conn.execute(
+            "SELECT tag FROM note_tags WHERE note_id = ? ORDER BY pos", (note_id,))]
+        return note
+
+    def __write__(self, note_id: int, note: note_book.Note):
+        self.conn.execute(
+            "INSERT INTO notes (id, content) VALUES (?, ?) ON CONFLICT (id) DO UPDATE SET "
+            "content = excluded.content WHERE content != excluded.content",
+            (note_id, note.content.value))
+        self.__clear_related__(note_id)
+        self.conn.executemany(
+            "INSERT INTO note_tags (note_id, pos, tag) VALUES (?, ?, ?)",
+            [(note_id, pos, tag.value) for pos, tag in enumerate(note.tags)])
+
+    def __clear_related__(self, note_id: int):
+        self.conn.execute("DELETE FROM note_tags WHERE note_id = ?", (note_id,))
+
+
+# Адресна книга в SQLite: пошук і дні народження виконуються запитами з індексами бази.
+class SqliteAddressBook(address_book.AddressBook):
+
+    def __init__(self, conn: sqlite3.Connection):
+        super().__init__()
+        self.__conn__ = conn
+        self.data = SqliteContacts(conn, on_load=lambda record: setattr(record, "book", self))
+
+    # індекси в пам'яті не потрібні — їх замінюють індекси бази
+    def __ensure_indexes__(self):
+        pass
+
+    def __birthdays_on__(self, day: date) -> set[str]:
+        month_days = [(day.month, day.day)]
+        if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+            month_days.append((2, 29))
+        names: set[str] = set()
+        for month, month_day in month_days:
+            names.update(name for name, in self.__conn__.execute(
+                "SELECT name FROM contacts WHERE bday_month = ? AND bday_day = ?", (month, month_day)))
+        return names
+
+    def __phone_owners__(self, phone_number: str) -> set[str]:
+        return {name for name, in self.__conn__.execute("SELECT name FROM phones WHERE phone = ?", (phone_number,))}
+
+    # імена від first до last (як в AddressBook.iter_names) у порядку order;
+    # умови додаються лише для заданих меж, щоб база могла пройти діапазон унікального індексу name
+    def __iter_names__(self, first: str | None, last: str | None, order: str):
+        conditions, params = [], []
+        if first is not None:
+            conditions.append("name >= ?")
+            params.append(first)
+        stop = prefix_stop(last) if last else None
+        if stop is not None:
+            conditions.append("name < ?")
+            params.append(stop)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        for name, in self.__conn__.execute(f"SELECT name FROM contacts{where} ORDER BY {order}", params):
+            yield name
+
+    def iter_names(self, first: str | None = None, last: str | None = None):
+        return self.__iter_names__(first, last, "name")
+
+    def iter_names_by_birthday(self, first: str | None = None, last: str | None = None):
+        return self.__iter_names__(first, last, "bday_month IS NULL, bday_month, bday_day, name")
+
+    def search(self, query: str) -> list[address_book.Record]:
+        query_lower = query.lower()
+        names = self.__conn__.execute(
+            "SELECT name FROM contacts WHERE instr(py_lower(name), ?1) OR instr(py_lower(email), ?1) "
+            "OR instr(py_lower(address), ?1) OR name IN (SELECT name FROM phones WHERE instr(phone, ?1)) "
+            "ORDER BY name", (query_lower,)).fetchall()
+        return [self.data[name] for name, in names]
+
+
+# Книга нотаток в SQLite: повнотекстовий пошук через FTS5, теги — через індекс таблиці тегів.
+class SqliteNoteBook(note_book.NoteBook):
+
+    def __init__(self, conn: sqlite3.Connection):
+        super().__init__()
+        self.__conn__ = conn
+        self.data = SqliteNotes(conn, on_load=lambda note: setattr(note, "book", self))
+
+        row = conn.execute("SELECT value FROM meta WHERE key = 'note_id_counter'").fetchone()
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
+        self.note_id_counter = max(row[0] if row else 1, max_id + 1)
+
+    def __ensure_indexes__(self):
+        pass
+
+    def add_note(self, content: str) -> int:
+        new_id = super().add_note(content)
+        with self.__conn__:
+            self.__conn__.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('note_id_counter', ?)",
+                              (self.note_id_counter,))
+        return new_id
+
+    def search_notes_by_content(self, query: str, offset: int = 0,
+                                limit: int | None = None) -> list[note_book.Note]:
+        words = query.split()
+        match_all = "OR" not in words
+        terms = note_book.FullTextIndex.tokenize(" ".join(word for word in words if word != "OR"))
+        if not terms:
+            raise note_book.ValidSearchQueryError()
+
+        fts_query = (" " if match_all else " OR ").join(f'"{term}"' for term in terms)
+        note_ids = self.__conn__.execute(
+            "SELECT rowid FROM notes_fts WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts), rowid "
+            "LIMIT ? OFFSET ?", (fts_query, -1 if limit is None else limit, offset)).fetchall()
+        return [self.data[note_id] for note_id, in note_ids]
+
+    def search_notes_by_tag(self, tag_query: str) -> list[note_book.Note]:
+        tag_query = tag_query.strip()
+        if not tag_query:
+            raise note_book.ValidTagError()
+        note_ids = self.__conn__.execute(
+            "SELECT note_id FROM note_tags WHERE tag = ? ORDER BY note_id", (tag_query.lower(),)).fetchall()
+        return [self.data[note_id] for note_id, in note_ids]
+
+    def iter_notes_sorted_by_tags(self):
+        note_ids = self.__conn__.execute(
+            "SELECT notes.id FROM notes LEFT JOIN note_tags ON note_tags.note_id = notes.id AND note_tags.pos = 0 "
+            "ORDER BY note_tags.tag IS NULL, note_tags.tag, notes.id").fetchall()
+        for note_id, in note_ids:
+            yield self.data[note_id]
+
+    def get_tags(self) -> list[str]:
+        return [tag for tag, in self.__conn__.execute("SELECT DISTINCT tag FROM note_tags ORDER BY tag")]
+
+    def complete_tag(self, prefix: str, limit: int | None = None) -> list[str]:
+        prefix = prefix.lower()
+        stop = prefix_stop(prefix) or chr(0x10FFFF)  # порожній префікс - усі теги
+        return [tag for tag, in self.__conn__.execute(
+            "SELECT DISTINCT tag FROM note_tags WHERE tag >= ? AND tag < ? ORDER BY tag LIMIT ?",
+            (prefix, stop, -1 if limit is None else limit))]
+
+    def __iter_note_ids__(self, low: int, high: int):
+        for note_id, in self.__conn__.execute(
+                "SELECT id FROM notes WHERE id >= ? AND id < ? ORDER BY id", (low, high)):
+            yield note_id
+
+
+# Відкриває (або створює) базу книг. Нова база один раз заповнюється книгами з файлового сховища;
+# позначка migrated у meta не дає перенести їх знову, коли користувач видалив з бази всі записи.
+def open_books(file_name: str, migrate_from=None):
+    conn = connect(file_name)
+    abook = SqliteAddressBook(conn)
+    nbook = SqliteNoteBook(conn)
+
+    if migrate_from is not None and conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone() is None:
+        # база, заповнена до появи позначки, вже перенесена
+        old_books = migrate_from() if len(abook) == 0 and len(nbook) == 0 else None
+        with conn:
+            if old_books is not None:
+                old_abook, old_nbook = old_books
+                for name, record in old_abook.items():
+                    abook.data.__write__(name, record)
+                for note_id, note in old_nbook.items():
+                    nbook.data.__write__(note_id, note)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('note_id_counter', ?)",
+                             (old_nbook.note_id_counter,))
+                nbook.note_id_counter = old_nbook.note_id_counter
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated', 1)")
+
+    return abook, nbook
@@ -0,0 +1,426 @@
+# тут описаний файловий формат книг, який відкривається через mmap без повного завантаження
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from collections.abc import MutableMapping
+from . import book_codecs
+
+# Формат файлу книги (.dat), версія 2:
+#   заголовок | блоки записів | таблиця блоків | таблиця записів у порядку книги |
+#   позиції записів, відсортовані за ключем | ключі | метадані книги (pickle)
+# Записи йдуть блоками по BLOCK_SIZE. Блок - колонки полів його записів (book_codecs), стиснені zlib,
+# з CRC32 у таблиці блоків. Таблиці й метадані перевіряються CRC32 із заголовка при відкритті,
+# блок - при першому зверненні до його записів.
+# Файли версії 1 (кожен запис - окремий pickle) читаються, а при збереженні переписуються у версію 2.
+MAGIC = b"PABK"
+VERSION = 2
+BLOCK_SIZE = 64
+COMPRESSION_LEVEL = 1
+PREFIX = struct.Struct("<4sH")  # magic і версія - однакові в усіх версіях формату
+# magic, версія, тип ключа, кодек, кількість записів, кількість блоків, зсуви таблиці блоків, таблиці записів
+# і ключів, зсув і розмір метаданих, CRC32 таблиць (від таблиці блоків до ключів) і метаданих
+HEADER = struct.Struct("<4sHccQQQQQQQII")
+BLOCK = struct.Struct("<QIII")     # зсув і розмір стисненого блоку, його CRC32, кількість записів
+ENTRY = struct.Struct("<QIII")     # зсув і розмір ключа, номер блоку, номер запису в блоці
+POSITION = struct.Struct("<Q")     # номер запису в таблиці записів
+
+# Версія 1: заголовок | значення записів (pickle) | ключі | таблиця записів у порядку книги |
+#   позиції записів, відсортовані за ключем | метадані книги (pickle)
+HEADER_V1 = struct.Struct("<4sHcxQQQQ")  # magic, версія, тип ключа, кількість, зсув таблиці, зсув і розмір метаданих
+ENTRY_V1 = struct.Struct("<QIQI")        # зсув і розмір ключа, зсув і розмір значення
+
+
+# Файл книги не вдається прочитати: невідома версія, пошкоджені дані або знімок старих класів.
+class BookFileError(Exception):
+    pass
+
+
+# Ключі кодуються так, щоб порядок байтів збігався з порядком ключів:
+# рядки (імена контактів) — UTF-8, цілі (id нотаток) — 8 байт big-endian.
+def encode_key(key) -> bytes:
+    if isinstance(key, int):
+        return key.to_bytes(8, "big")
+    return key.encode("UTF-8")
+
+
+def decode_key(key_type: bytes, raw: bytes):
+    if key_type == b"i":
+        return int.from_bytes(raw, "big")
+    return raw.decode("UTF-8")
+
+
+# Записує книгу у файл. blocks - блоки у порядку книги: ("raw", стиснений блок, CRC32, ключі) для блоку,
+# скопійованого з попереднього файлу без змін, або ("records", [(ключ, запис), ...]) для нового.
+def write_book(file_name: str, codec, blocks, meta: dict):
+    block_table: list[tuple[int, int, int, int]] = []
+    entries: list[tuple[bytes, int, int]] = []  # ключ, номер блоку, номер у блоці
+    key_type = b"s"
+    with open(file_name, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+
+        for block in blocks:
+            if block[0] == "raw":
+                _, compressed, crc, keys = block
+            else:
+                keys = [key for key, _ in block[1]]
+                if not keys:
+                    continue
+                compressed = zlib.compress(codec.encode([value for _, value in block[1]]), COMPRESSION_LEVEL)
+                crc = zlib.crc32(compressed)
+            number = len(block_table)
+            block_table.append((f.tell(), len(compressed), crc, len(keys)))
+            f.write(compressed)
+            for index, key in enumerate(keys):
+                key_type = b"i" if isinstance(key, int) else b"s"
+                entries.append((encode_key(key), number, index))
+
+        tables = bytearray()
+        block_table_offset = f.tell()
+        for block in block_table:
+            tables += BLOCK.pack(*block)
+
+        entries_offset = block_table_offset + len(tables)
+        keys_offset = entries_offset + len(entries) * (ENTRY.size + POSITION.size)
+        key_offset = keys_offset
+        for key, number, index in entries:
+            tables += ENTRY.pack(key_offset, len(key), number, index)
+            key_offset += len(key)
+        for position in sorted(range(len(entries)), key=lambda i: entries[i][0]):
+            tables += POSITION.pack(position)
+        for key, _, _ in entries:
+            tables += key
+        f.write(tables)
+
+        meta_offset = f.tell()
+        meta_bytes = pickle.dumps(meta)
+        f.write(meta_bytes)
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, key_type, codec.code, len(entries), len(block_table),
+                            block_table_offset, entries_offset, keys_offset, meta_offset, len(meta_bytes),
+                            zlib.crc32(tables), zlib.crc32(meta_bytes)))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Файл книги версії 2, відкритий через mmap. Записи декодуються цілими блоками.
+class BookFile:
+
+    def __init__(self, data: mmap.mmap, file_name: str):
+        self.data = data
+        try:
+            (_, _, self.key_type, codec, self.count, self.blocks, self.block_table, self.entries, keys_offset,
+             meta_offset, meta_size, tables_crc, meta_crc) = HEADER.unpack_from(data, 0)
+            self.codec = book_codecs.CODECS[codec]
+        except (struct.error, KeyError):
+            raise BookFileError(f"Damaged book file {file_name}") from None
+
+        meta_bytes = data[meta_offset:meta_offset + meta_size]
+        with memoryview(data) as view, view[self.block_table:meta_offset] as tables:  # без копіювання таблиць
+            tables_valid = zlib.crc32(tables) == tables_crc
+        if not tables_valid or zlib.crc32(meta_bytes) != meta_crc:
+            raise BookFileError(f"Damaged book file {file_name}: checksum mismatch")
+        self.positions = self.entries + self.count * ENTRY.size
+        self.meta = load_pickle(meta_bytes, file_name)
+        self.file_name = file_name
+
+    def __entry__(self, position: int) -> tuple[int, int, int, int]:
+        return ENTRY.unpack_from(self.data, self.entries + position * ENTRY.size)
+
+    def key(self, position: int) -> bytes:
+        key_offset, key_size, _, _ = self.__entry__(position)
+        return self.data[key_offset:key_offset + key_size]
+
+    # ключі count записів підряд з позиції first (сирі байти)
+    def keys(self, first: int, count: int) -> list[bytes]:
+        start = self.entries + first * ENTRY.size
+        return [self.data[key_offset:key_offset + key_size] for key_offset, key_size, _, _
+                in ENTRY.iter_unpack(self.data[start:start + count * ENTRY.size])]
+
+    # номер запису з ключем у позиції middle відсортованого списку ключів
+    def sorted_position(self, middle: int) -> int:
+        return POSITION.unpack_from(self.data, self.positions + middle * POSITION.size)[0]
+
+    def block(self, number: int) -> tuple[bytes, int, int]:
+        offset, size, crc, count = BLOCK.unpack_from(self.data, self.block_table + number * BLOCK.size)
+        compressed = self.data[offset:offset + size]
+        if zlib.crc32(compressed) != crc:
+            raise BookFileError(f"Damaged book file {self.file_name}: block {number} checksum mismatch")
+        return compressed, crc, count
+
+    def block_of(self, position: int) -> tuple[int, int]:
+        _, _, number, index = self.__entry__(position)
+        return number, position - index
+
+    # Розпакований блок, прочитаний методом кодека read (decode або колонка, наприклад ContactsCodec.phones).
+    # Блок з правильною CRC32, але іншим розкладом колонок, - теж пошкоджений файл.
+    def decode(self, number: int, compressed: bytes, read):
+        try:
+            return read(zlib.decompress(compressed))
+        except (zlib.error, ValueError, IndexError) as e:
+            raise BookFileError(f"Damaged book file {self.file_name}: block {number} cannot be decoded") from e
+
+    # Записи блоку, в якому лежить запис position: (номер першого запису блоку, записи).
+    def load(self, position: int) -> tuple[int, list]:
+        number, first = self.block_of(position)
+        compressed, _, _ = self.block(number)
+        return first, self.decode(number, compressed, self.codec.decode)
+
+
+# Файл книги версії 1: кожен запис - окремий pickle.
+class BookFileV1:
+    codec = None
+
+    def __init__(self, data: mmap.mmap, file_name: str):
+        self.data = data
+        _, _, self.key_type, self.count, self.table, meta_offset, meta_size = HEADER_V1.unpack_from(data, 0)
+        self.positions = self.table + self.count * ENTRY_V1.size
+        self.meta = load_pickle(data[meta_offset:meta_offset + meta_size], file_name)
+        self.file_name = file_name
+
+    def key(self, position: int) -> bytes:
+        key_offset, key_size, _, _ = ENTRY_V1.unpack_from(self.data, self.table + position * ENTRY_V1.size)
+        return self.data[key_offset:key_offset + key_size]
+
+    def sorted_position(self, middle: int) -> int:
+        return POSITION.unpack_from(self.data, self.positions + middle * POSITION.size)[0]
+
+    def load(self, position: int) -> tuple[int, list]:
+        _, _, value_offset, value_size = ENTRY_V1.unpack_from(self.data, self.table + position * ENTRY_V1.size)
+        return position, [load_pickle(self.data[value_offset:value_offset + value_size], self.file_name)]
+
+
+# Читачі всіх версій формату: старіші версії читаються, а при збереженні переходять в актуальну.
+READERS = {1: BookFileV1, 2: BookFile}
+
+
+# Знімок з pickle, який не розпаковується (наприклад, класи книги змінились), - помилка,
+# а не порожня книга: інакше наступне збереження перезаписало б дані.
+def load_pickle(raw: bytes, file_name: str):
+    try:
+        return pickle.loads(raw)
+    except Exception as e:
+        raise BookFileError(f"Cannot read {file_name}: {type(e).__name__} {e}") from e
+
+
+def open_book_file(file_name: str):
+    with open(file_name, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # порожній файл
+            raise BookFileError(f"Damaged book file {file_name}") from None
+
+    try:
+        magic, version = PREFIX.unpack_from(data, 0)
+        if magic != MAGIC or version not in READERS:
+            raise BookFileError(f"Unsupported book file {file_name} (version {version})")
+        return READERS[version](data, file_name)
+    except BaseException:
+        data.close()
+        raise
+
+
+# Словник записів книги поверх файлу, відкритого через mmap.
+# Записи декодуються лише при першому зверненні до їхнього блоку; змінені, додані та видалені
+# записи тримаються в пам'яті до наступного збереження.
+class LazyRecords(MutableMapping):
+
+    def __init__(self, file_name: str, on_load=None):
+        self.on_load = on_load  # викликається для кожного щойно декодованого запису
+        self.__loaded__ = {}     # ключ -> декодоване (можливо, змінене) значення
+        self.__dirty__ = set()   # ключі файлу, записи яких змінювались
+        self.__new_keys__ = {}   # ключі, яких немає на своїй позиції у файлі (впорядкована множина)
+        self.__removed__ = set()  # ключі файлу, видалені з книги
+        self.__open__(file_name)
+
+    def __open__(self, file_name: str):
+        self.file_name = file_name
+        self.__file__ = open_book_file(file_name)
+        self.__count__ = self.__file__.count
+        self.meta = self.__file__.meta
+
+    def close(self):
+        self.__file__.data.close()
+
+    # Переходить на щойно збережений файл; уже декодовані записи лишаються ті самі.
+    def reopen(self, file_name: str):
+        self.__open__(file_name)
+        self.__dirty__.clear()
+        self.__new_keys__.clear()
+        self.__removed__.clear()
+
+    # Бінарний пошук ключа у відсортованій таблиці позицій: O(log n) без завантаження індексу.
+    def __find__(self, key) -> int | None:
+        raw = encode_key(key)
+        low, high = 0, self.__count__
+        while low < high:
+            middle = (low + high) // 2
+            position = self.__file__.sorted_position(middle)
+            middle_key = self.__file__.key(position)
+            if middle_key < raw:
+                low = middle + 1
+            elif middle_key > raw:
+                high = middle
+            else:
+                return position
+        return None
+
+    def __in_file__(self, key) -> bool:
+        return key not in self.__removed__ and self.__find__(key) is not None
+
+    def __contains__(self, key) -> bool:
+        return key in self.__new_keys__ or self.__in_file__(key)
+
+    def __key__(self, position: int):
+        return decode_key(self.__file__.key_type, self.__file__.key(position))
+
+    def __getitem__(self, key):
+        if key in self.__loaded__:
+            return self.__loaded__[key]
+
+        position = self.__find__(key) if key not in self.__removed__ else None
+        if position is None:
+            raise KeyError(key)
+
+        # декодується весь блок: сусідні записи зазвичай потрібні наступними (сторінки, пошук)
+        first, values = self.__file__.load(position)
+        for number, value in enumerate(values, first):
+            block_key = self.__key__(number)
+            if block_key in self.__loaded__ or block_key in self.__removed__:
+                continue
+            self.__loaded__[block_key] = value
+            if self.on_load is not None:
+                self.on_load(value)
+        return self.__loaded__[key]
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self.__new_keys__[key] = None
+        else:
+            self.__dirty__.add(key)
+        self.__loaded__[key] = value
+
+    def __delitem__(self, key):
+        if key in self.__new_keys__:
+            del self.__new_keys__[key]
+        elif self.__in_file__(key):
+            self.__removed__.add(key)
+        else:
+            raise KeyError(key)
+        self.__loaded__.pop(key, None)
+
+    def __file_keys__(self):
+        for position in range(self.__count__):
+            key = self.__key__(position)
+            if key not in self.__removed__:
+                yield position, key
+
+    def __iter__(self):
+        for _, key in self.__file_keys__():
+            yield key
+        yield from list(self.__new_keys__)
+
+    def __len__(self) -> int:
+        return self.__count__ - len(self.__removed__) + len(self.__new_keys__)
+
+    # Пари (ключ, значення колонки name) для всіх записів, не декодуючи їх: колонку блоку читає
+    # метод кодека name (наприклад, ContactsCodec.phones), а для записів у пам'яті значення дає value(запис).
+    def column(self, name: str, value):
+        file = self.__file__
+        read = getattr(file.codec, name, None)
+        if read is None:
+            for key in self:
+                yield key, value(self[key])
+            return
+
+        first = 0  # записи блоків ідуть у таблиці записів підряд
+        for number in range(file.blocks):
+            compressed, _, count = file.block(number)
+            values = None
+            for index, key in enumerate(file.keys(first, count)):
+                key = decode_key(file.key_type, key)
+                if key in self.__removed__:
+                    continue
+                if key in self.__loaded__:
+                    yield key, value(self.__loaded__[key])
+                    continue
+                if values is None:
+                    values = file.decode(number, compressed, read)
+                yield key, values[index]
+            first += count
+
+        for key in list(self.__new_keys__):
+            yield key, value(self.__loaded__[key])
+
+    # mmap не серіалізується, тому при pickle книга отримує звичайний словник
+    def __reduce__(self):
+        return dict, (dict(self.items()),)
+
+    # Блоки для збереження (див. write_book). Блоки файлу, жоден запис яких не змінювався і не
+    # видалявся, копіюються без розпакування; у змінених блоках кодуються лише їхні живі записи.
+    def dump_blocks(self, codec):
+        file = self.__file__
+        if file.codec is codec:
+            first = 0  # записи блоків ідуть у таблиці записів підряд
+            for number in range(file.blocks):
+                compressed, crc, count = file.block(number)
+                keys = [self.__key__(position) for position in range(first, first + count)]
+                first += count
+                if self.__dirty__.isdisjoint(keys) and self.__removed__.isdisjoint(keys):
+                    yield "raw", compressed, crc, keys
+                else:
+                    yield "records", [(key, self[key]) for key in keys if key not in self.__removed__]
+        else:
+            yield from blocks(((key, self[key]) for _, key in self.__file_keys__()))
+
+        yield from blocks((key, self.__loaded__[key]) for key in self.__new_keys__)
+
+
+# Ділить пари (ключ, запис) на блоки по BLOCK_SIZE.
+def blocks(items):
+    block = []
+    for item in items:
+        block.append(item)
+        if len(block) == BLOCK_SIZE:
+            yield "records", block
+            block = []
+    if block:
+        yield "records", block
+
+
+# Відкриває книгу з файлу: читається лише заголовок і метадані, записи — при зверненні.
+def open_book(file_name: str, book_class):
+    book = book_class()
+    records = LazyRecords(file_name, on_load=lambda value: setattr(value, "book", book))
+    book.__dict__.update(records.meta)
+    book.data = records
+    return book
+
+
+# Атомарно зберігає книгу у файл (через тимчасовий файл і заміну).
+def save_book(book, file_name: str):
+    meta = book.__getstate__()
+    data = meta.pop("data")
+    codec = book_codecs.codec_for(book)
+
+    if isinstance(data, LazyRecords):
+        items = data.dump_blocks(codec)
+    else:
+        items = blocks(data.items())
+    try:
+        write_book(file_name + ".tmp", codec, items, meta)
+    except BaseException:
+        # недописаний тимчасовий файл не потрібен; попередній знімок лишається цілим
+        try:
+            os.remove(file_name + ".tmp")
+        except OSError:
+            pass
+        raise
+
+    if isinstance(data, LazyRecords):
+        data.close()
+    os.replace(file_name + ".tmp", file_name)
+    if isinstance(data, LazyRecords):
+        data.reopen(file_name)
@@ -0,0 +1,71 @@
+import pytest
+from datetime import date, timedelta
+from src import storage
+from src.address_book import AddressBook, Record
+from src.general import ValidPhoneDuplicateError
+
+
+def contact(name: str, *phones: str, birthday: str | None = None) -> Record:
+    record = Record(name)
+    for phone in phones:
+        record.add_phone(phone)
+    if birthday is not None:
+        record.add_birthday(birthday)
+    return record
+
+
+# книга, збережена у файл .dat і відкрита знову (записи декодуються при зверненні)
+def saved_book(tmp_path, records) -> AddressBook:
+    book = AddressBook()
+    for record in records:
+        book.add_record(record)
+    storage.save_book(book, str(tmp_path / "abook.dat"))
+    return storage.open_book(str(tmp_path / "abook.dat"), AddressBook)
+
+
+def test_phone_lookup_reads_only_the_phone_column(tmp_path):
+    book = saved_book(tmp_path, [contact(f"Name{i}", f"067{i:07d}") for i in range(300)])
+
+    assert book.__phone_owners__("0670000042") == {"Name42"}
+    assert book.data.__loaded__ == {}
+    assert not book.__indexed__
+    assert [record.name.value for record in book.find_by_phone("0670000042")] == ["Name42"]
+
+
+def test_phone_lookup_sees_changes_of_a_file_book(tmp_path):
+    book = saved_book(tmp_path, [contact(f"Name{i}", f"067{i:07d}") for i in range(300)])
+    book.find("Name1").edit_phone("0670000001", "0501111111")
+    book.delete("Name2")
+    book.add_record(contact("New", "0670000002"))
+
+    assert book.find_by_phone("0670000001") == []
+    assert [record.name.value for record in book.find_by_phone("0501111111")] == ["Name1"]
+    assert [record.name.value for record in book.find_by_phone("0670000002")] == ["New"]
+
+
+def test_unique_phones_rejects_a_phone_of_another_contact(tmp_path):
+    book = saved_book(tmp_path, [contact("Ann", "0671234567")])
+    book.unique_phones = True
+    bob = contact("Bob")
+    book.add_record(bob)
+
+    with pytest.raises(ValidPhoneDuplicateError):
+        bob.add_phone("0671234567")
+    assert bob.phones == []
+
+
+def test_upcoming_birthdays_read_only_the_birthday_column(tmp_path):
+    today = date.today()
+    soon = today + timedelta(days=2)
+    book = saved_book(tmp_path, [
+        contact("Ann", birthday=f"{soon.day:02d}.{soon.month:02d}.1992"),
+        *(contact(f"Name{i}", birthday=f"{(today + timedelta(days=30)).strftime('%d.%m')}.1980") for i in range(200)),
+    ])
+
+    assert [line.split("'")[0] for line in book.get_upcoming_birthdays(7)] == ["Ann"]
+    assert book.data.__loaded__ == {}
+    assert not book.__indexed__ and not book.__phones_indexed__
+
+    later = today + timedelta(days=60)
+    book.find("Ann").add_birthday(f"{later.day:02d}.{later.month:02d}.1992")
+    assert book.get_upcoming_birthdays(7) == []
@@ -0,0 +1,41 @@
+import copy
+import pickle
+import pytest
+from datetime import date
+from src.address_book import Field, Name, Phone, Birthday, Email, Address
+from src.note_book import NoteContent, Tag
+
+FIELDS = [(Name, "Olena"), (Phone, "0671234567"), (Birthday, "01.02.1990"), (Email, "olena@mail.com"),
+          (Address, "Kyiv"), (NoteContent, "Buy milk"), (Tag, "home")]
+
+
+@pytest.mark.parametrize("field_class, value", FIELDS)
+def test_field_keeps_its_value_in_a_single_slot(field_class, value):
+    field = field_class(value)
+    slots = [slot for cls in field_class.__mro__ for slot in cls.__dict__.get("__slots__", ())]
+    assert slots == ["__value__"]
+    assert not hasattr(field, "__dict__")
+    assert str(pickle.loads(pickle.dumps(field))) == str(field)
+    assert str(copy.deepcopy(field)) == str(field)
+
+
+# знімки, записані, коли кожен підклас мав власний слот (_Phone__value, _Birthday__value ...)
+def test_field_restores_a_snapshot_with_the_old_slot_name():
+    phone = object.__new__(Phone)
+    phone.__setstate__((None, {"_Phone__value": 671234567}))
+    birthday = object.__new__(Birthday)
+    birthday.__setstate__((None, {"_Birthday__value": date(1990, 2, 1).toordinal()}))
+
+    assert phone.value == "0671234567"
+    assert birthday.value == date(1990, 2, 1)
+
+
+# знімки до __slots__: __dict__ з публічним значенням
+def test_field_restores_a_snapshot_without_slots():
+    birthday = object.__new__(Birthday)
+    birthday.__setstate__({"value": date(1990, 2, 1)})
+    name = object.__new__(Field)
+    name.__setstate__({"value": "Olena"})
+
+    assert birthday.ordinal == date(1990, 2, 1).toordinal()
+    assert name.value == "Olena"
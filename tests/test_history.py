@@ -0,0 +1,66 @@
+from src.personal_assistant import PersonalAssistant
+
+
+def assistant_with(tmp_path, *commands: str) -> PersonalAssistant:
+    assistant = PersonalAssistant(save_delay=0, folder=str(tmp_path))
+    assistant.__load__()
+    for command in commands:
+        assistant.__run_command__(command)
+    return assistant
+
+
+def phones(assistant: PersonalAssistant, name: str) -> list[str]:
+    return [phone.value for phone in assistant.__abook__.find(name).phones]
+
+
+def test_undo_and_redo_step_through_versions(tmp_path, capsys):
+    assistant = assistant_with(tmp_path, "add-contact Ann 0671234567", "add-phone Ann 0501112233",
+                               "add-note Buy milk", "add-tag 1 home")
+
+    assistant.__run_command__("undo 2")
+    assert "Undone: add-tag 1 home\nUndone: add-note Buy milk" in capsys.readouterr().out
+    assert assistant.__nbook__.find_note_by_id(1) is None
+
+    assistant.__run_command__("undo")
+    assert phones(assistant, "Ann") == ["0671234567"]
+
+    assistant.__run_command__("redo 2")
+    assert phones(assistant, "Ann") == ["0671234567", "0501112233"]
+    assert assistant.__nbook__.find_note_by_id(1).content.value == "Buy milk"
+    assert assistant.__nbook__.find_note_by_id(1).tags == []
+    assert assistant.__history__.lines() == ["   1. add-contact Ann 0671234567", "   2. add-phone Ann 0501112233",
+                                             "   3. add-note Buy milk", "      (undone) add-tag 1 home"]
+
+
+def test_new_change_drops_undone_versions(tmp_path, capsys):
+    assistant = assistant_with(tmp_path, "add-contact Ann", "add-contact Bob", "undo", "add-contact Eve")
+
+    assistant.__run_command__("redo")
+
+    assert "Nothing to redo." in capsys.readouterr().out
+    assert sorted(assistant.__abook__.data) == ["Ann", "Eve"]
+
+
+# скасоване видалення повертає контакт в усі індекси книги
+def test_undo_of_a_delete_restores_the_indexes(tmp_path, capsys):
+    assistant = assistant_with(tmp_path, "add-contact Ann 0671234567", "add-contact Bob")
+    book = assistant.__abook__
+    assert [record.name.value for record in book.search("067123")] == ["Ann"]
+
+    assistant.__run_command__("delete-contact Ann")
+    assert book.search("067123") == []
+    assistant.__run_command__("undo")
+
+    assert [record.name.value for record in book.search("067123")] == ["Ann"]
+    assert [record.name.value for record in book.find_by_phone("0671234567")] == ["Ann"]
+    assert list(book.iter_names()) == ["Ann", "Bob"]
+
+
+# undo не повторюється з журналу, тож після нього книги одразу зберігаються знімком
+def test_undone_state_survives_a_restart(tmp_path, capsys):
+    assistant_with(tmp_path, "add-contact Ann", "add-contact Bob", "undo")
+
+    restarted = assistant_with(tmp_path)
+
+    assert list(restarted.__abook__.data) == ["Ann"]
+    assert restarted.__history__.lines() == []
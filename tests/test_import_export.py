@@ -0,0 +1,123 @@
+import pytest
+from src import sqlite_storage
+from src.address_book import AddressBook, Record
+from src.import_export import import_contacts, import_notes, export_contacts, export_notes, contact_row
+from src.note_book import NoteBook
+
+
+def test_imported_note_ids_are_not_reused_after_restart(tmp_path):
+    notes = tmp_path / "notes.csv"
+    notes.write_text("content,tags\nFirst note,work\nSecond note,\nThird note,home;work\n", encoding="UTF-8")
+    _, nbook = sqlite_storage.open_books(str(tmp_path / "books.db"))
+    assert import_notes(nbook, str(notes)) == (3, [])
+    nbook.delete_note(3)
+
+    _, nbook = sqlite_storage.open_books(str(tmp_path / "books.db"))
+    assert nbook.add_note("After restart") == 4
+    assert [tag.value for tag in nbook.find_note_by_id(1).tags] == ["work"]
+
+
+def test_import_into_an_indexed_book_rebuilds_its_indexes(tmp_path):
+    book = AddressBook()
+    olena = Record("Olena")
+    olena.add_phone("0671234567")
+    book.add_record(olena)
+    book.search("olen")
+    book.find_similar("olena")
+    list(book.iter_names_by_birthday())
+    book.search_regex("Olena")
+
+    contacts = tmp_path / "contacts.jsonl"
+    contacts.write_text(
+        '{"name": "Oleg", "phones": ["0501112233"], "birthday": "01.02.1990"}\n'
+        '{"name": "Olena", "email": "olena@example.com"}\n'
+        'not json\n', encoding="UTF-8")
+    imported, errors = import_contacts(book, str(contacts))
+
+    assert imported == 2 and len(errors) == 1 and errors[0].startswith("Line 3:")
+    assert [record.name.value for record in book.search("ole")] == ["Oleg", "Olena"]
+    assert [record.name.value for record in book.search("example")] == ["Olena"]
+    assert book.find_similar("oleh") == ["Oleg"]
+    assert list(book.iter_names_by_birthday()) == ["Oleg", "Olena"]
+    assert [record.name.value for record in book.search_regex("^050")] == []
+    assert [record.name.value for record in book.search_regex("0501")] == ["Oleg"]
+    assert [record.name.value for record in book.find_by_phone("0501112233")] == ["Oleg"]
+
+
+def exported_book() -> AddressBook:
+    book = AddressBook()
+    ann = Record("Ann")
+    ann.add_phone("0671234567")
+    ann.add_phone("0501112233")
+    ann.add_email("ann@mail.com")
+    ann.add_birthday("29.02.1992")
+    ann.add_address("Kyiv, Khreshchatyk 1")
+    book.add_record(ann)
+    book.add_record(Record("Bob"))
+    return book
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl", ".vcf"])
+def test_contacts_round_trip(tmp_path, extension):
+    file_name = str(tmp_path / f"contacts{extension}")
+    assert export_contacts(exported_book(), file_name) == 2
+
+    book = AddressBook()
+    assert import_contacts(book, file_name) == (2, [])
+    assert [contact_row(record) for record in book.data.values()] == \
+        [contact_row(record) for record in exported_book().data.values()]
+
+
+# контакт з тим самим іменем доповнюється; рядок з невалідним полем не змінює книгу
+def test_imported_contact_is_merged_with_an_existing_one(tmp_path):
+    book = exported_book()
+    contacts = tmp_path / "contacts.csv"
+    contacts.write_text("name,phones,email,birthday,address\n"
+                        "bob,0931234567,,,\n"
+                        "Ann,0970000000,,31.02.1990,\n", encoding="UTF-8")
+
+    imported, errors = import_contacts(book, str(contacts))
+
+    assert imported == 1 and len(errors) == 1 and errors[0].startswith("Line 3:")
+    assert [phone.value for phone in book.find("Bob").phones] == ["0931234567"]
+    assert [phone.value for phone in book.find("Ann").phones] == ["0671234567", "0501112233"]
+    assert [record.name.value for record in book.find_by_phone("0931234567")] == ["Bob"]
+
+
+# з --unique-phones рядок з номером іншого контакту пропускається цілком
+def test_import_with_unique_phones_skips_a_taken_phone(tmp_path):
+    book = exported_book()
+    book.unique_phones = True
+    contacts = tmp_path / "contacts.jsonl"
+    contacts.write_text('{"name": "Eve", "phones": ["0671234567"], "email": "eve@mail.com"}\n'
+                        '{"name": "Dan", "phones": ["0671234568"]}\n', encoding="UTF-8")
+
+    imported, errors = import_contacts(book, str(contacts))
+
+    assert imported == 1 and errors[0].startswith("Line 1:")
+    assert book.find("Eve") is None
+    assert list(book.data) == ["Ann", "Bob", "Dan"]
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl"])
+def test_notes_round_trip(tmp_path, extension):
+    file_name = str(tmp_path / f"notes{extension}")
+    nbook = NoteBook()
+    note = nbook.find_note_by_id(nbook.add_note("Buy milk, bread;\n\"and\" cheese"))
+    note.add_tag("home")
+    note.add_tag("shop")
+    nbook.add_note("No tags")
+    assert export_notes(nbook, file_name) == 2
+
+    imported = NoteBook()
+    imported.add_note("Existing")
+    assert import_notes(imported, file_name) == (2, [])
+    assert [(note.id, note.content.value, [tag.value for tag in note.tags]) for note in imported.data.values()] == \
+        [(1, "Existing", []), (2, "Buy milk, bread;\n\"and\" cheese", ["home", "shop"]), (3, "No tags", [])]
+
+
+def test_notes_have_no_vcard_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_notes(NoteBook(), str(tmp_path / "notes.vcf"))
+    with pytest.raises(ValueError):
+        import_notes(NoteBook(), str(tmp_path / "notes.vcf"))
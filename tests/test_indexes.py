@@ -0,0 +1,111 @@
+from src.indexes import TrigramIndex, FullTextIndex, SortedKeys
+
+
+def trigram_index(**records: list[str]) -> TrigramIndex:
+    index = TrigramIndex()
+    for key, texts in records.items():
+        index.update(key, texts)
+    return index
+
+
+def test_trigram_candidates_contain_all_query_trigrams():
+    index = trigram_index(olena=["olena", "0671234567"], oleg=["oleg", "0501112233"], ivan=["ivan", "kyiv"])
+
+    assert index.candidates("ole") == {"olena", "oleg"}
+    assert index.candidates("lena") == {"olena"}
+    assert index.candidates("12345") == {"olena"}
+    assert index.candidates("xyz") == set()
+    assert index.candidates("ol") is None  # коротший за триграму запит індекс не звужує
+
+
+def test_trigram_update_replaces_the_texts_of_a_record():
+    index = trigram_index(olena=["olena", "kyiv"])
+
+    index.update("olena", ["olena", "lviv"])
+
+    assert index.candidates("kyiv") == set()
+    assert index.candidates("lviv") == {"olena"}
+    assert "kyi" not in index.grams
+
+
+def test_trigram_record_replaced_under_the_same_key_keeps_its_number():
+    index = trigram_index(olena=["olena"], oleg=["oleg"])
+    number = index.ids["olena"]
+
+    index.remove("olena")
+    index.update("olena", ["olena", "lviv"])
+
+    assert index.ids["olena"] == number
+    assert index.candidates("ole") == {"olena", "oleg"}
+    assert index.candidates("lviv") == {"olena"}
+
+
+def test_trigram_removed_record_frees_its_number():
+    index = trigram_index(olena=["olena"], oleg=["oleg"])
+    number = index.ids["olena"]
+
+    index.remove("olena")
+    assert index.candidates("ole") == {"oleg"}
+    index.update("ivan", ["ivan"])
+
+    assert index.ids["ivan"] == number
+    assert "olena" not in index.ids
+    assert index.candidates("len") == set()
+
+
+# довгі списки номерів перетинаються двійковим пошуком, а не перебором
+def test_trigram_candidates_with_a_much_longer_posting():
+    index = trigram_index(**{f"name{number}": [f"name{number}"] for number in range(200)})
+    index.update("rare", ["name rare"])
+
+    assert index.candidates("name rare") == {"rare"}
+    assert index.candidates("name19") == {"name19", *(f"name19{digit}" for digit in range(10))}
+
+
+def full_text_index(**documents: str) -> FullTextIndex:
+    index = FullTextIndex()
+    for key, text in documents.items():
+        index.update(key, text)
+    return index
+
+
+def test_bm25_matches_all_or_any_terms():
+    index = full_text_index(a="Buy milk and bread", b="Buy a car", c="Bread recipe")
+
+    assert set(index.search(["buy", "bread"])) == {"a"}
+    assert set(index.search(["buy", "bread"], match_all=False)) == {"a", "b", "c"}
+    assert index.search(["pizza"]) == {}
+    assert index.search([]) == {}
+
+
+def test_bm25_ranks_rare_and_frequent_terms_higher():
+    index = full_text_index(a="milk milk milk bread", b="milk bread bread cheese", c="milk tea", d="milk coffee")
+
+    scores = index.search(["milk"], match_all=False)
+    assert max(scores, key=scores.get) == "a"  # частіше в документі - вище
+
+    scores = index.search(["milk", "cheese"], match_all=False)
+    assert max(scores, key=scores.get) == "b"  # рідкісний термін важить більше за поширений
+
+
+def test_bm25_update_and_remove_keep_postings_in_sync():
+    index = full_text_index(a="Buy milk", b="Buy bread")
+
+    index.update("a", "Sell car")
+    index.remove("b")
+
+    assert index.search(["buy"]) == {}
+    assert set(index.search(["car"])) == {"a"}
+    assert index.total_length == 2
+    assert set(index.postings) == {"sell", "car"}
+
+
+def test_sorted_keys_ranges_across_chunks():
+    keys = SortedKeys(f"key{number:05d}" for number in range(0, 5000, 2))
+    keys.add("key00001")
+    keys.remove("key00002")
+
+    assert list(keys.irange("key00000", "key00005")) == ["key00000", "key00001", "key00004"]
+    assert list(keys.irange("key01996", "key02003")) == ["key01996", "key01998", "key02000", "key02002"]
+    assert list(keys.irange("key04996")) == ["key04996", "key04998"]
+    assert len(keys) == 2500
@@ -0,0 +1,78 @@
+from src.journal import Journal
+from src.personal_assistant import PersonalAssistant
+
+
+def test_journal_entries_are_read_back_in_order(tmp_path):
+    journal = Journal(str(tmp_path / "journal.log"))
+    journal.extend(["add-contact Ann", "add-phone Ann 0671234567"])
+    journal.append("add-note Buy milk")
+
+    loaded = Journal(str(tmp_path / "journal.log"))
+    assert loaded.load() == [(1, "add-contact Ann"), (2, "add-phone Ann 0671234567"), (3, "add-note Buy milk")]
+    assert loaded.seq == 3
+    assert loaded.size == 3
+
+
+def test_preamble_is_written_once_per_session_and_after_clear(tmp_path):
+    journal = Journal(str(tmp_path / "journal.log"), ["unique-phones on"])
+    journal.append("add-contact Ann")
+    journal.append("add-contact Bob")
+    assert [command for _, command in journal.load()] == ["unique-phones on", "add-contact Ann", "add-contact Bob"]
+
+    journal.clear()
+    journal.append("add-contact Eve")
+    assert [command for _, command in journal.load()] == ["unique-phones on", "add-contact Eve"]
+
+
+# збій посеред запису: останній рядок без "\n" відкидається, а файл обрізається до цілих записів
+def test_torn_last_entry_is_dropped_and_truncated(tmp_path):
+    file_name = tmp_path / "journal.log"
+    file_name.write_bytes(b"1\tadd-contact Ann\n2\tadd-contact Bo")
+
+    journal = Journal(str(file_name))
+    assert journal.load() == [(1, "add-contact Ann")]
+    assert file_name.read_bytes() == b"1\tadd-contact Ann\n"
+
+    journal.append("add-contact Bob")
+    assert journal.load() == [(1, "add-contact Ann"), (2, "add-contact Bob")]
+
+
+def test_damaged_entry_stops_the_replay(tmp_path):
+    file_name = tmp_path / "journal.log"
+    file_name.write_bytes(b"1\tadd-contact Ann\ngarbage\n3\tadd-contact Bob\n")
+
+    assert Journal(str(file_name)).load() == [(1, "add-contact Ann")]
+    assert file_name.read_bytes() == b"1\tadd-contact Ann\n"
+
+
+# асистент завершився без знімка: зміни відновлюються повтором журналу
+def test_books_are_recovered_from_the_journal_after_a_crash(tmp_path, capsys):
+    assistant = PersonalAssistant(save_delay=0, folder=str(tmp_path))
+    assistant.__load__()
+    assistant.__run_command__("add-contact Ann 0671234567")
+    assistant.__run_command__("add-note Buy milk")
+    assistant.__run_command__("add-phone Ann 0501112233")
+    assert not (tmp_path / "abook.dat").exists()
+    with open(tmp_path / "journal.log", "ab") as f:
+        f.write(b"9\tdelete-contact An")  # обірваний запис
+
+    restarted = PersonalAssistant(save_delay=0, folder=str(tmp_path))
+    restarted.__load__()
+
+    assert [phone.value for phone in restarted.__abook__.find("Ann").phones] == ["0671234567", "0501112233"]
+    assert restarted.__nbook__.find_note_by_id(1).content.value == "Buy milk"
+
+
+# записи, що вже потрапили у знімок, при повторі журналу пропускаються
+def test_replay_skips_entries_already_in_the_snapshot(tmp_path, capsys):
+    assistant = PersonalAssistant(save_delay=0, folder=str(tmp_path))
+    assistant.__load__()
+    assistant.__run_command__("add-note First")
+    assistant.__save__()
+    assistant.__run_command__("add-note Second")
+    assert len(assistant.__journal__.load()) == 2  # преамбула сеансу і друга нотатка
+
+    restarted = PersonalAssistant(save_delay=0, folder=str(tmp_path))
+    restarted.__load__()
+
+    assert [note.content.value for note in restarted.__nbook__.data.values()] == ["First", "Second"]
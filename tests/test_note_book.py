@@ -0,0 +1,25 @@
+import types
+from src.note_book import NoteBook
+from src.personal_assistant_note_book_handler import PersonalAssistantNoteBookHandler
+
+
+def note_book(*notes: tuple[str, list[str]]) -> NoteBook:
+    book = NoteBook()
+    for content, tags in notes:
+        note = book.find_note_by_id(book.add_note(content))
+        for tag in tags:
+            note.add_tag(tag)
+    return book
+
+
+def test_notes_sorted_by_tags_are_streamed():
+    book = note_book(("Call mom", ["home"]), ("No tags", []), ("Report", ["work", "home"]), ("Buy milk", ["errands"]))
+
+    lines = PersonalAssistantNoteBookHandler().sort_by_tags([], book)
+
+    assert isinstance(lines, types.GeneratorType)
+    assert [line.split("\n")[1].strip() for line in lines] == ["Buy milk", "Call mom", "Report", "No tags"]
+
+
+def test_empty_note_book_is_reported_before_sorting():
+    assert PersonalAssistantNoteBookHandler().sort_by_tags([], NoteBook()) == "Note book is empty."
@@ -0,0 +1,55 @@
+import sqlite3
+from src import sqlite_storage
+from src.personal_assistant import PersonalAssistant
+
+
+def test_fuzzy_lookup_is_not_journaled(tmp_path, capsys):
+    assistant = PersonalAssistant(save_delay=0, folder=str(tmp_path))
+    assistant.__load__()
+    assistant.__run_command__("add-contact Olena 0671234567")
+    journal = (tmp_path / "journal.log").read_bytes()
+
+    assistant.__run_command__("find-contact-fuzzy Olena")
+
+    assert "Olena" in capsys.readouterr().out
+    assert (tmp_path / "journal.log").read_bytes() == journal
+    assert assistant.__history__.lines() == ["   1. add-contact Olena 0671234567"]
+
+
+def test_replay_keeps_unique_phones_of_the_session(tmp_path, capsys):
+    assistant = PersonalAssistant(unique_phones=True, save_delay=0, folder=str(tmp_path))
+    assistant.__load__()
+    assistant.__run_command__("add-contact Ann 0671234567")
+    assistant.__run_command__("add-contact Bob 0671234567")
+    assert "already" in capsys.readouterr().out.lower()
+
+    # перезапуск без --unique-phones після збою: журнал не згорнутий у знімок
+    restarted = PersonalAssistant(save_delay=0, folder=str(tmp_path))
+    restarted.__load__()
+    assert restarted.__abook__.find("Bob").phones == []
+    assert [phone.value for phone in restarted.__abook__.find("Ann").phones] == ["0671234567"]
+
+    # сеанс без прапорця може дати Bob той самий номер, і повтор його журналу це зберігає
+    assert not restarted.__abook__.unique_phones
+    restarted.__run_command__("add-phone Bob 0671234567")
+    again = PersonalAssistant(unique_phones=True, save_delay=0, folder=str(tmp_path))
+    again.__load__()
+    assert [phone.value for phone in again.__abook__.find("Bob").phones] == ["0671234567"]
+    assert again.__abook__.unique_phones
+
+
+def test_sqlite_batch_commits_every_n_commands(tmp_path, capsys, monkeypatch):
+    commits = []
+    monkeypatch.setattr(sqlite_storage.BookConnection, "commit",
+                        lambda conn: commits.append(conn.in_transaction) or sqlite3.Connection.commit(conn))
+    assistant = PersonalAssistant("sqlite", save_delay=0, folder=str(tmp_path))
+    commands = [f"add-contact Name{i} 067{i:07d}" for i in range(5)] + ["add-contact Bad 123"]
+
+    assistant.run_batch(commands, commit_every=2)
+
+    assert "Line 6" in capsys.readouterr().out
+    # після 2, 4 і 6 команд (остання - з помилкою, але змінююча) і порожня транзакція в кінці пакета
+    assert commits == [True] * 4
+    abook, _ = sqlite_storage.open_books(str(tmp_path / "books.db"))
+    assert sorted(abook.data) == ["Bad"] + [f"Name{i}" for i in range(5)]
+    assert abook.find("Bad").phones == []  # як і в діалозі, контакт додано, а невалідний номер - ні
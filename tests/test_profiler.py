@@ -0,0 +1,29 @@
+import tracemalloc
+from src.profiler import Profiler
+
+
+def test_command_memory_peak_is_measured():
+    profiler = Profiler(enabled=True)
+    try:
+        with profiler.command("add-note"):
+            data = [0] * 100_000
+        del data
+
+        assert profiler.histograms[("alloc_peak_bytes", "add-note")].max >= 800_000
+    finally:
+        profiler.disable_memory()
+
+
+# у серверному режимі пік tracemalloc включав би виділення одночасних команд інших клієнтів
+def test_server_profiler_does_not_measure_memory():
+    profiler = Profiler(enabled=True)
+    profiler.disable_memory()
+
+    with profiler.command("get-notes"):
+        pass
+
+    assert not tracemalloc.is_tracing()
+    assert ("command_seconds", "get-notes") in profiler.histograms
+    assert ("alloc_peak_bytes", "get-notes") not in profiler.histograms
+    assert "alloc_peak_bytes" not in profiler.to_dict()["get-notes"]
+    assert profiler.report().splitlines()[2].split()[-2] == "-"  # колонка mem p95
@@ -0,0 +1,66 @@
+import asyncio
+from src import server
+
+
+class FakeReader:
+
+    def __init__(self, *lines: bytes, error: BaseException | None = None):
+        self.__lines__ = list(lines)
+        self.__error__ = error
+
+    async def readline(self) -> bytes:
+        if self.__lines__:
+            return self.__lines__.pop(0)
+        if self.__error__ is not None:
+            raise self.__error__
+        return b""
+
+
+class FakeWriter:
+
+    def __init__(self):
+        self.output = b""
+        self.closed = False
+
+    def write(self, data: bytes):
+        self.output += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        raise ConnectionResetError  # сокет уже закрито іншою стороною
+
+
+class FakeAssistant:
+
+    def __serve_command__(self, user_input: str, session: dict) -> str:
+        return f"ok {user_input}"
+
+
+def serve_client(reader: FakeReader) -> FakeWriter:
+    async def run():
+        writer = FakeWriter()
+        await server.handle_client(FakeAssistant(), None, reader, writer)
+        return writer
+    return asyncio.run(run())
+
+
+def test_client_is_closed_after_exit():
+    writer = serve_client(FakeReader(b"hello\n", b"exit\n"))
+    assert writer.closed
+    assert b"ok hello\n.\n" in writer.output
+    assert writer.output.endswith(b"Good bye!\n.\n")
+
+
+def test_client_is_closed_after_a_dropped_connection():
+    writer = serve_client(FakeReader(b"hello\n", error=ConnectionResetError()))
+    assert writer.closed
+
+
+def test_client_is_closed_when_the_server_stops():
+    writer = serve_client(FakeReader(error=asyncio.CancelledError()))
+    assert writer.closed
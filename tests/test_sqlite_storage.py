@@ -0,0 +1,106 @@
+import pytest
+from datetime import date, timedelta
+from src import sqlite_storage
+from src.address_book import AddressBook, Record
+from src.general import ValidPhoneDuplicateError
+from src.note_book import NoteBook
+
+
+def open_books(tmp_path, migrate_from=None):
+    return sqlite_storage.open_books(str(tmp_path / "books.db"), migrate_from)
+
+
+def contact(name: str, *phones: str, birthday: str | None = None, email: str | None = None) -> Record:
+    record = Record(name)
+    for phone in phones:
+        record.add_phone(phone)
+    if birthday is not None:
+        record.add_birthday(birthday)
+    if email is not None:
+        record.add_email(email)
+    return record
+
+
+def test_contacts_and_their_changes_are_stored_in_the_database(tmp_path):
+    abook, _ = open_books(tmp_path)
+    abook.add_record(contact("Ann", "0671234567", birthday="01.02.1990", email="ann@mail.com"))
+    abook.add_record(contact("Bob", "0501112233"))
+    abook.find("Ann").add_phone("0931234567")
+    abook.find("Bob").edit_phone("0501112233", "0502223344")
+    abook.delete("Bob")
+    abook.add_record(contact("Eve"))
+
+    abook, _ = open_books(tmp_path)
+    ann = abook.find("Ann")
+    assert list(abook.data) == ["Ann", "Eve"]
+    assert [phone.value for phone in ann.phones] == ["0671234567", "0931234567"]
+    assert ann.birthday.value == date(1990, 2, 1)
+    assert ann.email.value == "ann@mail.com"
+    assert abook.find("Bob") is None
+
+
+def test_contact_queries_use_the_database(tmp_path):
+    abook, _ = open_books(tmp_path)
+    soon = date.today() + timedelta(days=2)
+    abook.add_record(contact("Olena", "0671234567", birthday=soon.replace(year=1992).strftime("%d.%m.%Y")))
+    abook.add_record(contact("Oleg", "0501112233", email="oleg@kyiv.ua"))
+    abook.add_record(contact("Ivan", "0671239999"))
+
+    assert [record.name.value for record in abook.search("KYIV")] == ["Oleg"]
+    assert [record.name.value for record in abook.search("06712")] == ["Ivan", "Olena"]
+    assert [record.name.value for record in abook.find_by_phone("0501112233")] == ["Oleg"]
+    assert list(abook.iter_names("Ol", "Ol")) == ["Oleg", "Olena"]
+    assert list(abook.iter_names_by_birthday()) == ["Olena", "Ivan", "Oleg"]
+    assert [line.split("'")[0] for line in abook.get_upcoming_birthdays(7)] == ["Olena"]
+
+
+def test_unique_phones_are_checked_against_the_database(tmp_path):
+    abook, _ = open_books(tmp_path)
+    abook.unique_phones = True
+    abook.add_record(contact("Ann", "0671234567"))
+    abook.add_record(contact("Bob"))
+
+    with pytest.raises(ValidPhoneDuplicateError):
+        abook.find("Bob").add_phone("0671234567")
+    assert abook.find("Bob").phones == []
+
+
+def test_notes_full_text_and_tag_search(tmp_path):
+    _, nbook = open_books(tmp_path)
+    for content, tags in [("Buy milk and bread", ["home"]), ("Buy a car", ["work", "car"]), ("Bread recipe", [])]:
+        note = nbook.find_note_by_id(nbook.add_note(content))
+        for tag in tags:
+            note.add_tag(tag)
+    nbook.edit_note_content(3, "Cake recipe")
+
+    _, nbook = open_books(tmp_path)
+    assert [note.id for note in nbook.search_notes_by_content("buy bread")] == [1]
+    assert sorted(note.id for note in nbook.search_notes_by_content("bread OR car")) == [1, 2]
+    assert nbook.search_notes_by_content("bread recipe") == []
+    assert [note.id for note in nbook.search_notes_by_tag("WORK")] == [2]
+    assert [note.id for note in nbook.iter_notes_sorted_by_tags()] == [1, 2, 3]
+    assert nbook.get_tags() == ["car", "home", "work"]
+    assert nbook.complete_tag("c") == ["car"]
+
+
+def test_new_database_is_filled_from_the_file_books_once(tmp_path):
+    old_abook = AddressBook()
+    old_abook.add_record(contact("Ann", "0671234567"))
+    old_nbook = NoteBook()
+    old_nbook.add_note("First")
+    old_nbook.add_note("Second")
+    old_nbook.delete_note(2)
+    calls = []
+
+    def migrate_from():
+        calls.append(1)
+        return old_abook, old_nbook
+
+    abook, nbook = open_books(tmp_path, migrate_from)
+    assert [phone.value for phone in abook.find("Ann").phones] == ["0671234567"]
+    assert nbook.add_note("Third") == 3  # номери видалених нотаток не повторюються
+    abook.delete("Ann")
+
+    abook, _ = open_books(tmp_path, migrate_from)
+    assert len(calls) == 1
+    assert len(abook.data) == 0
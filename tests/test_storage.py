@@ -0,0 +1,127 @@
+import pytest
+from array import array
+from src import book_codecs, storage
+from src.address_book import AddressBook, Record
+from src.note_book import NoteBook
+
+
+def contact(name: str, *phones: str) -> Record:
+    record = Record(name)
+    for phone in phones:
+        record.add_phone(phone)
+    return record
+
+
+def address_book(*records: Record) -> AddressBook:
+    book = AddressBook()
+    for record in records:
+        book.add_record(record)
+    return book
+
+
+# кодек, що пише лічильники телефонів байтами, як ранні файли версії 2
+class ByteCountsCodec(book_codecs.ContactsCodec):
+
+    @staticmethod
+    def encode(records):
+        sections = book_codecs.split_sections(book_codecs.ContactsCodec.encode(records))
+        sections[2] = array("B", book_codecs.unpack_array("I", sections[2])).tobytes()
+        return book_codecs.join_sections(sections)
+
+
+def test_count_column_of_another_width_is_a_damaged_file(tmp_path, monkeypatch):
+    file_name = str(tmp_path / "abook.dat")
+    with monkeypatch.context() as patch:
+        patch.setattr(book_codecs, "codec_for", lambda book: ByteCountsCodec)
+        storage.save_book(address_book(*(contact(f"Name{i}", "0671234567") for i in range(4))), file_name)
+
+    book = storage.open_book(file_name, AddressBook)
+    with pytest.raises(storage.BookFileError, match="block 0"):
+        book.find("Name1")
+    with pytest.raises(storage.BookFileError, match="block 0"):
+        book.__phone_owners__("0671234567")
+
+
+def note_book(count: int) -> NoteBook:
+    book = NoteBook()
+    for number in range(count):
+        note = book.find_note_by_id(book.add_note(f"Note {number}"))
+        for tag in ("work", "home")[:number % 3]:
+            note.add_tag(tag)
+    return book
+
+
+def test_contacts_round_trip(tmp_path):
+    file_name = str(tmp_path / "abook.dat")
+    records = [contact(f"Name{number:03d}", *(f"067{number:04d}{i:03d}" for i in range(number % 3)))
+               for number in range(200)]  # кілька блоків
+    records[5].add_birthday("29.02.1992")
+    records[6].add_email("olena@mail.com")
+    records[7].add_address("Kyiv, Khreshchatyk 1")
+    storage.save_book(address_book(*records), file_name)
+
+    book = storage.open_book(file_name, AddressBook)
+
+    assert list(book.data) == [record.name.value for record in records]
+    for record in records:
+        loaded = book.find(record.name.value)
+        assert loaded.get_table_row() == record.get_table_row()
+        assert loaded.book is book
+    assert str(book.find("Name005").birthday) == "29.02.1992"
+
+
+def test_notes_round_trip_after_changes(tmp_path):
+    file_name = str(tmp_path / "nbook.dat")
+    storage.save_book(note_book(150), file_name)
+
+    book = storage.open_book(file_name, NoteBook)
+    book.edit_note_content(70, "Changed")
+    book.delete_note(3)
+    book.add_note("New")
+    storage.save_book(book, file_name)  # незмінені блоки копіюються без перекодування
+
+    book = storage.open_book(file_name, NoteBook)
+    assert len(book.data) == 150
+    assert book.find_note_by_id(3) is None
+    assert book.find_note_by_id(70).content.value == "Changed"
+    assert book.find_note_by_id(151).content.value == "New"
+    assert [tag.value for tag in book.find_note_by_id(6).tags] == ["work", "home"]
+    assert book.note_id_counter == 152
+
+
+def damage(file_name: str, offset: int):
+    with open(file_name, "r+b") as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+
+def test_damaged_block_raises_book_file_error(tmp_path):
+    file_name = str(tmp_path / "abook.dat")
+    storage.save_book(address_book(*(contact(f"Name{number:03d}") for number in range(200))), file_name)
+    file = storage.open_book_file(file_name)
+    offset, size, _, _ = storage.BLOCK.unpack_from(file.data, file.block_table + storage.BLOCK.size)
+    file.data.close()
+    damage(file_name, offset + size // 2)
+
+    book = storage.open_book(file_name, AddressBook)  # блоки перевіряються при першому зверненні
+    assert book.find("Name000") is not None
+    with pytest.raises(storage.BookFileError, match="block 1 checksum"):
+        book.find(f"Name{storage.BLOCK_SIZE:03d}")
+
+
+def test_damaged_tables_or_header_raise_book_file_error(tmp_path):
+    file_name = str(tmp_path / "abook.dat")
+    storage.save_book(address_book(contact("Ann"), contact("Bob")), file_name)
+    file = storage.open_book_file(file_name)
+    entries = file.entries
+    file.data.close()
+
+    damage(file_name, entries)
+    with pytest.raises(storage.BookFileError, match="checksum"):
+        storage.open_book(file_name, AddressBook)
+
+    damage(file_name, 0)
+    with pytest.raises(storage.BookFileError, match="Unsupported"):
+        storage.open_book(file_name, AddressBook)